@@ -0,0 +1,393 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Session key holding the id of the dataset a user is working on
+SESSION_DATASET_KEY = 'buisint_dataset_id'
+
+SCHEMA_FILE = 'schema.json'
+
+# Layout version of the columnar directories; datasets in another layout are parsed again
+COLUMNAR_FORMAT = 2
+
+# Rows rewritten at a time when a column is widened or re-coded
+BLOCK_ROWS = 1024 ** 2
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def dataset_id_for(content: Union[str, bytes, Iterable[bytes]]) -> str:
+    """
+    Content address of a file - its text, bytes, or chunks of bytes such as
+    UploadedFile.chunks(): the same CSV maps to the same dataset in every worker
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    if isinstance(content, bytes):
+        return hashlib.sha256(content).hexdigest()
+    digest = hashlib.sha256()
+    for chunk in content:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def codes_dtype(category_count: int) -> np.dtype:
+    """
+    Smallest code type pandas uses for this many categories. Codes are stored
+    with it so Categorical.from_codes keeps the memory-mapped array instead
+    of converting it.
+    """
+    if category_count < np.iinfo(np.int8).max:
+        return np.dtype(np.int8)
+    if category_count < np.iinfo(np.int16).max:
+        return np.dtype(np.int16)
+    if category_count < np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+def private_bytes(series: pd.Series) -> int:
+    """
+    Memory a column takes in this process. Mapped pages live in the shared
+    page cache, so a mapped column only costs its category values.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return int(series.cat.categories.memory_usage(deep=True))
+    if isinstance(series.to_numpy(copy=False), np.memmap):
+        return 0
+    return int(series.memory_usage(index=False, deep=True))
+
+
+class DatasetEntry:
+    """A dataset held by this process: the frame, its inferred schema and its private size"""
+
+    def __init__(self, data: pd.DataFrame, column_types: Dict[str, str], type_confidence: Optional[Dict[str, float]] = None):
+        self.data = data
+        self.column_types = column_types
+        self.type_confidence = type_confidence or {}
+        self.nbytes = sum(private_bytes(data[column]) for column in data.columns)
+
+
+class ColumnarWriter:
+    """
+    Builds a columnar dataset directory chunk by chunk, so a file of any size
+    is written with memory bounded by the chunk size (plus the distinct values
+    of text columns).
+
+    Every column is a raw little-endian file of its rows, described in
+    schema.json. Numeric and datetime columns are stored as-is, widening the
+    type when a later chunk needs it (e.g. integers that turn out to have
+    gaps become floats). Text columns are dictionary-encoded: integer codes
+    (-1 for missing) plus the distinct values, which close() sorts and stores
+    in the schema, narrowing the codes to the type pandas uses for that many
+    categories. The directory is written under a temporary name and renamed,
+    so readers never see a partial dataset.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        parent = os.path.dirname(directory)
+        os.makedirs(parent, exist_ok=True)
+        self.tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+        self.columns: Optional[List[Dict]] = None
+        self.rows = 0
+
+    def append(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            self.columns = [self.start_column(position, column, chunk[column]) for position, column in enumerate(chunk.columns)]
+        elif [state['name'] for state in self.columns] != [str(column) for column in chunk.columns]:
+            raise ValueError("Chunk columns do not match the dataset's columns")
+
+        for state, column in zip(self.columns, chunk.columns):
+            if state['encoding'] == 'plain':
+                values = self.plain_values(state, chunk[column].to_numpy())
+            else:
+                values = self.dictionary_codes(state, chunk[column])
+            with open(os.path.join(self.tmp_dir, state['file']), 'ab') as f:
+                f.write(np.ascontiguousarray(values).tobytes())
+        self.rows += len(chunk)
+
+    def start_column(self, position: int, column, series: pd.Series) -> Dict:
+        state = {'name': str(column), 'file': f"c{position:04d}.bin"}
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            state.update(encoding='plain', dtype=series.to_numpy().dtype.newbyteorder('<'))
+        else:
+            state.update(encoding='dictionary', dtype=np.dtype('<i4'), lookup={})
+        return state
+
+    def plain_values(self, state: Dict, values: np.ndarray) -> np.ndarray:
+        if values.dtype != state['dtype'] and not np.can_cast(values.dtype, state['dtype'], 'safe'):
+            try:
+                self.promote(state, np.result_type(values.dtype, state['dtype']).newbyteorder('<'))
+            except TypeError:
+                raise ValueError(f"Column {state['name']} changes type from {state['dtype']} to {values.dtype}")
+        return values.astype(state['dtype'], copy=False)
+
+    def promote(self, state: Dict, dtype: np.dtype):
+        """Rewrite the rows written so far with a wider type, block by block"""
+        path = os.path.join(self.tmp_dir, state['file'])
+        if self.rows:
+            written = np.memmap(path, dtype=state['dtype'], mode='r', shape=(self.rows,))
+            with open(path + '.promote', 'wb') as f:
+                for start in range(0, self.rows, BLOCK_ROWS):
+                    f.write(written[start:start + BLOCK_ROWS].astype(dtype).tobytes())
+            del written
+            os.replace(path + '.promote', path)
+        state['dtype'] = dtype
+
+    def dictionary_codes(self, state: Dict, series: pd.Series) -> np.ndarray:
+        local_codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        lookup = state['lookup']
+        # Map this chunk's distinct values to dataset-wide codes; the loop is per distinct value, not per row
+        mapping = np.fromiter(
+            (lookup.setdefault(value.item() if isinstance(value, np.generic) else value, len(lookup)) for value in uniques),
+            dtype=np.int32, count=len(uniques)
+        )
+        return np.where(local_codes >= 0, mapping[np.maximum(local_codes, 0)] if len(mapping) else -1, -1).astype(np.int32)
+
+    def finish_dictionary(self, state: Dict):
+        """Re-code a dictionary column against its sorted distinct values in the narrowest code type"""
+        categories = list(state.pop('lookup'))
+        try:
+            order = sorted(range(len(categories)), key=categories.__getitem__)
+        except TypeError:  # Mixed types that cannot be ordered
+            order = list(range(len(categories)))
+        new_codes = np.empty(len(categories), dtype=np.int64)
+        new_codes[order] = np.arange(len(categories))
+        dtype = codes_dtype(len(categories)).newbyteorder('<')
+
+        path = os.path.join(self.tmp_dir, state['file'])
+        if self.rows:
+            written = np.memmap(path, dtype=state['dtype'], mode='r', shape=(self.rows,))
+            with open(path + '.sorted', 'wb') as f:
+                for start in range(0, self.rows, BLOCK_ROWS):
+                    block = written[start:start + BLOCK_ROWS]
+                    recoded = np.where(block >= 0, new_codes[np.maximum(block, 0)] if len(categories) else -1, -1)
+                    f.write(recoded.astype(dtype).tobytes())
+            del written
+            os.replace(path + '.sorted', path)
+        state['dtype'] = dtype
+        state['categories'] = [categories[index] for index in order]
+
+    def close(self, column_types: Dict[str, str], type_confidence: Optional[Dict[str, float]] = None) -> bool:
+        """
+        Finish the dataset and move it into place, with its inferred schema so
+        it never has to be inferred again. Returns False when another process
+        already wrote the same dataset, which is then kept.
+        """
+        try:
+            if self.columns is None:
+                raise ValueError("No columns found in the data")
+            for state in self.columns:
+                if state['encoding'] == 'dictionary':
+                    self.finish_dictionary(state)
+
+            schema = {
+                'format': COLUMNAR_FORMAT,
+                'rows': self.rows,
+                'columns': [dict(state, dtype=state['dtype'].str) for state in self.columns],
+                'column_types': column_types,
+                'type_confidence': type_confidence or {},
+            }
+            with open(os.path.join(self.tmp_dir, SCHEMA_FILE), 'w') as f:
+                json.dump(schema, f, default=str)
+
+            try:
+                os.rename(self.tmp_dir, self.directory)
+            except OSError:
+                if not os.path.isdir(self.directory):
+                    raise
+                # Another worker stored the same content first; theirs is identical
+                self.abort()
+                return False
+            return True
+        except Exception:
+            self.abort()
+            raise
+
+    def abort(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def write_columnar(directory: str, data: pd.DataFrame, column_types: Dict[str, str],
+                   type_confidence: Optional[Dict[str, float]] = None) -> bool:
+    """Write a whole frame as a columnar dataset directory (see ColumnarWriter)"""
+    writer = ColumnarWriter(directory)
+    try:
+        writer.append(data)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close(column_types, type_confidence)
+
+
+def read_columnar(directory: str) -> Optional[Tuple[pd.DataFrame, Dict[str, str], Dict[str, float]]]:
+    """
+    Open a frame written by ColumnarWriter without reading it: every column
+    is memory-mapped read-only, so all worker processes share the same pages.
+    Text columns become Categoricals over the mapped codes. Returns None when
+    the dataset does not exist or was written in an older format.
+    """
+    try:
+        with open(os.path.join(directory, SCHEMA_FILE)) as f:
+            schema = json.load(f)
+    except FileNotFoundError:
+        return None
+    if schema.get('format') != COLUMNAR_FORMAT:
+        return None
+
+    rows = schema['rows']
+    columns = {}
+    for entry in schema['columns']:
+        dtype = np.dtype(entry['dtype'])
+        if rows:
+            values = np.memmap(os.path.join(directory, entry['file']), dtype=dtype, mode='r', shape=(rows,))
+        else:
+            values = np.empty(0, dtype=dtype)  # Empty files cannot be mapped
+        if entry['encoding'] == 'dictionary':
+            values = pd.Categorical.from_codes(values, categories=pd.Index(entry['categories'], dtype=object))
+        columns[entry['name']] = values
+    # copy=False keeps one block per mapped column instead of consolidating them into a private copy
+    data = pd.DataFrame(columns, columns=[entry['name'] for entry in schema['columns']], copy=False)
+    return data, schema['column_types'], schema.get('type_confidence', {})
+
+
+class DatasetSessionStore:
+    """
+    Parsed datasets shared by all users and worker processes.
+
+    Each dataset is persisted once, under the content address of the file it
+    was parsed from, as a columnar directory that every worker memory-maps
+    read-only; a session only records which dataset id it is working on.
+    Opened datasets are kept per process under a byte budget with LRU
+    eviction; an evicted dataset is simply mapped again on the next request.
+    Directories untouched for longer than max_age seconds are removed.
+    """
+
+    def __init__(self, directory: str, memory_budget: int, max_age: int):
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.max_age = max_age
+        self._entries: 'OrderedDict[str, DatasetEntry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, dataset_id: str) -> str:
+        # Ids are SHA-256 digests; refuse anything that could leave the directory
+        if not dataset_id or not dataset_id.isalnum():
+            raise ValueError(f"Invalid dataset id: {dataset_id}")
+        return os.path.join(self.directory, dataset_id)
+
+    def exists(self, dataset_id: str) -> bool:
+        return os.path.exists(os.path.join(self.path(dataset_id), SCHEMA_FILE))
+
+    def put(self, dataset_id: str, data: pd.DataFrame, column_types: Dict[str, str],
+            type_confidence: Optional[Dict[str, float]] = None) -> DatasetEntry:
+        """
+        Persist a parsed frame under its dataset id and return the mapped
+        entry, so the parsed copy can be released by the caller.
+        """
+        write_columnar(self.path(dataset_id), data, column_types, type_confidence)
+        self.purge_expired()
+        return self.get(dataset_id)
+
+    def writer(self, dataset_id: str) -> ColumnarWriter:
+        """Writer for building a dataset chunk by chunk; finish it with commit()"""
+        return ColumnarWriter(self.path(dataset_id))
+
+    def commit(self, dataset_id: str, writer: ColumnarWriter, column_types: Dict[str, str],
+               type_confidence: Optional[Dict[str, float]] = None) -> DatasetEntry:
+        """Close a writer from writer() and return the mapped dataset"""
+        writer.close(column_types, type_confidence)
+        self.purge_expired()
+        return self.get(dataset_id)
+
+    def get(self, dataset_id: str) -> Optional[DatasetEntry]:
+        """The dataset from this process's cache, or mapped from disk; None when unknown"""
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is not None:
+                self._entries.move_to_end(dataset_id)
+        self.touch(dataset_id)
+        if entry is not None:
+            return entry
+
+        loaded = read_columnar(self.path(dataset_id))
+        if loaded is None:
+            # Nothing there, or a dataset in an older layout that has to be parsed again
+            shutil.rmtree(self.path(dataset_id), ignore_errors=True)
+            return None
+        logger.debug(f"Mapped dataset {dataset_id} from {self.path(dataset_id)}")
+        entry = DatasetEntry(*loaded)
+        self._remember(dataset_id, entry)
+        return entry
+
+    def touch(self, dataset_id: str):
+        """Mark the columnar copy as used so purge_expired keeps it"""
+        try:
+            os.utime(self.path(dataset_id))
+        except FileNotFoundError:
+            pass
+
+    def _remember(self, dataset_id: str, entry: DatasetEntry):
+        with self._lock:
+            previous = self._entries.pop(dataset_id, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[dataset_id] = entry
+            self._bytes += entry.nbytes
+
+            # Drop least recently used datasets; they stay on disk. The newest
+            # entry is kept even when it alone exceeds the budget.
+            while self._bytes > self.memory_budget and len(self._entries) > 1:
+                evicted_id, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                logger.debug(f"Evicted dataset {evicted_id} ({evicted.nbytes} bytes) from memory")
+
+    def purge_expired(self):
+        """
+        Remove columnar directories not used for max_age seconds. Workers
+        still mapping a removed dataset keep their mapping until they drop it.
+        """
+        cutoff = time.time() - self.max_age
+        for dataset_id in os.listdir(self.directory):
+            dataset_dir = os.path.join(self.directory, dataset_id)
+            try:
+                if os.path.getmtime(dataset_dir) >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                entry = self._entries.pop(dataset_id, None)
+                if entry is not None:
+                    self._bytes -= entry.nbytes
+            shutil.rmtree(dataset_dir, ignore_errors=True)
+
+
+def get_dataset_store() -> DatasetSessionStore:
+    """Return the process-wide dataset session store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DatasetSessionStore(
+                    directory=getattr(settings, 'BUISINT_DATASET_DIR', os.path.join('cache', 'datasets')),
+                    memory_budget=getattr(settings, 'BUISINT_DATASET_MEMORY_BYTES', 512 * 1024 ** 2),
+                    max_age=getattr(settings, 'BUISINT_DATASET_MAX_AGE', 24 * 3600)
+                )
+    return _store
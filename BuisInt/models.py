@@ -34,8 +34,10 @@ class UserFile(Document):
     user_id = IntField(required=True)  # Store Django user ID instead of reference
     username = StringField(required=True)  # Store username for display purposes
     filename = StringField(required=True)
-    file_content = StringField(required=True)  # Store CSV content as string
+    file_content = StringField()  # CSV content of files saved before dataset_id
+    dataset_id = StringField()  # The file's records in the shared forecasting dataset store
     column_types = DictField()  # Store column types
+    type_confidence = DictField()  # Share of sampled values supporting each inferred type
     upload_date = DateTimeField(default=datetime.utcnow)
     description = StringField(max_length=500)
     
@@ -1,15 +1,47 @@
 import pandas as pd
 import numpy as np
 import io
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
+import logging
 import re
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Date formats recognised in uploaded files, in priority order, each with a
+# pattern that pre-filters candidate values before they are parsed
+DATE_FORMATS = [
+    # DD/MM/YYYY
+    (r'^\d{2}/\d{2}/\d{4}$', '%d/%m/%Y'),
+    # YYYY/MM/DD
+    (r'^\d{4}/\d{2}/\d{2}$', '%Y/%m/%d'),
+    # DD-MM-YYYY
+    (r'^\d{2}-\d{2}-\d{4}$', '%d-%m-%Y'),
+    # YYYY-MM-DD
+    (r'^\d{4}-\d{2}-\d{2}$', '%Y-%m-%d'),
+    # DD.MM.YYYY
+    (r'^\d{2}\.\d{2}\.\d{4}$', '%d.%m.%Y'),
+    # MM/DD/YYYY
+    (r'^\d{2}/\d{2}/\d{4}$', '%m/%d/%Y'),
+    # Short year formats
+    (r'^\d{2}/\d{2}/\d{2}$', '%d/%m/%y'),
+    (r'^\d{2}-\d{2}-\d{2}$', '%d-%m-%y'),
+]
+
+# Non-null values per column examined by type inference
+INFERENCE_SAMPLE_SIZE = 1000
+
+# Share of sampled values that must parse for a column to be numeric or a date
+NUMERIC_THRESHOLD = 0.95
+DATE_THRESHOLD = 0.9
+
 class DataProcessingService:
     def __init__(self):
         self.data = None
+        self.dataset_id = None
         self.column_types = {}
+        self.type_confidence = {}
 
     def check_date_format(self, value: str) -> tuple[bool, str]:
         """
@@ -19,26 +51,7 @@ class DataProcessingService:
         # Strip any leading/trailing whitespace
         value = value.strip()
         
-        # Common date formats to check
-        date_formats = [
-            # DD/MM/YYYY
-            (r'^\d{2}/\d{2}/\d{4}$', '%d/%m/%Y'),
-            # YYYY/MM/DD
-            (r'^\d{4}/\d{2}/\d{2}$', '%Y/%m/%d'),
-            # DD-MM-YYYY
-            (r'^\d{2}-\d{2}-\d{4}$', '%d-%m-%Y'),
-            # YYYY-MM-DD
-            (r'^\d{4}-\d{2}-\d{2}$', '%Y-%m-%d'),
-            # DD.MM.YYYY
-            (r'^\d{2}\.\d{2}\.\d{4}$', '%d.%m.%Y'),
-            # MM/DD/YYYY
-            (r'^\d{2}/\d{2}/\d{4}$', '%m/%d/%Y'),
-            # Short year formats
-            (r'^\d{2}/\d{2}/\d{2}$', '%d/%m/%y'),
-            (r'^\d{2}-\d{2}-\d{2}$', '%d-%m-%y'),
-        ]
-        
-        for pattern, date_format in date_formats:
+        for pattern, date_format in DATE_FORMATS:
             if re.match(pattern, value):
                 try:
                     # Try to parse the date to validate it
@@ -50,111 +63,171 @@ class DataProcessingService:
         
         return False, ""
 
+    def infer_column_types(self, sample: pd.DataFrame) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, float]]:
+        """
+        Classify every column of a sample of the data (e.g. the first chunk of
+        a file) as numeric, date or categorical, using vectorised parsing of
+        at most INFERENCE_SAMPLE_SIZE non-null values per column.
+
+        Returns (column_types, date_formats, confidence): date_formats holds
+        the strptime format of each date column, confidence the share of
+        sampled values supporting each column's type (for categorical
+        columns, the share that is neither numeric nor a date).
+        """
+        column_types = {}
+        date_formats = {}
+        confidence = {}
+        for column in sample.columns:
+            values = sample[column].dropna().head(INFERENCE_SAMPLE_SIZE)
+            if len(values) == 0:
+                column_types[column] = 'categorical'
+                confidence[column] = 0.0
+                continue
+
+            numeric_rate = float(pd.to_numeric(values, errors='coerce').notna().mean())
+            if numeric_rate >= NUMERIC_THRESHOLD:
+                column_types[column] = 'numeric'
+                confidence[column] = round(numeric_rate, 4)
+                continue
+
+            date_format, date_rate = self.best_date_format(values)
+            if date_rate > DATE_THRESHOLD:
+                column_types[column] = 'date'
+                date_formats[column] = date_format
+                confidence[column] = round(date_rate, 4)
+            else:
+                column_types[column] = 'categorical'
+                confidence[column] = round(1.0 - max(numeric_rate, date_rate), 4)
+
+        logger.debug(f"Inferred column types: {column_types} (confidence: {confidence})")
+        return column_types, date_formats, confidence
+
+    def best_date_format(self, values: pd.Series) -> Tuple[Optional[str], float]:
+        """
+        The date format that parses the largest share of values, and that
+        share. Earlier formats in DATE_FORMATS win ties.
+        """
+        strings = values.astype(str).str.strip()
+        best_format, best_rate = None, 0.0
+        for pattern, date_format in DATE_FORMATS:
+            candidates = strings[strings.str.match(pattern)]
+            if len(candidates) <= best_rate * len(values):
+                continue  # Cannot beat the current best even if every candidate parses
+            parsed = pd.to_datetime(candidates, format=date_format, errors='coerce')
+            rate = float(parsed.notna().sum()) / len(values)
+            if rate > best_rate:
+                best_format, best_rate = date_format, rate
+        return best_format, best_rate
+
+    def apply_column_types(self, frame: pd.DataFrame, column_types: Dict[str, str],
+                           date_formats: Dict[str, str]) -> pd.DataFrame:
+        """
+        Convert raw text columns to their inferred types: numeric columns to
+        numbers and date columns to YYYY-MM-DD strings for consistency.
+        Values that do not fit the column's type become missing.
+        """
+        frame = frame.copy()
+        for column, column_type in column_types.items():
+            if column_type == 'numeric':
+                frame[column] = pd.to_numeric(frame[column], errors='coerce')
+            elif column_type == 'date':
+                dates = pd.to_datetime(frame[column], format=date_formats.get(column), errors='coerce')
+                frame[column] = dates.dt.strftime('%Y-%m-%d')
+        return frame
+
     def load_data(self, file_content: str) -> Dict[str, Any]:
         """
         Load data from CSV content and determine column types
         """
         try:
-            # Read CSV content
-            self.data = pd.read_csv(io.StringIO(file_content))
-            
-            # Determine column types
-            self.column_types = {}
-            for column in self.data.columns:
-                print(f"[DEBUG] Processing column: {column}")
-                print(f"[DEBUG] First few values: {self.data[column].head()}")
-                
-                # Check if column is numeric - be more strict about this
-                is_numeric = False
-                
-                try:
-                    # Try to convert all non-null values to numeric
-                    non_null_values = self.data[column].dropna()
-                    if len(non_null_values) == 0:
-                        print(f"[DEBUG] {column} is empty, marking as categorical")
-                        self.column_types[column] = 'categorical'
-                        continue
-                    
-                    # Check if we can convert all values to numeric
-                    numeric_converted = pd.to_numeric(non_null_values, errors='coerce')
-                    numeric_success_rate = numeric_converted.notna().sum() / len(non_null_values)
-                    
-                    # Only consider it numeric if 95% or more values can be converted
-                    if numeric_success_rate >= 0.95:
-                        print(f"[DEBUG] {column} detected as numeric (success rate: {numeric_success_rate:.2%})")
-                        self.column_types[column] = 'numeric'
-                        is_numeric = True
-                    else:
-                        print(f"[DEBUG] {column} has mixed types (numeric success rate: {numeric_success_rate:.2%}), marking as categorical")
-                        # Show some examples of non-numeric values
-                        non_numeric_mask = numeric_converted.isna()
-                        if non_numeric_mask.any():
-                            non_numeric_examples = non_null_values[non_numeric_mask].head(3).tolist()
-                            print(f"[DEBUG] Non-numeric examples in {column}: {non_numeric_examples}")
-                        self.column_types[column] = 'categorical'
-                except Exception as e:
-                    print(f"[DEBUG] Error checking numeric type for {column}: {str(e)}")
-                    self.column_types[column] = 'categorical'
-                
-                # If not numeric, check if it's a date column
-                if not is_numeric:
-                    # Try to detect if it's a date column using our custom function
-                    sample_size = min(100, len(self.data))
-                    date_matches = 0
-                    non_null_samples = 0
-                    detected_format = None
-                    
-                    # Sample non-null values
-                    for value in self.data[column].dropna().head(sample_size):
-                        if isinstance(value, str):
-                            is_date, format_found = self.check_date_format(str(value))
-                            if is_date:
-                                date_matches += 1
-                                if not detected_format:
-                                    detected_format = format_found
-                            non_null_samples += 1
-                    
-                    # If more than 90% of non-null samples match date format
-                    if non_null_samples > 0 and (date_matches / non_null_samples) > 0.9:
-                        print(f"[DEBUG] {column} detected as date with format {detected_format}")
-                        try:
-                            # Convert the column to datetime
-                            self.data[column] = pd.to_datetime(self.data[column], format=detected_format)
-                            # Convert to string format YYYY-MM-DD for consistency
-                            self.data[column] = self.data[column].dt.strftime('%Y-%m-%d')
-                            self.column_types[column] = 'date'
-                        except Exception as e:
-                            print(f"[DEBUG] Failed to convert {column} to datetime: {str(e)}")
-                            self.column_types[column] = 'categorical'
-                    else:
-                        print(f"[DEBUG] {column} detected as categorical")
-                        self.column_types[column] = 'categorical'
-
-            print(f"[DEBUG] Final column types: {self.column_types}")
-
-            return {
-                'columns': list(self.data.columns),
-                'column_types': self.column_types,
-                'data': self.data.to_dict(orient='records'),  # Return full data
-                'total_rows': len(self.data),
-                'total_columns': len(self.data.columns)
-            }
+            # Read CSV content as text; types are inferred and applied below
+            raw = pd.read_csv(io.StringIO(file_content), dtype=str)
+            self.column_types, date_formats, self.type_confidence = self.infer_column_types(raw)
+            self.data = self.apply_column_types(raw, self.column_types, date_formats)
+            return self.describe()
         except Exception as e:
             print(f"[DEBUG] Error in load_data: {str(e)}")
             raise ValueError(f"Error loading data: {str(e)}")
 
+    def ingest_csv(self, source, writer, chunk_rows: int = 50000,
+                   column_types: Optional[Dict[str, str]] = None,
+                   date_formats: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Stream CSV data from a file-like source (e.g. an UploadedFile) into a
+        dataset writer chunk by chunk, so peak memory depends on chunk_rows
+        rather than on the file size. Column types are inferred from the
+        first chunk, unless already known (column_types and date_formats),
+        and applied to every chunk before it is written.
+        Returns the column types.
+        """
+        try:
+            for chunk in pd.read_csv(source, dtype=str, chunksize=chunk_rows):
+                if not column_types:
+                    column_types, date_formats, self.type_confidence = self.infer_column_types(chunk)
+                writer.append(self.apply_column_types(chunk, column_types, date_formats or {}))
+
+            if not column_types:
+                raise ValueError("No data found in file")
+            self.column_types = column_types
+            return column_types
+        except Exception as e:
+            print(f"[DEBUG] Error in ingest_csv: {str(e)}")
+            raise ValueError(f"Error loading data: {str(e)}")
+
+    def describe(self, preview_rows: int = 100) -> Dict[str, Any]:
+        """
+        Columns, column types and the first preview_rows records of the loaded
+        data, as returned to the upload and load-saved-file endpoints. The
+        response stays the same size whatever the file size; further rows are
+        read with get_rows.
+        """
+        return {
+            'columns': list(self.data.columns),
+            'column_types': self.column_types,
+            'type_confidence': self.type_confidence,
+            'data': self.get_rows(limit=preview_rows),
+            'total_rows': len(self.data),
+            'total_columns': len(self.data.columns)
+        }
+
+    def get_rows(self, columns: Optional[List[str]] = None, offset: int = 0,
+                 limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Records of a slice of the loaded data, optionally of only some columns.
+        Only the requested rows and columns are read from the (memory-mapped)
+        columns.
+        """
+        if self.data is None:
+            raise ValueError("No data loaded")
+        columns = columns or list(self.data.columns)
+        missing = [column for column in columns if column not in self.data.columns]
+        if missing:
+            raise ValueError(f"Unknown columns: {', '.join(missing)}")
+        stop = None if limit is None else offset + limit
+        return self.data.iloc[offset:stop][columns].to_dict(orient='records')
+
+    def iter_records(self, chunk_rows: int = 50000):
+        """Yield the records of the loaded data, converting chunk_rows rows at a time"""
+        if self.data is None:
+            raise ValueError("No data loaded")
+        for start in range(0, len(self.data), chunk_rows):
+            yield from self.data.iloc[start:start + chunk_rows].to_dict(orient='records')
+
     def apply_filters(self, filters: List[Dict[str, Any]]) -> pd.DataFrame:
         """
-        Apply filters to the data using pandas query operations
+        Apply filters to the data. Each filter is evaluated to a row mask over
+        the loaded columns, which may be read-only memory-mapped arrays shared
+        between workers; only the matching rows are copied out at the end.
+        With no filters the loaded frame itself is returned - do not modify it.
         """
         if self.data is None:
             raise ValueError("No data loaded")
         
         if not filters:
-            return self.data.copy()
+            return self.data
 
-        filtered_data = self.data.copy()
-        print(f"[DEBUG] Initial data shape: {filtered_data.shape}")
+        mask = np.ones(len(self.data), dtype=bool)
+        print(f"[DEBUG] Initial data shape: {self.data.shape}")
         
         for filter_config in filters:
             try:
@@ -169,17 +242,16 @@ class DataProcessingService:
                 
                 # Handle different column types
                 if self.column_types.get(column) == 'numeric':
-                    # Convert column to numeric if it's not already
-                    filtered_data[column] = pd.to_numeric(filtered_data[column], errors='coerce')
+                    # Numeric view of the column; a no-op for columns that already are numeric
+                    col_data = pd.to_numeric(self.data[column], errors='coerce')
                     
                     if isinstance(value, dict) and operator == 'between':
                         try:
                             min_val = float(value['min'])
                             max_val = float(value['max'])
-                            mask = (filtered_data[column] >= min_val) & (filtered_data[column] <= max_val)
-                            filtered_data = filtered_data[mask]
+                            mask &= ((col_data >= min_val) & (col_data <= max_val)).to_numpy()
                             print(f"[DEBUG] Applied between filter: {min_val} <= {column} <= {max_val}")
-                            print(f"[DEBUG] Remaining rows: {len(filtered_data)}")
+                            print(f"[DEBUG] Remaining rows: {int(mask.sum())}")
                         except (ValueError, KeyError) as e:
                             print(f"[ERROR] Invalid between values: {e}")
                             continue
@@ -188,9 +260,9 @@ class DataProcessingService:
                         try:
                             numeric_values = [float(v) for v in value if v.strip()]
                             if numeric_values:
-                                filtered_data = filtered_data[filtered_data[column].isin(numeric_values)]
+                                mask &= col_data.isin(numeric_values).to_numpy()
                                 print(f"[DEBUG] Applied in filter: {column} in {numeric_values}")
-                                print(f"[DEBUG] Remaining rows: {len(filtered_data)}")
+                                print(f"[DEBUG] Remaining rows: {int(mask.sum())}")
                         except ValueError as e:
                             print(f"[ERROR] Invalid numeric values in list: {e}")
                             continue
@@ -198,76 +270,52 @@ class DataProcessingService:
                     else:
                         try:
                             numeric_value = float(value)
-                            if operator == '==':
-                                filtered_data = filtered_data[filtered_data[column] == numeric_value]
-                            elif operator == '!=':
-                                filtered_data = filtered_data[filtered_data[column] != numeric_value]
-                            elif operator == '>':
-                                filtered_data = filtered_data[filtered_data[column] > numeric_value]
-                            elif operator == '<':
-                                filtered_data = filtered_data[filtered_data[column] < numeric_value]
-                            elif operator == '>=':
-                                filtered_data = filtered_data[filtered_data[column] >= numeric_value]
-                            elif operator == '<=':
-                                filtered_data = filtered_data[filtered_data[column] <= numeric_value]
+                            condition = self.compare(col_data, operator, numeric_value)
+                            if condition is not None:
+                                mask &= condition
                             print(f"[DEBUG] Applied numeric filter: {column} {operator} {numeric_value}")
-                            print(f"[DEBUG] Remaining rows: {len(filtered_data)}")
+                            print(f"[DEBUG] Remaining rows: {int(mask.sum())}")
                         except ValueError as e:
                             print(f"[ERROR] Invalid numeric value: {e}")
                             continue
                 
                 elif self.column_types.get(column) == 'datetime':
                     try:
+                        col_data = self.data[column]
                         if isinstance(value, dict) and operator == 'between':
                             min_val = pd.to_datetime(value['min'])
                             max_val = pd.to_datetime(value['max'])
-                            filtered_data = filtered_data[
-                                (filtered_data[column] >= min_val) & 
-                                (filtered_data[column] <= max_val)
-                            ]
+                            mask &= ((col_data >= min_val) & (col_data <= max_val)).to_numpy()
                         else:
                             value = pd.to_datetime(value)
-                            if operator == '==':
-                                filtered_data = filtered_data[filtered_data[column] == value]
-                            elif operator == '!=':
-                                filtered_data = filtered_data[filtered_data[column] != value]
-                            elif operator == '>':
-                                filtered_data = filtered_data[filtered_data[column] > value]
-                            elif operator == '<':
-                                filtered_data = filtered_data[filtered_data[column] < value]
-                            elif operator == '>=':
-                                filtered_data = filtered_data[filtered_data[column] >= value]
-                            elif operator == '<=':
-                                filtered_data = filtered_data[filtered_data[column] <= value]
+                            condition = self.compare(col_data, operator, value)
+                            if condition is not None:
+                                mask &= condition
                         print(f"[DEBUG] Applied datetime filter: {column} {operator} {value}")
-                        print(f"[DEBUG] Remaining rows: {len(filtered_data)}")
+                        print(f"[DEBUG] Remaining rows: {int(mask.sum())}")
                     except ValueError as e:
                         print(f"[ERROR] Invalid datetime value: {e}")
                         continue
                 
                 else:  # String/categorical
                     try:
+                        col_data = self.data[column]
                         if operator == 'contains':
-                            filtered_data = filtered_data[
-                                filtered_data[column].astype(str).str.contains(str(value), case=False, na=False)
-                            ]
+                            condition = col_data.astype(str).str.contains(str(value), case=False, na=False)
                         elif operator == 'starts_with':
-                            filtered_data = filtered_data[
-                                filtered_data[column].astype(str).str.startswith(str(value), na=False)
-                            ]
+                            condition = col_data.astype(str).str.startswith(str(value), na=False)
                         elif operator == 'ends_with':
-                            filtered_data = filtered_data[
-                                filtered_data[column].astype(str).str.endswith(str(value), na=False)
-                            ]
+                            condition = col_data.astype(str).str.endswith(str(value), na=False)
                         elif operator == 'in':
                             if isinstance(value, str):
                                 value = [v.strip() for v in value.split(',') if v.strip()]
-                            if value:
-                                filtered_data = filtered_data[filtered_data[column].isin(value)]
+                            condition = col_data.isin(value) if value else None
                         else:
-                            filtered_data = filtered_data[filtered_data[column] == value]
+                            condition = col_data == value
+                        if condition is not None:
+                            mask &= condition.to_numpy(dtype=bool)
                         print(f"[DEBUG] Applied string filter: {column} {operator} {value}")
-                        print(f"[DEBUG] Remaining rows: {len(filtered_data)}")
+                        print(f"[DEBUG] Remaining rows: {int(mask.sum())}")
                     except Exception as e:
                         print(f"[ERROR] Error applying string filter: {e}")
                         continue
@@ -276,9 +324,27 @@ class DataProcessingService:
                 print(f"[ERROR] Error applying filter for column {column}: {str(e)}")
                 continue
 
+        filtered_data = self.data[mask]
         print(f"[DEBUG] Final filtered data shape: {filtered_data.shape}")
         return filtered_data
 
+    @staticmethod
+    def compare(col_data: pd.Series, operator: str, value) -> Optional[np.ndarray]:
+        """Row mask of a comparison filter, or None for an unknown operator"""
+        if operator == '==':
+            return (col_data == value).to_numpy()
+        elif operator == '!=':
+            return (col_data != value).to_numpy()
+        elif operator == '>':
+            return (col_data > value).to_numpy()
+        elif operator == '<':
+            return (col_data < value).to_numpy()
+        elif operator == '>=':
+            return (col_data >= value).to_numpy()
+        elif operator == '<=':
+            return (col_data <= value).to_numpy()
+        return None
+
     def get_column_statistics(self, column: str) -> Dict[str, Any]:
         """
         Get statistics for a specific column
@@ -327,31 +393,33 @@ class DataProcessingService:
             raise ValueError("No data available for visualization")
 
         try:
-            # Apply filters first
-            df = self.apply_filters(filters) if filters else self.data.copy()
-            print(f"[DEBUG] Data after applying filters:\n{df.head()}")
-            print(f"[DEBUG] Filtered data shape: {df.shape}")
+            # Apply filters first, then work on a frame of just the two axes
+            # so the (possibly memory-mapped) loaded data is never modified
+            filtered = self.apply_filters(filters)
+            print(f"[DEBUG] Data after applying filters:\n{filtered.head()}")
+            print(f"[DEBUG] Filtered data shape: {filtered.shape}")
+            y_values = filtered[y_axis]
+            if self.column_types.get(y_axis) == 'numeric':
+                # Convert numeric columns to float to handle potential mixed types
+                y_values = pd.to_numeric(y_values, errors='coerce')
+            df = pd.DataFrame({x_axis: filtered[x_axis], y_axis: y_values})
             
             if group_by_x_axis:
                 print(f"[DEBUG] Grouping by X-axis: {x_axis} with aggregation method: {aggregation_method}")
                 
-                # Convert numeric columns to float to handle potential mixed types
-                if self.column_types.get(y_axis) == 'numeric':
-                    df[y_axis] = pd.to_numeric(df[y_axis], errors='coerce')
-                
                 # Define aggregation function based on method
                 if aggregation_method == 'avg':
-                    grouped = df.groupby(x_axis, as_index=False)[y_axis].mean()
+                    grouped = df.groupby(x_axis, as_index=False, observed=True)[y_axis].mean()
                 elif aggregation_method == 'sum':
-                    grouped = df.groupby(x_axis, as_index=False)[y_axis].sum()
+                    grouped = df.groupby(x_axis, as_index=False, observed=True)[y_axis].sum()
                 elif aggregation_method == 'count':
-                    grouped = df.groupby(x_axis, as_index=False)[y_axis].count()
+                    grouped = df.groupby(x_axis, as_index=False, observed=True)[y_axis].count()
                 elif aggregation_method == 'min':
-                    grouped = df.groupby(x_axis, as_index=False)[y_axis].min()
+                    grouped = df.groupby(x_axis, as_index=False, observed=True)[y_axis].min()
                 elif aggregation_method == 'max':
-                    grouped = df.groupby(x_axis, as_index=False)[y_axis].max()
+                    grouped = df.groupby(x_axis, as_index=False, observed=True)[y_axis].max()
                 else:
-                    grouped = df.groupby(x_axis, as_index=False)[y_axis].mean()  # default to mean
+                    grouped = df.groupby(x_axis, as_index=False, observed=True)[y_axis].mean()  # default to mean
                 
                 print(f"[DEBUG] Grouped data ({aggregation_method}):\n{grouped}")
                 
@@ -1,3 +1,203 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from . import dataset_store, views
+from .dataset_store import (
+    COLUMNAR_FORMAT, SCHEMA_FILE, ColumnarWriter, DatasetSessionStore, codes_dtype, dataset_id_for, read_columnar,
+    write_columnar
+)
+from .services import DataProcessingService
+
+
+class DatasetSessionStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def store(self, memory_budget=1024 ** 2):
+        return DatasetSessionStore(self.directory, memory_budget=memory_budget, max_age=3600)
+
+    def put(self, store, dataset_id):
+        return store.put(dataset_id, pd.DataFrame({'store': ['north', 'south']}), {'store': 'categorical'})
+
+    def test_put_maps_datasets(self):
+        store = self.store()
+        entry = self.put(store, 'abc123')
+
+        self.assertEqual(entry.data['store'].tolist(), ['north', 'south'])
+        self.assertEqual(entry.column_types, {'store': 'categorical'})
+        self.assertTrue(store.exists('abc123'))
+        self.assertIs(store.get('abc123'), entry)
+        self.assertIsNone(store.get('def456'))
+        with self.assertRaises(ValueError):
+            store.path('../abc123')
+
+    def test_least_recently_used_datasets_are_evicted(self):
+        store = self.store(memory_budget=0)
+        first = self.put(store, 'abc123')
+        self.put(store, 'def456')
+
+        # The evicted dataset stays on disk and is mapped again
+        reloaded = store.get('abc123')
+        self.assertIsNot(reloaded, first)
+        self.assertEqual(reloaded.data['store'].tolist(), ['north', 'south'])
+
+    def test_unused_datasets_expire(self):
+        store = self.store()
+        self.put(store, 'abc123')
+        os.utime(store.path('abc123'), (0, 0))
+
+        store.purge_expired()
+        self.assertFalse(store.exists('abc123'))
+        self.assertIsNone(store.get('abc123'))
+
+
+class ColumnarDatasetTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.path = os.path.join(self.directory, 'dataset')
+
+    def test_frame_round_trip_is_memory_mapped(self):
+        frame = pd.DataFrame({'qty': [1, 2, 3], 'store': ['b', 'a', None], 'amount': [1.5, np.nan, 3.0]})
+        self.assertTrue(write_columnar(self.path, frame, {'qty': 'numeric', 'store': 'categorical', 'amount': 'numeric'}))
+
+        data, column_types, type_confidence = read_columnar(self.path)
+        self.assertEqual(list(data.columns), ['qty', 'store', 'amount'])
+        self.assertEqual(data['qty'].tolist(), [1, 2, 3])
+        np.testing.assert_array_equal(data['amount'], [1.5, np.nan, 3.0])
+        self.assertEqual(data['store'].iloc[:2].tolist(), ['b', 'a'])
+        self.assertTrue(pd.isna(data['store'].iloc[2]))
+        self.assertIsInstance(data['qty'].to_numpy(copy=False), np.memmap)
+        self.assertEqual(column_types['store'], 'categorical')
+        self.assertEqual(type_confidence, {})
+
+    def test_existing_dataset_is_kept(self):
+        self.assertTrue(write_columnar(self.path, pd.DataFrame({'qty': [1]}), {'qty': 'numeric'}))
+        self.assertFalse(write_columnar(self.path, pd.DataFrame({'qty': [2]}), {'qty': 'numeric'}))
+        self.assertEqual(read_columnar(self.path)[0]['qty'].tolist(), [1])
+
+    def test_missing_or_outdated_datasets_are_not_read(self):
+        self.assertIsNone(read_columnar(self.path))
+
+        os.makedirs(self.path)
+        with open(os.path.join(self.path, SCHEMA_FILE), 'w') as f:
+            json.dump({'format': COLUMNAR_FORMAT - 1, 'rows': 0, 'columns': []}, f)
+        self.assertIsNone(read_columnar(self.path))
+
+    def test_codes_dtype(self):
+        self.assertEqual(codes_dtype(10), np.int8)
+        self.assertEqual(codes_dtype(200), np.int16)
+        self.assertEqual(codes_dtype(40000), np.int32)
+
+    def test_dataset_id_is_the_same_for_text_bytes_and_chunks(self):
+        content = 'date,qty\n2024-01-01,1\n'
+        self.assertEqual(dataset_id_for(content), dataset_id_for(content.encode()))
+        self.assertEqual(dataset_id_for(iter([b'date,qty\n', b'2024-01-01,1\n'])), dataset_id_for(content))
+
+
+class CsvIngestionTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.path = os.path.join(self.directory, 'dataset')
+
+    def test_chunks_round_trip(self):
+        writer = ColumnarWriter(self.path)
+        writer.append(pd.DataFrame({'qty': [1, 2], 'store': ['b', 'a'], 'amount': [1.5, 2.5]}))
+        # qty gains a fraction and a gap: the rows already written are widened to float
+        writer.append(pd.DataFrame({'qty': [3.5, np.nan], 'store': ['c', None], 'amount': [3.0, 4.0]}))
+        self.assertTrue(writer.close({'qty': 'numeric', 'store': 'categorical', 'amount': 'numeric'}, {'qty': 1.0}))
+
+        data, column_types, type_confidence = read_columnar(self.path)
+        np.testing.assert_array_equal(data['qty'], [1.0, 2.0, 3.5, np.nan])
+        np.testing.assert_array_equal(data['amount'], [1.5, 2.5, 3.0, 4.0])
+        self.assertEqual(list(data['store'].cat.categories), ['a', 'b', 'c'])
+        self.assertEqual(data['store'].iloc[:3].tolist(), ['b', 'a', 'c'])
+        self.assertTrue(pd.isna(data['store'].iloc[3]))
+        self.assertEqual(data['store'].cat.codes.dtype, np.int8)
+        self.assertEqual(type_confidence, {'qty': 1.0})
+
+    def test_rejects_chunks_with_other_columns(self):
+        writer = ColumnarWriter(self.path)
+        writer.append(pd.DataFrame({'qty': [1]}))
+        with self.assertRaises(ValueError):
+            writer.append(pd.DataFrame({'amount': [1]}))
+        writer.abort()
+        self.assertFalse(os.path.exists(writer.tmp_dir))
+
+    def test_ingest_csv_infers_from_first_chunk(self):
+        service = DataProcessingService()
+        writer = ColumnarWriter(self.path)
+        csv = 'day,qty,store\n13/01/2024,1,a\n14/01/2024,2,b\n15/01/2024,3.5,a\n'
+        column_types = service.ingest_csv(io.StringIO(csv), writer, chunk_rows=2)
+        writer.close(column_types, service.type_confidence)
+
+        data = read_columnar(self.path)[0]
+        self.assertEqual(column_types, {'day': 'date', 'qty': 'numeric', 'store': 'categorical'})
+        self.assertEqual(data['day'].tolist(), ['2024-01-13', '2024-01-14', '2024-01-15'])
+        np.testing.assert_array_equal(data['qty'], [1.0, 2.0, 3.5])
+        self.assertEqual(data['store'].tolist(), ['a', 'b', 'a'])
+
+    def test_uploaded_rows_are_read_in_pages(self):
+        self.addCleanup(setattr, dataset_store, '_store', dataset_store._store)
+        dataset_store._store = None
+        factory = RequestFactory()
+        session = {}
+        csv = 'day,qty\n' + ''.join(f'2024-01-{day:02d},{day}\n' for day in range(1, 11))
+
+        with override_settings(BUISINT_DATASET_DIR=self.directory, BUISINT_PREVIEW_ROWS=3):
+            request = factory.post('/', {'file': SimpleUploadedFile('sales.csv', csv.encode())})
+            request.session = session
+            upload = json.loads(views.upload_data(request).content)['data']
+
+            request = factory.get('/', {'columns': 'qty', 'offset': 8, 'limit': 5})
+            request.session = session
+            rows = json.loads(views.get_dataset_rows(request).content)['data']
+
+        self.assertEqual((len(upload['data']), upload['total_rows']), (3, 10))
+        self.assertEqual(rows['dataset_id'], upload['dataset_id'])
+        self.assertEqual(rows['rows'], [{'qty': 9}, {'qty': 10}])
+
+
+class ColumnTypeInferenceTests(SimpleTestCase):
+    def setUp(self):
+        self.service = DataProcessingService()
+
+    def test_infers_types_formats_and_confidence(self):
+        sample = pd.DataFrame({
+            'amount': ['1', '2.5', '3'],
+            'day': ['13/01/2024', '14/01/2024', '15/01/2024'],
+            'iso': ['2024-01-01', '2024-01-02', '2024-01-03'],
+            'name': ['north', 'south', 'east'],
+            'empty': [None, None, None],
+        }, dtype=object)
+        column_types, date_formats, confidence = self.service.infer_column_types(sample)
+
+        self.assertEqual(column_types, {
+            'amount': 'numeric', 'day': 'date', 'iso': 'date', 'name': 'categorical', 'empty': 'categorical'
+        })
+        self.assertEqual(date_formats, {'day': '%d/%m/%Y', 'iso': '%Y-%m-%d'})
+        self.assertEqual(confidence['amount'], 1.0)
+        self.assertEqual(confidence['name'], 1.0)
+        self.assertEqual(confidence['empty'], 0.0)
+
+    def test_tolerates_a_few_bad_values(self):
+        sample = pd.DataFrame({'amount': [str(value) for value in range(19)] + ['n/a']})
+        column_types, _, confidence = self.service.infer_column_types(sample)
+        self.assertEqual(column_types['amount'], 'numeric')
+        self.assertEqual(confidence['amount'], 0.95)
+
+    def test_picks_the_format_that_parses(self):
+        # Day 31 rules out DD/MM, which would otherwise win the tie
+        sample = pd.DataFrame({'day': ['01/31/2024', '02/28/2024', '03/01/2024']})
+        _, date_formats, _ = self.service.infer_column_types(sample)
+        self.assertEqual(date_formats['day'], '%m/%d/%Y')
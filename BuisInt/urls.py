@@ -12,6 +12,7 @@ urlpatterns = [
     path('api/column-stats/', views.get_column_stats, name='api_column_stats'),
     path('api/visualization-data/', views.get_visualization_data, name='api_visualization_data'),
     path('api/apply-filters/', views.apply_filters, name='api_apply_filters'),
+    path('api/dataset-rows/', views.get_dataset_rows, name='api_dataset_rows'),
     path('api/save-file/', views.save_file, name='api_save_file'),
     path('api/load-saved-file/', views.load_saved_file, name='api_load_saved_file'),
     path('api/get-saved-files/', views.get_saved_files, name='api_get_saved_files'),
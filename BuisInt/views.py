@@ -8,14 +8,85 @@ from datetime import timedelta
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+import io
 import json
+import logging
+import pandas as pd
+from django.conf import settings
 from .services import DataProcessingService
+from .dataset_store import SESSION_DATASET_KEY, dataset_id_for, get_dataset_store
+from forecasting.datasets import load_dataset, store_dataset
 from django.core.cache import cache
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-# Create a singleton instance of the data processing service
-data_service = DataProcessingService()
+logger = logging.getLogger(__name__)
+
+
+def get_data_service(request):
+    """
+    DataProcessingService over the dataset of the requesting user's session.
+    Datasets live in the shared dataset store rather than in one global
+    service, so concurrent users and separate worker processes all see the
+    data of the session that loaded it.
+    """
+    data_service = DataProcessingService()
+    dataset_id = request.session.get(SESSION_DATASET_KEY)
+    if dataset_id:
+        entry = get_dataset_store().get(dataset_id)
+        if entry is not None:
+            data_service.dataset_id = dataset_id
+            data_service.data = entry.data
+            data_service.column_types = entry.column_types
+            data_service.type_confidence = entry.type_confidence
+    return data_service
+
+def open_dataset(request, source, column_types=None, type_confidence=None):
+    """
+    Make an uploaded file (or saved CSV text) the session's dataset. A file
+    already ingested by any worker is memory-mapped from the dataset store
+    together with its inferred schema; otherwise it is streamed into the
+    store chunk by chunk. Passing the column_types of a saved file skips
+    type inference altogether.
+    """
+    store = get_dataset_store()
+    if isinstance(source, str):
+        dataset_id = dataset_id_for(source)
+    else:
+        dataset_id = dataset_id_for(source.chunks())
+        source.seek(0)
+
+    entry = store.get(dataset_id)
+    if entry is None:
+        ingest_service = DataProcessingService()
+        ingest_service.type_confidence = type_confidence or {}
+        # Saved files were written with dates already normalised to YYYY-MM-DD
+        date_formats = {
+            column: '%Y-%m-%d' for column, column_type in (column_types or {}).items() if column_type == 'date'
+        }
+        writer = store.writer(dataset_id)
+        try:
+            ingest_service.ingest_csv(
+                io.StringIO(source) if isinstance(source, str) else source,
+                writer,
+                chunk_rows=getattr(settings, 'BUISINT_CSV_CHUNK_ROWS', 50000),
+                column_types=column_types,
+                date_formats=date_formats
+            )
+        except Exception:
+            writer.abort()
+            raise
+        entry = store.commit(dataset_id, writer, ingest_service.column_types, ingest_service.type_confidence)
+    else:
+        logger.debug(f"Dataset {dataset_id} already parsed, using the shared copy")
+
+    request.session[SESSION_DATASET_KEY] = dataset_id
+    data_service = DataProcessingService()
+    data_service.dataset_id = dataset_id
+    data_service.data = entry.data
+    data_service.column_types = entry.column_types
+    data_service.type_confidence = entry.type_confidence
+    return data_service
 
 # Create your views here.
 
@@ -59,8 +130,11 @@ def add_data(request):
 def upload_data(request):
     """Handle CSV file upload and initial data processing"""
     try:
-        file_content = request.FILES['file'].read().decode('utf-8')
-        result = data_service.load_data(file_content)
+        # Streamed into the dataset store in chunks rather than read into memory whole;
+        # the response carries a preview, further rows come from get_dataset_rows
+        data_service = open_dataset(request, request.FILES['file'])
+        result = data_service.describe(getattr(settings, 'BUISINT_PREVIEW_ROWS', 100))
+        result['dataset_id'] = data_service.dataset_id
         return JsonResponse({
             'status': 'success',
             'data': result
@@ -81,7 +155,7 @@ def get_column_stats(request):
         if not column:
             raise ValueError("Column name is required")
 
-        stats = data_service.get_column_statistics(column)
+        stats = get_data_service(request).get_column_statistics(column)
         return JsonResponse({
             'status': 'success',
             'data': stats
@@ -119,6 +193,8 @@ def get_visualization_data(request):
                 'message': 'X-axis and Y-axis columns are required.'
             }, status=400)
 
+        data_service = get_data_service(request)
+
         try:
             # Get visualization data with filters and grouping
             visualization_data = data_service.get_data_for_visualization(
@@ -173,7 +249,7 @@ def apply_filters(request):
         data = json.loads(request.body)
         filters = data.get('filters', [])
         
-        filtered_data = data_service.apply_filters(filters)
+        filtered_data = get_data_service(request).apply_filters(filters)
         
         return JsonResponse({
             'status': 'success',
@@ -188,6 +264,41 @@ def apply_filters(request):
             'message': str(e)
         }, status=400)
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def get_dataset_rows(request):
+    """
+    Rows of the session's dataset, read from the dataset store: a page of the
+    preview table (offset/limit), or only the columns a forecast needs
+    (columns, comma-separated) without a limit
+    """
+    try:
+        data_service = get_data_service(request)
+        if data_service.data is None:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'No data loaded'
+            }, status=400)
+
+        columns = [column for column in request.GET.get('columns', '').split(',') if column]
+        offset = max(0, int(request.GET.get('offset', 0)))
+        limit = request.GET.get('limit')
+        rows = data_service.get_rows(columns or None, offset, int(limit) if limit else None)
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'rows': rows,
+                'offset': offset,
+                'total_rows': len(data_service.data),
+                'dataset_id': data_service.dataset_id
+            }
+        })
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def save_file(request):
@@ -209,24 +320,30 @@ def save_file(request):
                 'message': 'Filename is required'
             }, status=400)
 
-        # Get current data from the service
+        # Get the session's current data
+        data_service = get_data_service(request)
         if data_service.data is None:
             return JsonResponse({
                 'status': 'error',
                 'message': 'No data to save'
             }, status=400)
 
-        # Convert DataFrame to CSV string
-        csv_content = data_service.data.to_csv(index=False)
+        # The records are kept once, in the shared dataset store, where forecasts
+        # run on this data reference the same dataset instead of another copy.
+        # Records are streamed in chunks rather than built into one list
+        dataset_id = store_dataset(
+            data_service.iter_records(getattr(settings, 'BUISINT_CSV_CHUNK_ROWS', 50000))
+        )
         
         # Create new UserFile document
         user_file = UserFile(
             user_id=request.user.id,
             username=request.user.username,
             filename=filename,
-            file_content=csv_content,
             column_types=data_service.column_types,
-            description=description
+            type_confidence=data_service.type_confidence,
+            description=description,
+            dataset_id=dataset_id
         )
         user_file.save()
 
@@ -265,14 +382,28 @@ def load_saved_file(request):
         # Get the file from MongoDB
         user_file = UserFile.objects.get(id=file_id, user_id=request.user.id)
         
-        # Convert the saved data back to CSV format
-        csv_content = user_file.file_content
+        # Convert the saved data back to CSV format; files saved before the
+        # dataset store embed their CSV instead
+        if user_file.file_content:
+            csv_content = user_file.file_content
+        else:
+            records = load_dataset(user_file.dataset_id)
+            # Stored records have sorted keys; the saved schema keeps the file's column order
+            columns = list(user_file.column_types) or None
+            csv_content = pd.DataFrame.from_records(records, columns=columns).to_csv(index=False)
         
         print(f"Loading file: {user_file.filename}")  # Debug log
         print(f"CSV content length: {len(csv_content)}")  # Debug log
         
         # Process the CSV data as if it was newly uploaded
-        result = data_service.load_data(csv_content)
+        # The schema inferred at upload is reused; the file is never re-inferred
+        data_service = open_dataset(
+            request, csv_content,
+            column_types=user_file.column_types or None,
+            type_confidence=user_file.type_confidence
+        )
+        result = data_service.describe(getattr(settings, 'BUISINT_PREVIEW_ROWS', 100))
+        result['dataset_id'] = data_service.dataset_id
         
         print(f"Load data result: {result}")  # Debug log
         
@@ -308,9 +439,11 @@ def load_saved_file(request):
             'data': result.get('data', []),
             'columns': columns,
             'column_types': result.get('column_types', {}),
+            'type_confidence': result.get('type_confidence', {}),
             'column_stats': column_stats,
             'total_rows': result.get('total_rows', 0),
-            'total_columns': result.get('total_columns', 0)
+            'total_columns': result.get('total_columns', 0),
+            'dataset_id': result.get('dataset_id')
         }
         
         print(f"Response data prepared: {response_data}")  # Debug log
@@ -130,6 +130,63 @@ try:
 except Exception as e:
     print(f"MongoDB connection failed: {e}")
 
+# Forecast job queue (see `manage.py run_forecast_worker`)
+FORECAST_WORKER_CONCURRENCY = config('FORECAST_WORKER_CONCURRENCY', default=2, cast=int)
+FORECAST_WORKER_POLL_INTERVAL = config('FORECAST_WORKER_POLL_INTERVAL', default=2.0, cast=float)
+FORECAST_JOB_TIMEOUT = config('FORECAST_JOB_TIMEOUT', default=1800, cast=int)
+
+# Executor used for model fits: 'inline' (calling thread), 'thread' or 'process'.
+# FORECAST_EXECUTOR_WORKERS=0 sizes the pool to the number of CPU cores.
+FORECAST_EXECUTOR = config('FORECAST_EXECUTOR', default='inline')
+FORECAST_EXECUTOR_WORKERS = config('FORECAST_EXECUTOR_WORKERS', default=0, cast=int)
+FORECAST_THREADS_PER_TASK = config('FORECAST_THREADS_PER_TASK', default=1, cast=int)
+
+# Forecasting backends (TensorFlow, Prophet, statsmodels) are imported on first
+# use. List methods here (e.g. "prophet,arima") to preload them when a process starts.
+FORECAST_PRELOAD_METHODS = config('FORECAST_PRELOAD_METHODS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+
+# Fitted-model cache: in-memory LRU per process plus an on-disk tier shared by
+# all workers. Set FORECAST_MODEL_CACHE_DIR to an empty string to keep it in memory only.
+FORECAST_MODEL_CACHE_ENABLED = config('FORECAST_MODEL_CACHE_ENABLED', default=True, cast=bool)
+FORECAST_MODEL_CACHE_SIZE = config('FORECAST_MODEL_CACHE_SIZE', default=32, cast=int)
+FORECAST_MODEL_CACHE_DIR = config('FORECAST_MODEL_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'models'))
+FORECAST_MODEL_CACHE_MAX_BYTES = config('FORECAST_MODEL_CACHE_MAX_BYTES', default=1024 ** 3, cast=int)
+
+# Durable per-forecast store of fitted models used by the re-forecast endpoint
+FORECAST_MODEL_STORE_DIR = config('FORECAST_MODEL_STORE_DIR', default=str(BASE_DIR / 'model_store'))
+
+# Time budget in seconds for automatic ARIMA order selection (parameters.auto_order)
+FORECAST_ARIMA_SEARCH_TIMEOUT = config('FORECAST_ARIMA_SEARCH_TIMEOUT', default=60, cast=float)
+# Threads fitting ARIMA search candidates per process (0: min(4, CPU cores))
+FORECAST_ARIMA_SEARCH_WORKERS = config('FORECAST_ARIMA_SEARCH_WORKERS', default=0, cast=int)
+
+# Store forecast arrays in MongoDB as packed binary (float32 or float64) and
+# regular forecast dates as start plus frequency instead of element lists
+FORECAST_PACKED_ARRAYS = config('FORECAST_PACKED_ARRAYS', default=False, cast=bool)
+FORECAST_PACKED_DTYPE = config('FORECAST_PACKED_DTYPE', default='float64')
+
+# Replacement of NaN/Inf in forecast outputs before they are saved:
+# zero, ffill, interpolate, or raise to fail the forecast instead
+FORECAST_NAN_POLICY = config('FORECAST_NAN_POLICY', default='zero')
+
+# Trace allocations with tracemalloc to record each stage's peak memory in the
+# forecast timings (peak_alloc_mb); off by default as tracing slows fits
+FORECAST_PROFILE_MEMORY = config('FORECAST_PROFILE_MEMORY', default=False, cast=bool)
+
+# Uploaded datasets (BuisInt): each file is parsed once and written to a
+# columnar directory under BUISINT_DATASET_DIR that every worker memory-maps
+# read-only. Open datasets are kept per process up to this many private bytes
+# (least recently used evicted) and removed from disk after BUISINT_DATASET_MAX_AGE
+BUISINT_DATASET_DIR = config('BUISINT_DATASET_DIR', default=str(BASE_DIR / 'cache' / 'datasets'))
+BUISINT_DATASET_MEMORY_BYTES = config('BUISINT_DATASET_MEMORY_BYTES', default=512 * 1024 ** 2, cast=int)
+BUISINT_DATASET_MAX_AGE = config('BUISINT_DATASET_MAX_AGE', default=24 * 3600, cast=int)
+# Rows parsed at a time when an uploaded CSV is streamed into the dataset store;
+# column types are inferred from the first chunk
+BUISINT_CSV_CHUNK_ROWS = config('BUISINT_CSV_CHUNK_ROWS', default=50000, cast=int)
+# Rows returned with an upload or a loaded file; the rest are read page by page
+# from the dataset store (api/dataset-rows/)
+BUISINT_PREVIEW_ROWS = config('BUISINT_PREVIEW_ROWS', default=100, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ForecastingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'forecasting'
+
+    def ready(self):
+        # Modelling backends load lazily on first use; workers that should pay
+        # the import cost up front list their methods in FORECAST_PRELOAD_METHODS
+        preload = getattr(settings, 'FORECAST_PRELOAD_METHODS', [])
+        if preload:
+            from . import services  # noqa: F401 - registers the forecasting methods
+            from .registry import warm_up
+            warm_up(preload)
@@ -0,0 +1,210 @@
+"""
+Vectorised baseline forecasters.
+
+Every function works on a 2D array of shape (n_series, n_obs) so thousands of
+equal-length series are forecast with one set of array operations. Each
+returns the point forecast (n_series, horizon), the one-step-ahead in-sample
+fitted values (n_series, n_obs, NaN where undefined) and the interval
+half-width multiplier per horizon step in units of the residual std.
+"""
+import numpy as np
+from typing import Any, Dict, Tuple
+
+BASELINE_METHODS = {
+    'naive': 'Naive',
+    'seasonal_naive': 'Seasonal Naive',
+    'moving_average': 'Moving Average',
+    'ses': 'Simple Exponential Smoothing',
+    'holt': 'Holt Linear Trend',
+    'holt_winters': 'Holt-Winters',
+    'drift': 'Drift',
+}
+
+
+def _steps(horizon: int) -> np.ndarray:
+    return np.arange(1, horizon + 1, dtype=float)
+
+
+def naive(values: np.ndarray, horizon: int, parameters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Repeat the last observation"""
+    forecast = np.repeat(values[:, -1:], horizon, axis=1)
+    fitted = np.full(values.shape, np.nan)
+    fitted[:, 1:] = values[:, :-1]
+    return forecast, fitted, np.sqrt(_steps(horizon))
+
+
+def seasonal_naive(values: np.ndarray, horizon: int, parameters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Repeat the last observed season"""
+    season_length = int(parameters.get('season_length', 7))
+    n_obs = values.shape[1]
+    if season_length < 1 or season_length >= n_obs:
+        raise ValueError(f"season_length must be between 1 and {n_obs - 1}")
+
+    last_season = values[:, n_obs - season_length:]
+    forecast = last_season[:, np.arange(horizon) % season_length]
+    fitted = np.full(values.shape, np.nan)
+    fitted[:, season_length:] = values[:, :-season_length]
+    return forecast, fitted, np.sqrt(np.floor((_steps(horizon) - 1) / season_length) + 1)
+
+
+def moving_average(values: np.ndarray, horizon: int, parameters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flat forecast at the mean of the last `window` observations"""
+    window = int(parameters.get('window', 7))
+    n_obs = values.shape[1]
+    if window < 1 or window > n_obs:
+        raise ValueError(f"window must be between 1 and {n_obs}")
+
+    cumsum = np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)], axis=1)
+    means = (cumsum[:, window:] - cumsum[:, :-window]) / window
+    forecast = np.repeat(means[:, -1:], horizon, axis=1)
+    fitted = np.full(values.shape, np.nan)
+    fitted[:, window:] = means[:, :-1]
+    return forecast, fitted, np.sqrt(1 + _steps(horizon) / window)
+
+
+def ses(values: np.ndarray, horizon: int, parameters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Simple exponential smoothing"""
+    alpha = float(parameters.get('alpha', 0.3))
+    fitted = np.full(values.shape, np.nan)
+    level = values[:, 0].copy()
+    for t in range(1, values.shape[1]):
+        fitted[:, t] = level
+        level = alpha * values[:, t] + (1 - alpha) * level
+
+    forecast = np.repeat(level[:, None], horizon, axis=1)
+    return forecast, fitted, np.sqrt(1 + (_steps(horizon) - 1) * alpha ** 2)
+
+
+def holt(values: np.ndarray, horizon: int, parameters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Holt's linear trend method"""
+    alpha = float(parameters.get('alpha', 0.3))
+    beta = float(parameters.get('beta', 0.1))
+    fitted = np.full(values.shape, np.nan)
+    level = values[:, 0].copy()
+    trend = values[:, 1] - values[:, 0]
+    for t in range(1, values.shape[1]):
+        fitted[:, t] = level + trend
+        previous_level = level
+        level = alpha * values[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+
+    forecast = level[:, None] + trend[:, None] * _steps(horizon)[None, :]
+    return forecast, fitted, np.sqrt(_steps(horizon))
+
+
+def holt_winters(values: np.ndarray, horizon: int, parameters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Additive Holt-Winters (level, trend and seasonality)"""
+    alpha = float(parameters.get('alpha', 0.3))
+    beta = float(parameters.get('beta', 0.1))
+    gamma = float(parameters.get('gamma', 0.1))
+    season_length = int(parameters.get('season_length', 7))
+    n_obs = values.shape[1]
+    if season_length < 2 or n_obs < 2 * season_length:
+        raise ValueError(f"Holt-Winters needs season_length >= 2 and at least two full seasons ({2 * season_length} points)")
+
+    # Initialise from the first two seasons
+    first_season = values[:, :season_length]
+    second_season = values[:, season_length:2 * season_length]
+    level = first_season.mean(axis=1)
+    trend = (second_season.mean(axis=1) - level) / season_length
+    seasonal = first_season - level[:, None]
+
+    fitted = np.full(values.shape, np.nan)
+    for t in range(season_length, n_obs):
+        s = t % season_length
+        fitted[:, t] = level + trend + seasonal[:, s]
+        previous_level = level
+        level = alpha * (values[:, t] - seasonal[:, s]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+        seasonal[:, s] = gamma * (values[:, t] - level) + (1 - gamma) * seasonal[:, s]
+
+    steps = _steps(horizon)
+    season_index = (n_obs + np.arange(horizon)) % season_length
+    forecast = level[:, None] + trend[:, None] * steps[None, :] + seasonal[:, season_index]
+    return forecast, fitted, np.sqrt(steps)
+
+
+def drift(values: np.ndarray, horizon: int, parameters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Extend the line between the first and last observations"""
+    n_obs = values.shape[1]
+    slope = (values[:, -1] - values[:, 0]) / (n_obs - 1)
+    steps = _steps(horizon)
+    forecast = values[:, -1:] + slope[:, None] * steps[None, :]
+    fitted = np.full(values.shape, np.nan)
+    fitted[:, 1:] = values[:, :-1] + slope[:, None]
+    return forecast, fitted, np.sqrt(steps * (1 + steps / (n_obs - 1)))
+
+
+BASELINE_FUNCTIONS = {
+    'naive': naive,
+    'seasonal_naive': seasonal_naive,
+    'moving_average': moving_average,
+    'ses': ses,
+    'holt': holt,
+    'holt_winters': holt_winters,
+    'drift': drift,
+}
+
+
+def evaluate_batch(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Row-wise version of ForecastingService.evaluate_model for 2D arrays.
+    NaN predictions (undefined warm-up steps) are excluded; undefined metrics become 0.
+    """
+    mask = ~np.isnan(y_pred)
+    n = mask.sum(axis=1).astype(float)
+    errors = np.where(mask, y_true - y_pred, 0.0)
+    true_masked = np.where(mask, y_true, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mse = (errors ** 2).sum(axis=1) / n
+        mae = np.abs(errors).sum(axis=1) / n
+        true_mean = true_masked.sum(axis=1) / n
+        total_ss = (np.where(mask, y_true - true_mean[:, None], 0.0) ** 2).sum(axis=1)
+        r2 = 1 - (errors ** 2).sum(axis=1) / total_ss
+        ape = np.where(mask, np.abs(errors / y_true), 0.0)
+        mape = np.where(np.isfinite(ape).all(axis=1), ape.sum(axis=1) / n * 100, 0.0)
+        adjusted_r2 = np.where(n > 2, 1 - (1 - r2) * (n - 1) / (n - 2), r2)
+        error_mean = errors.sum(axis=1) / n
+        residual_var = (np.where(mask, errors - error_mean[:, None], 0.0) ** 2).sum(axis=1) / n
+        true_var = total_ss / n
+        variance_explained = np.where(
+            true_var == 0, np.where(residual_var == 0, 1.0, 0.0), 1 - residual_var / true_var
+        )
+
+    metrics = {
+        'mse': mse,
+        'rmse': np.sqrt(mse),
+        'mae': mae,
+        'r2': r2,
+        'mape': mape,
+        'adjusted_r2': adjusted_r2,
+        'variance_explained': variance_explained
+    }
+    return {name: np.where(np.isfinite(value), value, 0.0) for name, value in metrics.items()}
+
+
+def baseline_forecast(method: str, values: np.ndarray, horizon: int,
+                      parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Forecast every row of values with a baseline method.
+    Returns the forecast, 95% interval bounds and row-wise in-sample metrics.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    if values.shape[1] < 2:
+        raise ValueError("Baseline forecasts need at least two observations per series")
+
+    forecast, fitted, spread = BASELINE_FUNCTIONS[method](values, horizon, parameters)
+
+    residuals = values - fitted
+    with np.errstate(invalid='ignore'):
+        residual_std = np.nanstd(residuals, axis=1)
+    residual_std = np.where(np.isfinite(residual_std), residual_std, 0.0)
+    half_width = 1.96 * residual_std[:, None] * spread[None, :]
+
+    return {
+        'forecast': forecast,
+        'lower': forecast - half_width,
+        'upper': forecast + half_width,
+        'metrics': evaluate_batch(values, fitted)
+    }
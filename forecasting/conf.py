@@ -0,0 +1,53 @@
+import os
+from typing import Any, Dict, Optional
+
+# Settings handed to a spawned pool worker by its initializer (see
+# executors.init_worker_process); they take precedence over Django settings
+_worker_settings: Optional[Dict[str, Any]] = None
+
+# Prefix of the settings the service layer reads
+SETTING_PREFIX = 'FORECAST_'
+
+
+def get_setting(name: str, default):
+    """
+    Read a forecasting setting. Pool workers use the values resolved in the
+    parent process; elsewhere Django settings are read whenever they are
+    configured or DJANGO_SETTINGS_MODULE points at them (which also covers
+    spawned children, where settings are not loaded until first accessed).
+    Plain scripts without Django get the default.
+    """
+    if _worker_settings is not None and name in _worker_settings:
+        return _worker_settings[name]
+    try:
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+    except ImportError:
+        return default
+    if not settings.configured and not os.environ.get('DJANGO_SETTINGS_MODULE'):
+        return default
+    try:
+        return getattr(settings, name, default)
+    except ImproperlyConfigured:
+        return default
+
+
+def resolved_settings() -> Dict[str, Any]:
+    """All FORECAST_* settings of this process, to hand to pool workers"""
+    try:
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+    except ImportError:
+        return dict(_worker_settings or {})
+    try:
+        if settings.configured or os.environ.get('DJANGO_SETTINGS_MODULE'):
+            return {name: getattr(settings, name) for name in dir(settings) if name.startswith(SETTING_PREFIX)}
+    except ImproperlyConfigured:
+        pass
+    return dict(_worker_settings or {})
+
+
+def use_worker_settings(values: Optional[Dict[str, Any]]):
+    """Install the settings a pool worker received from its parent"""
+    global _worker_settings
+    _worker_settings = dict(values) if values is not None else None
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import math
+import zlib
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+from mongoengine.errors import NotUniqueError
+
+from .mongodb_models import DatasetDocument
+
+logger = logging.getLogger(__name__)
+
+# Compressed payloads above this size go to GridFS, well clear of MongoDB's 16MB document limit
+MAX_INLINE_PAYLOAD_BYTES = 8 * 1024 ** 2
+
+
+def normalise_value(value: Any) -> Any:
+    """
+    Canonical JSON value. Integral floats become ints and NaN/inf become None,
+    so records that went through a browser's JSON round trip hash the same as
+    the pandas records they came from.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def series_key(value: Any) -> str:
+    """
+    Series id of a batch series column value. Values are normalised as the
+    dataset store does, so the id of a series matches its records after they
+    are stored (a float 1.0 and the stored int 1 are both '1').
+    """
+    return str(normalise_value(value))
+
+
+def normalise_record(record: Dict) -> bytes:
+    """Serialise one record to canonical JSON bytes (sorted keys, compact separators)"""
+    normalised = {str(key): normalise_value(value) for key, value in record.items()}
+    return json.dumps(normalised, sort_keys=True, separators=(',', ':'), default=str).encode()
+
+
+def normalise_records(records: Iterable[Dict]) -> bytes:
+    """Serialise records to canonical JSON bytes (a compact JSON list)"""
+    return b'[' + b','.join(normalise_record(record) for record in records) + b']'
+
+
+def dataset_id_for(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def store_dataset(records: Iterable[Dict]) -> str:
+    """
+    Store records in the content-addressed dataset store and return their id.
+    Records already present (same normalised content) are not written again.
+
+    records may be any iterable (e.g. a generator over a large frame): they
+    are hashed and compressed one at a time, so only the compressed payload is
+    held in memory, never the full record list or its JSON.
+    """
+    hasher = hashlib.sha256()
+    compressor = zlib.compressobj(6)
+    compressed = []
+    columns = set()
+    row_count = 0
+    size_bytes = 0
+
+    def feed(fragment: bytes):
+        nonlocal size_bytes
+        hasher.update(fragment)
+        compressed.append(compressor.compress(fragment))
+        size_bytes += len(fragment)
+
+    feed(b'[')
+    for record in records:
+        if row_count:
+            feed(b',')
+        feed(normalise_record(record))
+        if row_count < 1000:
+            columns.update(str(key) for key in record)
+        row_count += 1
+    feed(b']')
+    dataset_id = hasher.hexdigest()
+
+    if DatasetDocument.objects(dataset_id=dataset_id).only('dataset_id').first():
+        logger.debug(f"Dataset {dataset_id[:12]} already stored")
+        return dataset_id
+
+    compressed.append(compressor.flush())
+    payload = b''.join(compressed)
+    dataset = DatasetDocument(
+        dataset_id=dataset_id,
+        row_count=row_count,
+        columns=sorted(columns),
+        size_bytes=size_bytes
+    )
+    if len(payload) <= MAX_INLINE_PAYLOAD_BYTES:
+        dataset.payload = payload
+    else:
+        dataset.payload_file.put(payload, content_type='application/zlib')
+
+    try:
+        dataset.save()
+        logger.info(
+            f"Stored dataset {dataset_id[:12]}: {row_count} rows, "
+            f"{size_bytes} bytes -> {len(payload)} compressed"
+        )
+    except NotUniqueError:
+        # Another request stored the same content concurrently
+        if dataset.payload_file:
+            dataset.payload_file.delete()
+    return dataset_id
+
+
+def load_dataset(dataset_id: str) -> List[Dict]:
+    """Load the records of a stored dataset"""
+    dataset = DatasetDocument.objects(dataset_id=dataset_id).first()
+    if dataset is None:
+        raise ValueError(f"Dataset {dataset_id} not found")
+
+    compressed = dataset.payload if dataset.payload else dataset.payload_file.read()
+    return json.loads(zlib.decompress(compressed))
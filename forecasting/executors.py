@@ -0,0 +1,150 @@
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .conf import get_setting, resolved_settings, use_worker_settings
+
+logger = logging.getLogger(__name__)
+
+# Environment variables honoured by the BLAS/OpenMP runtimes and TensorFlow
+THREAD_LIMIT_ENV_VARS = [
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+    'TF_NUM_INTRAOP_THREADS',
+    'TF_NUM_INTEROP_THREADS',
+]
+
+EXECUTOR_KINDS = ['inline', 'thread', 'process']
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Separate bounded pool for sub-tasks of a fit (ARIMA order candidates); a fit
+# already occupies a slot of the shared executor, so it never submits there
+_search_executor = None
+_search_executor_lock = threading.Lock()
+
+
+class InlineExecutor(Executor):
+    """Executor that runs tasks synchronously in the calling thread"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def limit_cpu_threads(threads: int):
+    """Cap the number of CPU threads used by TensorFlow and BLAS in this process"""
+    threads = str(max(1, int(threads)))
+    for name in THREAD_LIMIT_ENV_VARS:
+        os.environ[name] = threads
+
+    # Runtimes that are already loaded no longer read the environment
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(int(threads))
+    except ImportError:
+        pass
+
+    if 'tensorflow' in sys.modules:
+        tf = sys.modules['tensorflow']
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(int(threads))
+            tf.config.threading.set_inter_op_parallelism_threads(int(threads))
+        except RuntimeError:
+            # TensorFlow's runtime is already initialised in this process
+            logger.debug("TensorFlow thread limits could not be changed after initialisation")
+
+
+def init_worker_process(threads: int, preload: Optional[List[str]] = None,
+                        settings_values: Optional[Dict[str, Any]] = None):
+    """
+    Process pool initializer: adopt the parent's forecasting settings, cap CPU
+    threads, then optionally preload backends
+    """
+    # Spawned children have not loaded Django settings; use the values the
+    # parent resolved so cache and model store directories match its own
+    use_worker_settings(settings_values)
+    limit_cpu_threads(threads)
+    # Work a pool task submits to the shared executor runs inline rather than
+    # starting a nested pool in every worker (candidate searches have their own
+    # bounded pool, see get_search_executor)
+    set_executor(InlineExecutor())
+    if preload:
+        from . import services  # noqa: F401 - registers the forecasting methods
+        from .registry import warm_up
+        warm_up(preload)
+
+
+def create_executor(kind: str = 'inline', max_workers: Optional[int] = None,
+                    threads_per_task: int = 1, preload: Optional[List[str]] = None) -> Executor:
+    """Build an executor for running model fits"""
+    if kind not in EXECUTOR_KINDS:
+        raise ValueError(f"Unsupported executor kind: {kind}. Choose from {EXECUTOR_KINDS}")
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if kind == 'inline':
+        return InlineExecutor()
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='forecast')
+
+    # Spawn rather than fork so children never inherit a half-initialised
+    # TensorFlow runtime or MongoDB client from the web process.
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker_process,
+        initargs=(threads_per_task, preload, resolved_settings())
+    )
+
+
+def get_executor() -> Executor:
+    """Return the shared executor configured by the FORECAST_EXECUTOR* settings"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                kind = get_setting('FORECAST_EXECUTOR', 'inline')
+                max_workers = get_setting('FORECAST_EXECUTOR_WORKERS', 0)
+                threads_per_task = get_setting('FORECAST_THREADS_PER_TASK', 1)
+                preload = get_setting('FORECAST_PRELOAD_METHODS', [])
+                _executor = create_executor(kind, max_workers, threads_per_task, preload)
+                logger.info(f"Created '{kind}' forecast executor")
+    return _executor
+
+
+def set_executor(executor: Optional[Executor]):
+    """Replace the shared executor, shutting down the previous one"""
+    global _executor
+    with _executor_lock:
+        previous, _executor = _executor, executor
+    if previous is not None and previous is not executor:
+        previous.shutdown(wait=False)
+
+
+def get_search_executor() -> Executor:
+    """
+    Return this process's thread pool for candidate fits of a model search,
+    sized by FORECAST_ARIMA_SEARCH_WORKERS. It is independent of the shared
+    executor, so a fit running on that executor (a pool thread, or a pool
+    worker process) can wait on candidates without starving it.
+    """
+    global _search_executor
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                workers = get_setting('FORECAST_ARIMA_SEARCH_WORKERS', 0) or min(4, os.cpu_count() or 1)
+                _search_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='forecast-search')
+    return _search_executor
@@ -0,0 +1,126 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Any, Optional
+
+from mongoengine.queryset.visitor import Q
+
+from .datasets import store_dataset
+from .mongodb_models import ForecastDocument
+from .services import ForecastingService
+from .profiling import StageTimer
+from .utils import build_forecast_fields, record_stage_timings
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_forecast(user, name: str, method: str, date_column: str, target_column: str,
+                     forecast_period: int, parameters: Dict[str, Any],
+                     historical_data: Iterable[Dict]) -> ForecastDocument:
+    """Persist a pending forecast job for the queue workers to pick up"""
+    forecast_doc = ForecastDocument(
+        user_id=user.id,
+        username=user.username,
+        name=name,
+        method=method,
+        date_column=date_column,
+        target_column=target_column,
+        forecast_period=forecast_period,
+        parameters=parameters,
+        dataset_id=store_dataset(historical_data),
+        status='pending'
+    )
+    forecast_doc.save()
+    logger.info(f"Queued {method} forecast job {forecast_doc.forecast_id} for user {user.username}")
+    return forecast_doc
+
+
+def claim_next_job(stale_after: Optional[int] = None) -> Optional[ForecastDocument]:
+    """
+    Atomically claim the oldest pending job by flipping it to 'running'.
+    Jobs left 'running' for longer than stale_after seconds (e.g. by a killed
+    worker) are treated as pending again.
+    """
+    query = Q(status='pending')
+    if stale_after:
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+        query = query | Q(status='running', started_at__lt=cutoff)
+
+    now = datetime.utcnow()
+    return ForecastDocument.objects(query).order_by('created_at').modify(
+        set__status='running',
+        set__started_at=now,
+        set__updated_at=now,
+        new=True
+    )
+
+
+def run_forecast_job(forecast_doc: ForecastDocument,
+                     service: Optional[ForecastingService] = None) -> ForecastDocument:
+    """Run the forecast for a claimed job and record the outcome on the document"""
+    service = service or ForecastingService()
+    logger.info(f"Running {forecast_doc.method} forecast job {forecast_doc.forecast_id}")
+
+    try:
+        result = service.generate_forecast(
+            data=forecast_doc.get_historical_data(),
+            method=forecast_doc.method,
+            date_column=forecast_doc.date_column,
+            target_column=forecast_doc.target_column,
+            forecast_period=forecast_doc.forecast_period,
+            parameters=forecast_doc.parameters,
+            model_id=forecast_doc.forecast_id
+        )
+        for field_name, value in build_forecast_fields(result).items():
+            setattr(forecast_doc, field_name, value)
+        if forecast_doc.started_at:
+            forecast_doc.timings['queue_wait'] = {
+                'wall_ms': round((forecast_doc.started_at - forecast_doc.created_at).total_seconds() * 1000, 3),
+                'cpu_ms': 0.0,
+                'peak_alloc_mb': None
+            }
+        forecast_doc.status = 'completed'
+        forecast_doc.error_message = None
+    except Exception as e:
+        logger.error(f"Forecast job {forecast_doc.forecast_id} failed: {str(e)}", exc_info=True)
+        forecast_doc.status = 'failed'
+        forecast_doc.error_message = str(e)
+
+    forecast_doc.completed_at = datetime.utcnow()
+    timer = StageTimer()
+    with timer.stage('save'):
+        forecast_doc.save()
+    if forecast_doc.status == 'completed':
+        record_stage_timings(forecast_doc, timer)
+    logger.info(f"Forecast job {forecast_doc.forecast_id} finished with status '{forecast_doc.status}'")
+    return forecast_doc
+
+
+def work(poll_interval: float = 2.0, stale_after: Optional[int] = None,
+         max_jobs: Optional[int] = None) -> int:
+    """Drain the forecast queue, sleeping poll_interval seconds when it is empty"""
+    service = ForecastingService()
+    processed = 0
+
+    while max_jobs is None or processed < max_jobs:
+        try:
+            forecast_doc = claim_next_job(stale_after=stale_after)
+        except Exception as e:
+            # e.g. MongoDB briefly unreachable: keep polling instead of exiting
+            logger.error(f"Failed to claim a forecast job: {str(e)}", exc_info=True)
+            time.sleep(poll_interval)
+            continue
+        if forecast_doc is None:
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            run_forecast_job(forecast_doc, service=service)
+        except Exception as e:
+            # The job stays 'running' and is picked up again once it counts as stale
+            logger.error(f"Failed to save forecast job {forecast_doc.forecast_id}: {str(e)}", exc_info=True)
+            time.sleep(poll_interval)
+            continue
+        processed += 1
+
+    return processed
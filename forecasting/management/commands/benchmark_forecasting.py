@@ -0,0 +1,214 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+# Largest series each slow method is benchmarked on unless --no-size-limits is given
+SIZE_LIMITS = {
+    'lstm': 10000,
+    'prophet': 20000,
+}
+
+
+def synthetic_series(size, seed=0):
+    """
+    Daily sales-like records: linear trend plus weekly and yearly seasonality
+    and Gaussian noise, in the same list-of-dicts shape the API receives.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(size, dtype=float)
+    values = (
+        100.0
+        + 0.01 * t
+        + 10.0 * np.sin(2 * np.pi * t / 7)
+        + 20.0 * np.sin(2 * np.pi * t / 365.25)
+        + rng.normal(0.0, 5.0, size)
+    )
+    # Start early enough that 100k daily points stay inside pandas' Timestamp range
+    dates = pd.date_range('1900-01-01', periods=size, freq='D').strftime('%Y-%m-%d')
+    return [{'date': date, 'sales': round(float(value), 4)} for date, value in zip(dates, values)]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark forecasting methods on synthetic series offline and write the timings as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='100,1000,10000,100000',
+            help='Comma-separated series lengths to benchmark'
+        )
+        parser.add_argument(
+            '--methods', default='',
+            help='Comma-separated forecasting methods (default: every registered method)'
+        )
+        parser.add_argument('--horizon', type=int, default=30, help='Forecast horizon in periods')
+        parser.add_argument('--repeats', type=int, default=3, help='Runs per method and size')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic series')
+        parser.add_argument(
+            '--no-size-limits', action='store_true',
+            help=f'Also run slow methods on sizes above their limits {SIZE_LIMITS}'
+        )
+        parser.add_argument(
+            '--trace-memory', action='store_true',
+            help='Record the peak allocated memory of each stage with tracemalloc (slows the runs)'
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='Result file (default: benchmarks/forecast-<timestamp>.json)'
+        )
+        parser.add_argument(
+            '--baseline', default=None,
+            help='Earlier result file to compare against; slower medians are reported as regressions'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=1.2,
+            help='Slowdown ratio of the median total time reported as a regression'
+        )
+
+    def handle(self, *args, **options):
+        from forecasting.registry import available_methods
+        from forecasting.services import ForecastingService
+
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        methods = [name.strip() for name in options['methods'].split(',') if name.strip()] or available_methods()
+        unknown = sorted(set(methods) - set(available_methods()))
+        if unknown:
+            raise CommandError(f"Unknown forecasting methods: {', '.join(unknown)}")
+
+        runs = []
+        # Measure real fits: no cached models, no model store, everything in-process
+        with override_settings(FORECAST_MODEL_CACHE_ENABLED=False, FORECAST_PROFILE_MEMORY=options['trace_memory']):
+            for size in sizes:
+                data = synthetic_series(size, options['seed'])
+                for method in methods:
+                    limit = SIZE_LIMITS.get(method)
+                    if limit and size > limit and not options['no_size_limits']:
+                        self.stdout.write(f"Skipping {method} at {size} points (limit {limit})")
+                        continue
+
+                    for repeat in range(options['repeats']):
+                        runs.append(self.run_once(ForecastingService(), method, data, size, repeat, options['horizon']))
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'created_at': datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'horizon': options['horizon'],
+                'repeats': options['repeats'],
+                'seed': options['seed'],
+                'trace_memory': options['trace_memory'],
+            },
+            'summary': self.summarize(runs),
+            'runs': runs,
+        }
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks', f"forecast-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.print_summary(report['summary'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(runs)} benchmark runs to {output}"))
+
+        if options['baseline']:
+            regressions = self.compare(report['summary'], options['baseline'], options['threshold'])
+            if regressions:
+                raise CommandError(f"{regressions} benchmark regression(s) above {options['threshold']}x")
+
+    def run_once(self, service, method, data, size, repeat, horizon):
+        run = {'method': method, 'size': size, 'repeat': repeat, 'status': 'ok', 'error': None}
+        start = time.perf_counter()
+        try:
+            result = service.forecast(method, data, 'date', 'sales', horizon, {})
+            run['timings'] = result.get('timings', {})
+        except Exception as e:
+            run['status'] = 'error'
+            run['error'] = str(e)
+            run['timings'] = {}
+        run['total_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return run
+
+    def summarize(self, runs):
+        """
+        Median and min of the total and of each stage per method and size, and
+        the median peak allocated memory of the whole forecast when traced
+        """
+        summary = {}
+        for run in runs:
+            if run['status'] != 'ok':
+                continue
+            key = f"{run['method']}/{run['size']}"
+            entry = summary.setdefault(key, {
+                'method': run['method'], 'size': run['size'], 'total_ms': [], 'stages': {}, 'peak_alloc_mb': []
+            })
+            entry['total_ms'].append(run['total_ms'])
+            peak_alloc = run['timings'].get('total', {}).get('peak_alloc_mb')
+            if peak_alloc is not None:
+                entry['peak_alloc_mb'].append(peak_alloc)
+            for stage_name, timing in run['timings'].items():
+                entry['stages'].setdefault(stage_name, []).append(timing['wall_ms'])
+
+        for entry in summary.values():
+            entry['total_ms'] = {
+                'median': round(float(np.median(entry['total_ms'])), 3),
+                'min': round(float(np.min(entry['total_ms'])), 3),
+            }
+            entry['stages'] = {
+                stage_name: round(float(np.median(values)), 3)
+                for stage_name, values in entry['stages'].items()
+            }
+            entry['peak_alloc_mb'] = round(float(np.median(entry['peak_alloc_mb'])), 3) if entry['peak_alloc_mb'] else None
+        return summary
+
+    def print_summary(self, summary):
+        for key, entry in sorted(summary.items(), key=lambda item: (item[1]['method'], item[1]['size'])):
+            stages = ', '.join(
+                f"{name} {value:.1f}" for name, value in entry['stages'].items() if name != 'total'
+            )
+            memory = f"  peak {entry['peak_alloc_mb']:.1f} MB" if entry.get('peak_alloc_mb') is not None else ''
+            self.stdout.write(f"{key:<28} median {entry['total_ms']['median']:>11.1f} ms{memory}  [{stages}]")
+
+    def compare(self, summary, baseline_path, threshold):
+        """Report runs whose median total time grew by more than threshold; returns the count"""
+        with open(baseline_path) as f:
+            baseline = json.load(f).get('summary', {})
+
+        regressions = 0
+        for key, entry in sorted(summary.items()):
+            if key not in baseline:
+                continue
+            before = baseline[key]['total_ms']['median']
+            after = entry['total_ms']['median']
+            ratio = after / before if before else float('inf')
+            line = f"{key:<28} {before:>11.1f} -> {after:>11.1f} ms ({ratio:.2f}x)"
+            if ratio > threshold:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f"REGRESSION {line}"))
+            else:
+                self.stdout.write(line)
+        return regressions
@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def _worker_main(poll_interval, stale_after, max_jobs, preload):
+    """Entry point for spawned worker processes"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+
+    from forecasting.jobs import work
+    from forecasting.registry import warm_up
+    if preload:
+        warm_up(preload)
+    return work(poll_interval=poll_interval, stale_after=stale_after, max_jobs=max_jobs)
+
+
+class Command(BaseCommand):
+    help = 'Run a pool of workers that drain pending forecast jobs from MongoDB'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.FORECAST_WORKER_CONCURRENCY,
+            help='Number of worker processes to run'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.FORECAST_WORKER_POLL_INTERVAL,
+            help='Seconds to wait before polling again when the queue is empty'
+        )
+        parser.add_argument(
+            '--stale-after', type=int, default=settings.FORECAST_JOB_TIMEOUT,
+            help='Seconds after which a running job is considered abandoned and re-queued'
+        )
+        parser.add_argument(
+            '--preload', default=','.join(settings.FORECAST_PRELOAD_METHODS),
+            help='Comma-separated forecasting methods whose backends are loaded before polling'
+        )
+        parser.add_argument(
+            '--max-jobs', type=int, default=None,
+            help='Exit each worker after processing this many jobs'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        preload = [name.strip() for name in options['preload'].split(',') if name.strip()]
+        worker_args = (options['poll_interval'], options['stale_after'], options['max_jobs'], preload)
+
+        self.stdout.write(f"Starting {workers} forecast worker(s)")
+
+        if workers == 1:
+            processed = _worker_main(*worker_args)
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} forecast job(s)"))
+            return
+
+        # Spawn rather than fork so each worker gets its own MongoDB client and
+        # TensorFlow runtime instead of inheriting the parent's.
+        context = multiprocessing.get_context('spawn')
+        processes = [
+            context.Process(target=_worker_main, args=worker_args, daemon=False)
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+
+        self.stdout.write(self.style.SUCCESS("Forecast workers stopped"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecasting', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='forecastmodel',
+            name='method',
+            field=models.CharField(choices=[('lstm', 'LSTM Neural Network'), ('arima', 'ARIMA'), ('prophet', 'Prophet'), ('naive', 'Naive'), ('seasonal_naive', 'Seasonal Naive'), ('moving_average', 'Moving Average'), ('ses', 'Simple Exponential Smoothing'), ('holt', 'Holt Linear Trend'), ('holt_winters', 'Holt-Winters'), ('drift', 'Drift')], max_length=20),
+        ),
+    ]
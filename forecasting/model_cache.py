@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import serialization
+from .conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Bump when the fitted-model layout changes so stale disk entries are ignored
+CACHE_VERSION = 3
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ModelCache:
+    """
+    Two-tier cache of fitted models and forecast results.
+
+    The memory tier is a size-bounded LRU private to the process. The optional
+    disk tier is a directory shared by every worker on the machine; entries
+    are written atomically and the least recently used files are pruned once
+    the directory grows past max_disk_bytes.
+    """
+
+    def __init__(self, max_entries: int = 32, directory: Optional[str] = None,
+                 max_disk_bytes: int = 1024 ** 3):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def model_key(self, df: pd.DataFrame, method: str, parameters: Dict[str, Any],
+                  horizon: Optional[int] = None) -> str:
+        """Content hash of a prepared series, method and parameters (and horizon when the model depends on it)"""
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}:{method}:".encode())
+        digest.update(json.dumps(parameters, sort_keys=True, default=str).encode())
+        digest.update(f":{horizon}:".encode())
+        digest.update(np.ascontiguousarray(df['Date'].values.astype('datetime64[ns]').view('i8')).tobytes())
+        digest.update(np.ascontiguousarray(df['Value'].values.astype('float64')).tobytes())
+        return digest.hexdigest()
+
+    def result_key(self, model_key: str, forecast_period: int) -> str:
+        """Key of the forecast produced by a cached model for one horizon"""
+        return hashlib.sha256(f"{model_key}:result:{forecast_period}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        value = self._read_disk(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._remember(key, value)
+        self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def _remember(self, key: str, value: Any):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        if not self.directory:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = serialization.loads(f.read())
+            # Refresh the mtime so pruning evicts least recently used entries
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable model cache entry {key[:12]}: {str(e)}")
+            self._remove(path)
+            return None
+
+    def _write_disk(self, key: str, value: Any):
+        if not self.directory:
+            return
+
+        path = self._path(key)
+        try:
+            payload = serialization.dumps(value)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write model cache entry {key[:12]}: {str(e)}")
+            return
+
+        self._prune_disk()
+
+    def _prune_disk(self):
+        entries = []
+        total_size = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_disk_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            self._remove(path)
+            total_size -= size
+            if total_size <= self.max_disk_bytes:
+                break
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def get_model_cache() -> Optional[ModelCache]:
+    """Return the shared model cache, or None when FORECAST_MODEL_CACHE_ENABLED is off"""
+    global _cache
+    if not get_setting('FORECAST_MODEL_CACHE_ENABLED', True):
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ModelCache(
+                    max_entries=get_setting('FORECAST_MODEL_CACHE_SIZE', 32),
+                    directory=get_setting('FORECAST_MODEL_CACHE_DIR', None) or None,
+                    max_disk_bytes=get_setting('FORECAST_MODEL_CACHE_MAX_BYTES', 1024 ** 3)
+                )
+    return _cache
@@ -0,0 +1,84 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from . import serialization
+from .conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Forecast ids are UUIDs; anything else is refused so ids can never escape the store directory
+MODEL_ID_PATTERN = re.compile(r'^[0-9A-Za-z-]{8,64}$')
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class ModelStore:
+    """
+    Durable store of fitted models, one file per forecast.
+
+    Unlike the model cache, entries are never evicted: a model stays until its
+    forecast is deleted, so a saved forecast can always be re-run for a new
+    horizon without training. Models are serialised with the same portable
+    formats as the cache (Prophet JSON, Keras config plus weights, pickled
+    statsmodels results).
+    """
+
+    def __init__(self, directory: str):
+        # Absolute, so a worker with another working directory resolves the same files
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def relative_path(self, model_id: str) -> str:
+        if not MODEL_ID_PATTERN.match(model_id or ''):
+            raise ValueError(f"Invalid model id: {model_id}")
+        return os.path.join(model_id[:2], f"{model_id}.model")
+
+    def save(self, model_id: str, fitted: Dict[str, Any]) -> str:
+        """Write a fitted model atomically and return its path relative to the store"""
+        relative_path = self.relative_path(model_id)
+        path = os.path.join(self.directory, relative_path)
+        payload = serialization.dumps(fitted)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        logger.info(f"Stored {fitted.get('method')} model for forecast {model_id} ({len(payload)} bytes)")
+        return relative_path
+
+    def load(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Load a stored fitted model, or None when the forecast has none"""
+        path = os.path.join(self.directory, self.relative_path(model_id))
+        try:
+            with open(path, 'rb') as f:
+                return serialization.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def delete(self, model_id: str):
+        try:
+            os.remove(os.path.join(self.directory, self.relative_path(model_id)))
+        except FileNotFoundError:
+            pass
+
+
+def get_model_store() -> ModelStore:
+    """Return the shared model store rooted at FORECAST_MODEL_STORE_DIR"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ModelStore(get_setting('FORECAST_MODEL_STORE_DIR', os.path.join('cache', 'model_store')))
+    return _store
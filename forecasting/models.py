@@ -9,7 +9,14 @@ class ForecastModel(models.Model):
     METHODS = [
         ('lstm', 'LSTM Neural Network'),
         ('arima', 'ARIMA'),
-        ('prophet', 'Prophet')
+        ('prophet', 'Prophet'),
+        ('naive', 'Naive'),
+        ('seasonal_naive', 'Seasonal Naive'),
+        ('moving_average', 'Moving Average'),
+        ('ses', 'Simple Exponential Smoothing'),
+        ('holt', 'Holt Linear Trend'),
+        ('holt_winters', 'Holt-Winters'),
+        ('drift', 'Drift')
     ]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -2,6 +2,24 @@ from mongoengine import Document, EmbeddedDocument, fields
 from datetime import datetime
 import uuid
 
+import numpy as np
+
+from .baselines import BASELINE_METHODS
+from .packing import PACKED_DTYPES, unpack_array, unpack_dates
+
+# Forecasting methods accepted by the API: the model-based methods plus the vectorised baselines
+METHOD_CHOICES = ['lstm', 'arima', 'prophet'] + list(BASELINE_METHODS)
+
+# Forecast horizons accepted by ForecastDocument.forecast_period
+MIN_FORECAST_PERIOD = 1
+MAX_FORECAST_PERIOD = 365
+
+# Fields read by list views (see ForecastDocument.to_summary_dict)
+SUMMARY_FIELDS = [
+    'forecast_id', 'name', 'method', 'date_column', 'target_column', 'forecast_period',
+    'metrics', 'created_at', 'batch_id', 'series_id', 'status', 'user_id'
+]
+
 class ForecastMetrics(EmbeddedDocument):
     """Embedded document for forecast metrics"""
     rmse = fields.FloatField()
@@ -15,6 +33,26 @@ class ConfidenceInterval(EmbeddedDocument):
     lower = fields.ListField(fields.FloatField())
     upper = fields.ListField(fields.FloatField())
 
+class DatasetDocument(Document):
+    """
+    Content-addressed historical dataset shared by forecasts and saved files.
+    dataset_id is the SHA-256 of the normalised records, so identical data is
+    stored once however many forecasts use it (see forecasting.datasets).
+    """
+    dataset_id = fields.StringField(required=True, unique=True)
+    row_count = fields.IntField(required=True)
+    columns = fields.ListField(fields.StringField())
+    size_bytes = fields.IntField()  # Uncompressed size of the normalised JSON
+    compression = fields.StringField(default='zlib')
+    payload = fields.BinaryField()  # Compressed records when they fit in the document
+    payload_file = fields.FileField(collection_name='dataset_files')  # GridFS for larger datasets
+    created_at = fields.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'datasets',
+        'indexes': ['dataset_id']
+    }
+
 class ForecastDocument(Document):
     """MongoDB document for storing forecasts"""
     
@@ -27,31 +65,53 @@ class ForecastDocument(Document):
     
     # Model information
     name = fields.StringField(required=True, max_length=200)
-    method = fields.StringField(required=True, choices=['lstm', 'arima', 'prophet'])
+    method = fields.StringField(required=True, choices=METHOD_CHOICES)
     
     # Data columns
     date_column = fields.StringField(required=True)
     target_column = fields.StringField(required=True)
     
+    # Batch membership (set for forecasts created by the batch endpoint)
+    batch_id = fields.StringField()
+    series_column = fields.StringField()
+    series_id = fields.StringField()
+    
     # Forecast settings
-    forecast_period = fields.IntField(required=True, min_value=1, max_value=365)
+    forecast_period = fields.IntField(required=True, min_value=MIN_FORECAST_PERIOD, max_value=MAX_FORECAST_PERIOD)
     parameters = fields.DictField(default=dict)
     
-    # Data
+    # Data: a reference into the dataset store; historical_data is only set on older forecasts
+    dataset_id = fields.StringField()
+    shared_dataset = fields.BooleanField(default=False)  # Dataset holds every series of a batch
     historical_data = fields.ListField(fields.DictField())
     forecast_data = fields.ListField(fields.FloatField())
     forecast_dates = fields.ListField(fields.StringField())
+
+    # Packed arrays (FORECAST_PACKED_ARRAYS): raw float bytes instead of the
+    # lists above and the confidence interval lists, dates as start plus freq.
+    # Read them through get_forecast_array() and friends.
+    packed_dtype = fields.StringField(choices=list(PACKED_DTYPES))
+    forecast_packed = fields.BinaryField()
+    lower_packed = fields.BinaryField()
+    upper_packed = fields.BinaryField()
+    dates_start = fields.StringField()
+    dates_freq = fields.StringField()
     
     # Results
     metrics = fields.EmbeddedDocumentField(ForecastMetrics)
     confidence_intervals = fields.EmbeddedDocumentField(ConfidenceInterval)
+    model_key = fields.StringField()  # Model cache key of the fitted model, used for updates
+    model_path = fields.StringField()  # Fitted model file in the model store, used for re-forecasts
+    timings = fields.DictField(default=dict)  # Per-stage {'wall_ms', 'cpu_ms', 'peak_alloc_mb'}
     
     # Timestamps
     created_at = fields.DateTimeField(default=datetime.utcnow)
     updated_at = fields.DateTimeField(default=datetime.utcnow)
+    started_at = fields.DateTimeField()  # Set when a queue worker claims the job
+    completed_at = fields.DateTimeField()
     
     # Metadata
-    status = fields.StringField(default='completed', choices=['pending', 'completed', 'failed'])
+    status = fields.StringField(default='completed', choices=['pending', 'running', 'completed', 'failed'])
     error_message = fields.StringField()
     
     meta = {
@@ -61,7 +121,12 @@ class ForecastDocument(Document):
             'username',
             '-created_at',
             'method',
-            'status'
+            'status',
+            ('status', 'created_at'),
+            'batch_id',
+            ('user_id', 'method', '-created_at'),
+            ('user_id', 'status', '-created_at', '-forecast_id'),
+            'dataset_id'
         ]
     }
     
@@ -69,9 +134,82 @@ class ForecastDocument(Document):
         """Override save to update timestamp"""
         self.updated_at = datetime.utcnow()
         return super().save(*args, **kwargs)
+
+    def get_historical_data(self):
+        """Records the forecast was fitted on, from the dataset store or the legacy embedded list"""
+        if not self.dataset_id:
+            return list(self.historical_data)
+
+        from .datasets import load_dataset, series_key
+        records = load_dataset(self.dataset_id)
+        if self.shared_dataset:
+            # Batch forecasts share the batch's dataset; keep this series' rows
+            records = [record for record in records if series_key(record.get(self.series_column)) == self.series_id]
+        return records
+
+    def get_forecast_array(self):
+        """Forecast values as a NumPy array, decoded without copying when packed"""
+        if self.packed_dtype:
+            return unpack_array(self.forecast_packed, self.packed_dtype)
+        return np.asarray(self.forecast_data, dtype=float)
+
+    def get_forecast_dates(self):
+        """Forecast dates as strings, expanded from start and frequency when packed"""
+        if self.dates_start:
+            return unpack_dates(self.dates_start, self.dates_freq, len(self.get_forecast_array()))
+        return list(self.forecast_dates)
+
+    def get_confidence_arrays(self):
+        """(lower, upper) NumPy arrays of the confidence interval, or None"""
+        if self.packed_dtype:
+            if self.lower_packed is None or self.upper_packed is None:
+                return None
+            return unpack_array(self.lower_packed, self.packed_dtype), unpack_array(self.upper_packed, self.packed_dtype)
+        if not self.confidence_intervals:
+            return None
+        return (
+            np.asarray(self.confidence_intervals.lower, dtype=float),
+            np.asarray(self.confidence_intervals.upper, dtype=float)
+        )
+
+    def to_summary_dict(self):
+        """List-view representation: identifying fields and metrics, no data arrays"""
+        return {
+            'id': str(self.forecast_id),
+            'name': self.name,
+            'method': self.method,
+            'date_column': self.date_column,
+            'target_column': self.target_column,
+            'forecast_period': self.forecast_period,
+            'metrics': {
+                'rmse': self.metrics.rmse,
+                'mae': self.metrics.mae,
+                'r2': self.metrics.r2,
+                'mape': self.metrics.mape,
+                'mse': self.metrics.mse,
+            } if self.metrics else {},
+            'created_at': self.created_at.isoformat(),
+            'batch_id': self.batch_id,
+            'series_id': self.series_id,
+            'status': self.status
+        }
     
     def to_dict(self):
         """Convert document to dictionary for JSON serialization"""
+        if self.packed_dtype:
+            intervals = self.get_confidence_arrays()
+            forecast_data = self.get_forecast_array().tolist()
+            confidence_intervals = {
+                'lower': intervals[0].tolist(),
+                'upper': intervals[1].tolist(),
+            } if intervals else {}
+        else:
+            forecast_data = self.forecast_data
+            confidence_intervals = {
+                'lower': self.confidence_intervals.lower if self.confidence_intervals else [],
+                'upper': self.confidence_intervals.upper if self.confidence_intervals else [],
+            } if self.confidence_intervals else {}
+
         return {
             'id': str(self.forecast_id),
             'name': self.name,
@@ -80,8 +218,8 @@ class ForecastDocument(Document):
             'target_column': self.target_column,
             'forecast_period': self.forecast_period,
             'parameters': self.parameters,
-            'forecast_data': self.forecast_data,
-            'forecast_dates': self.forecast_dates,
+            'forecast_data': forecast_data,
+            'forecast_dates': self.get_forecast_dates(),
             'metrics': {
                 'rmse': self.metrics.rmse if self.metrics else 0,
                 'mae': self.metrics.mae if self.metrics else 0,
@@ -89,14 +227,19 @@ class ForecastDocument(Document):
                 'mape': self.metrics.mape if self.metrics else 0,
                 'mse': self.metrics.mse if self.metrics else 0,
             } if self.metrics else {},
-            'confidence_intervals': {
-                'lower': self.confidence_intervals.lower if self.confidence_intervals else [],
-                'upper': self.confidence_intervals.upper if self.confidence_intervals else [],
-            } if self.confidence_intervals else {},
+            'confidence_intervals': confidence_intervals,
             'created_at': self.created_at.isoformat(),
-            'status': self.status
+            'batch_id': self.batch_id,
+            'series_id': self.series_id,
+            'status': self.status,
+            'error_message': self.error_message
         }
     
+    @classmethod
+    def count_user_forecasts(cls, user_id):
+        """Number of completed forecasts of a user, counted on the (user_id, status, -created_at) index"""
+        return cls.objects(user_id=user_id, status='completed').count()
+
     @classmethod
     def get_user_forecasts(cls, user_id, limit=None):
         """Get forecasts for a specific user"""
@@ -107,10 +250,42 @@ class ForecastDocument(Document):
     
     @classmethod
     def get_user_statistics(cls, user_id):
-        """Get overall statistics for a user"""
-        forecasts = cls.objects(user_id=user_id, status='completed')
-        
-        if not forecasts:
+        """
+        Get overall statistics for a user, computed server-side by a single
+        aggregation pipeline over the projected summary fields; only the most
+        recent forecast is then loaded in full
+        """
+        pipeline = [
+            # Sorting first lets MongoDB walk the (user_id, status, -created_at) index
+            {'$sort': {'created_at': -1, 'forecast_id': -1}},
+            {'$project': {
+                '_id': 0,
+                'forecast_id': 1,
+                'name': 1,
+                'method': 1,
+                'forecast_period': 1,
+                'metrics': 1,
+                'created_at': 1
+            }},
+            {'$facet': {
+                'totals': [{'$group': {
+                    '_id': None,
+                    'count': {'$sum': 1},
+                    'avg_period': {'$avg': '$forecast_period'}
+                }}],
+                'methods': [{'$group': {'_id': '$method', 'count': {'$sum': 1}}}],
+                'most_recent': [{'$limit': 1}],
+                # Same rule as before: the highest non-zero R² above -1
+                'best_model': [
+                    {'$match': {'metrics.r2': {'$gt': -1, '$ne': 0}}},
+                    {'$sort': {'metrics.r2': -1, 'created_at': 1}},
+                    {'$limit': 1}
+                ]
+            }}
+        ]
+        result = next(cls.objects(user_id=user_id, status='completed').aggregate(pipeline), None)
+
+        if not result or not result['totals']:
             return {
                 'total_forecasts': 0,
                 'methods_used': {},
@@ -118,34 +293,24 @@ class ForecastDocument(Document):
                 'most_recent': None,
                 'best_model': None
             }
-        
-        methods_count = {}
-        total_period = 0
-        best_r2 = -1
+
+        totals = result['totals'][0]
         best_model = None
-        
-        for forecast in forecasts:
-            # Count methods
-            method = forecast.method
-            methods_count[method] = methods_count.get(method, 0) + 1
-            
-            # Sum periods
-            total_period += forecast.forecast_period
-            
-            # Find best model by R²
-            if forecast.metrics and forecast.metrics.r2 and forecast.metrics.r2 > best_r2:
-                best_r2 = forecast.metrics.r2
-                best_model = {
-                    'name': forecast.name,
-                    'method': forecast.method,
-                    'r2': forecast.metrics.r2,
-                    'created_at': forecast.created_at.isoformat()
-                }
-        
+        if result['best_model']:
+            best = result['best_model'][0]
+            best_model = {
+                'name': best['name'],
+                'method': best['method'],
+                'r2': best['metrics']['r2'],
+                'created_at': best['created_at'].isoformat()
+            }
+
+        # The most recent forecast is returned in full, so it is loaded by id
+        most_recent = cls.objects(forecast_id=result['most_recent'][0]['forecast_id']).first()
         return {
-            'total_forecasts': len(forecasts),
-            'methods_used': methods_count,
-            'avg_forecast_period': round(total_period / len(forecasts), 1) if forecasts else 0,
-            'most_recent': forecasts.first().to_dict() if forecasts else None,
+            'total_forecasts': totals['count'],
+            'methods_used': {entry['_id']: entry['count'] for entry in result['methods']},
+            'avg_forecast_period': round(totals['avg_period'] or 0, 1),
+            'most_recent': most_recent.to_dict() if most_recent else None,
             'best_model': best_model
-        } 
\ No newline at end of file
+        }
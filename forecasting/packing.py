@@ -0,0 +1,57 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Packed float arrays are raw little-endian bytes so they decode the same on any host
+PACKED_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float64': np.dtype('<f8'),
+}
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def pack_array(values: Sequence[float], dtype: str = 'float64') -> bytes:
+    """Encode a float sequence as the raw bytes of a contiguous array"""
+    if dtype not in PACKED_DTYPES:
+        raise ValueError(f"Unsupported packed dtype: {dtype}")
+    return np.ascontiguousarray(values, dtype=PACKED_DTYPES[dtype]).tobytes()
+
+
+def unpack_array(payload: bytes, dtype: str = 'float64') -> np.ndarray:
+    """
+    Decode packed bytes without copying. The array is a read-only view of the
+    payload; copy it before modifying.
+    """
+    if dtype not in PACKED_DTYPES:
+        raise ValueError(f"Unsupported packed dtype: {dtype}")
+    return np.frombuffer(payload or b'', dtype=PACKED_DTYPES[dtype])
+
+
+def pack_dates(dates: Sequence[str]) -> Optional[Tuple[str, str]]:
+    """
+    Encode a regular date sequence as (start, freq). Returns None when the
+    dates have no inferable frequency or would not round-trip exactly, in
+    which case they are stored as a plain list.
+    """
+    if not dates:
+        return None
+    if len(dates) == 1:
+        return dates[0], 'D'
+    if len(dates) < 3:
+        return None
+
+    try:
+        index = pd.DatetimeIndex(dates)
+        freq = pd.infer_freq(index)
+    except (TypeError, ValueError):
+        return None
+    if freq is None or unpack_dates(dates[0], freq, len(dates)) != list(dates):
+        return None
+    return dates[0], freq
+
+
+def unpack_dates(start: str, freq: str, count: int) -> List[str]:
+    """Expand a (start, freq) pair back into count date strings"""
+    return pd.date_range(start=start, periods=count, freq=freq).strftime(DATE_FORMAT).tolist()
@@ -0,0 +1,148 @@
+import contextvars
+import functools
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .conf import get_setting
+
+# Timer collecting stages in the current task; None when nothing is being profiled
+_current_timer = contextvars.ContextVar('forecast_stage_timer', default=None)
+
+
+def traced_memory_mb() -> Tuple[float, float]:
+    """Current and peak memory traced by tracemalloc, in MB"""
+    current, peak = tracemalloc.get_traced_memory()
+    return current / 1024 ** 2, peak / 1024 ** 2
+
+
+class StageTimer:
+    """
+    Collects wall time, CPU time and peak memory per named stage.
+
+    Used as a context manager it becomes the active timer for the current
+    thread or task, so code deeper in the call stack records into it through
+    the module-level stage() helper without passing it around. Repeated
+    stages accumulate; nested stages are recorded separately and are also
+    included in their parent's time.
+
+    cpu_ms comes from time.process_time(), which counts the CPU time of every
+    thread of the process: with the thread executor, stages running
+    concurrently in other threads are included.
+
+    peak_alloc_mb is the highest memory allocated during the stage above what
+    was allocated when it started, as traced by tracemalloc. Tracing slows
+    allocation-heavy code, so it is only on when FORECAST_PROFILE_MEMORY is
+    set (or tracemalloc was started elsewhere, e.g. by the benchmark);
+    otherwise peak_alloc_mb is None. Like CPU time, tracing is per process.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._token = None
+        # Absolute traced peak (MB) of each open stage, innermost last
+        self._peaks: List[float] = []
+
+    def __enter__(self):
+        if get_setting('FORECAST_PROFILE_MEMORY', False) and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._token = _current_timer.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current_timer.reset(self._token)
+        self._token = None
+        return False
+
+    @contextmanager
+    def stage(self, name: str):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            alloc_start, peak_before = traced_memory_mb()
+            # The peak counter is restarted for this stage; the enclosing stage
+            # keeps the peak it had reached so far
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak_before)
+            self._peaks.append(0.0)
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            peak_alloc = None
+            if tracing:
+                peak = max(traced_memory_mb()[1], self._peaks.pop())
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                peak_alloc = round(max(0.0, peak - alloc_start), 3)
+            self.record(
+                name,
+                wall_ms=(time.perf_counter() - wall_start) * 1000,
+                cpu_ms=(time.process_time() - cpu_start) * 1000,
+                peak_alloc_mb=peak_alloc
+            )
+
+    def record(self, name: str, wall_ms: float, cpu_ms: float = 0.0, peak_alloc_mb: Optional[float] = None):
+        entry = self.stages.setdefault(name, {'wall_ms': 0.0, 'cpu_ms': 0.0, 'peak_alloc_mb': None})
+        entry['wall_ms'] = round(entry['wall_ms'] + wall_ms, 3)
+        entry['cpu_ms'] = round(entry['cpu_ms'] + cpu_ms, 3)
+        if peak_alloc_mb is not None:
+            entry['peak_alloc_mb'] = max(entry['peak_alloc_mb'] or 0.0, peak_alloc_mb)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: dict(entry) for name, entry in self.stages.items()}
+
+
+@contextmanager
+def stage(name: str):
+    """Time a stage into the active StageTimer; a no-op when none is active"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def timed(name: str):
+    """Decorator recording every call of a function as a stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize_timings(rows: Iterable[Dict], percentiles: List[int] = (50, 95)) -> Dict[str, Dict]:
+    """
+    Aggregate stored timings into per-method, per-stage percentiles.
+    rows are {'method': ..., 'timings': {stage: {'wall_ms', 'cpu_ms', 'peak_alloc_mb'}}}.
+    """
+    samples = {}
+    for row in rows:
+        for stage_name, entry in (row.get('timings') or {}).items():
+            stage_samples = samples.setdefault(row['method'], {}).setdefault(stage_name, {
+                'wall_ms': [], 'cpu_ms': [], 'peak_alloc_mb': []
+            })
+            for metric in ('wall_ms', 'cpu_ms', 'peak_alloc_mb'):
+                if entry.get(metric) is not None:
+                    stage_samples[metric].append(entry[metric])
+
+    summary = {}
+    for method, stages in samples.items():
+        summary[method] = {}
+        for stage_name, metrics in stages.items():
+            stage_summary = {'count': len(metrics['wall_ms'])}
+            for metric, values in metrics.items():
+                if not values:
+                    continue
+                for q, value in zip(percentiles, np.percentile(values, percentiles)):
+                    stage_summary[f"{metric}_p{q}"] = round(float(value), 3)
+            summary[method][stage_name] = stage_summary
+    return summary
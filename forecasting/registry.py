@@ -0,0 +1,97 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Import path of each heavy modelling backend. They are imported on first use
+# so web workers and management commands only pay for the backends they need.
+BACKEND_MODULES = {
+    'tensorflow': 'tensorflow',
+    'prophet': 'prophet',
+    'statsmodels': 'statsmodels.tsa.arima.model',
+    'stattools': 'statsmodels.tsa.stattools',
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def load_backend(name: str):
+    """Import a modelling backend on first use and return its module"""
+    module = _backends.get(name)
+    if module is None:
+        with _backends_lock:
+            module = _backends.get(name)
+            if module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(BACKEND_MODULES[name])
+                _backends[name] = module
+                logger.info(f"Loaded {name} backend in {time.perf_counter() - start:.2f}s")
+    return module
+
+
+class ForecastMethod:
+    """A forecasting method: its fit/predict steps and the backends they need"""
+
+    def __init__(self, name: str, title: str, fit: Callable, predict: Callable,
+                 backends: Optional[Iterable[str]] = None,
+                 horizon_dependent: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 cacheable: bool = True, batch: Optional[Callable] = None,
+                 update: Optional[Callable] = None):
+        self.name = name
+        self.title = title
+        self.fit = fit
+        self.predict = predict
+        self.backends = list(backends or [])
+        self._horizon_dependent = horizon_dependent
+        # Methods cheaper to recompute than to hash and cache opt out of the model cache
+        self.cacheable = cacheable
+        # Optional vectorised implementation forecasting many prepared series at once
+        self.batch = batch
+        # Optional step extending a fitted model with new observations without a full refit
+        self.update = update
+
+    def is_horizon_dependent(self, parameters: Dict[str, Any]) -> bool:
+        """Whether a fitted model only serves the horizon it was trained for"""
+        return bool(self._horizon_dependent and self._horizon_dependent(parameters))
+
+    def load(self):
+        for backend in self.backends:
+            load_backend(backend)
+
+
+_methods: Dict[str, ForecastMethod] = {}
+
+
+def register_method(name: str, title: str, fit: Callable, predict: Callable,
+                    backends: Optional[Iterable[str]] = None,
+                    horizon_dependent: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                    cacheable: bool = True, batch: Optional[Callable] = None,
+                    update: Optional[Callable] = None) -> ForecastMethod:
+    """Register a forecasting method under the name used in API requests"""
+    method = ForecastMethod(name, title, fit, predict, backends, horizon_dependent, cacheable, batch, update)
+    _methods[name] = method
+    return method
+
+
+def get_method(name: str) -> ForecastMethod:
+    try:
+        return _methods[name]
+    except KeyError:
+        raise ValueError(f"Unsupported forecasting method: {name}")
+
+
+def available_methods() -> List[str]:
+    return list(_methods.keys())
+
+
+def warm_up(methods: Optional[Iterable[str]] = None) -> List[str]:
+    """Preload the backends of the given methods (all registered methods by default)"""
+    names = list(methods) if methods is not None else available_methods()
+    for name in names:
+        get_method(name).load()
+    logger.info(f"Warmed up forecasting methods: {', '.join(names) or 'none'}")
+    return names
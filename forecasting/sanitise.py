@@ -0,0 +1,106 @@
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+# How non-finite values are replaced (FORECAST_NAN_POLICY):
+#   zero        - 0.0, the historical behaviour
+#   ffill       - the previous finite value (0.0 before the first one)
+#   interpolate - linear interpolation between finite neighbours, edges held
+#   raise       - refuse the result with a ValueError
+NAN_POLICIES = ('zero', 'ffill', 'interpolate', 'raise')
+
+METRIC_NAMES = ('rmse', 'mae', 'r2', 'mape', 'mse')
+
+
+def coerce_array(values: Any) -> Tuple[np.ndarray, int]:
+    """
+    Convert values to a 1-D float64 array in one step. Missing entries (None)
+    become NaN; entries that cannot be read as numbers (non-numeric strings,
+    objects) also become NaN and are counted as invalid.
+    """
+    if values is None:
+        return np.empty(0, dtype=np.float64), 0
+    try:
+        return np.asarray(values, dtype=np.float64).reshape(-1), 0
+    except (TypeError, ValueError):
+        pass
+
+    raw = pd.Series(np.asarray(values, dtype=object).reshape(-1))
+    coerced = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64)
+    invalid = int((np.isnan(coerced) & raw.notna().to_numpy()).sum())
+    return coerced, invalid
+
+
+def sanitise_array(values: Any, policy: Optional[str] = None) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Coerce values to float64 and replace NaN/Inf according to policy (default
+    FORECAST_NAN_POLICY). Returns the clean array and the counts of NaN,
+    infinite and invalid entries that were replaced.
+    """
+    policy = policy or get_setting('FORECAST_NAN_POLICY', 'zero')
+    if policy not in NAN_POLICIES:
+        raise ValueError(f"Unknown NaN policy: {policy}. Expected one of {', '.join(NAN_POLICIES)}")
+
+    array, invalid = coerce_array(values)
+    nan_mask = np.isnan(array)
+    inf_mask = np.isinf(array)
+    counts = {
+        'nan': int(nan_mask.sum()) - invalid,
+        'inf': int(inf_mask.sum()),
+        'invalid': invalid,
+    }
+
+    bad = nan_mask | inf_mask
+    if not bad.any():
+        return array, counts
+    if policy == 'raise':
+        raise ValueError(f"Forecast output contains non-finite values: {counts}")
+
+    array = array.copy()
+    if policy == 'zero' or bad.all():
+        array[bad] = 0.0
+    elif policy == 'ffill':
+        # Index of the last finite value at or before each position
+        last_good = np.maximum.accumulate(np.where(bad, -1, np.arange(len(array))))
+        array = np.where(last_good >= 0, array[np.maximum(last_good, 0)], 0.0)
+    else:
+        positions = np.arange(len(array))
+        array[bad] = np.interp(positions[bad], positions[~bad], array[~bad])
+    return array, counts
+
+
+def sanitise_result(result: Dict[str, Any], policy: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, int]]]:
+    """
+    Sanitise every numeric output of a ForecastingService result in one pass
+    per array: the forecast, the confidence bounds and the metrics. Returns
+    {'forecast', 'lower', 'upper', 'metrics'} (lower/upper are None without
+    confidence intervals) and the replacement counts per output.
+    """
+    forecast, forecast_counts = sanitise_array(result.get('forecast'), policy)
+    counts = {'forecast': forecast_counts}
+    clean = {'forecast': forecast, 'lower': None, 'upper': None}
+
+    intervals = result.get('confidence_intervals') or {}
+    if intervals:
+        clean['lower'], counts['lower'] = sanitise_array(intervals.get('lower'), policy)
+        clean['upper'], counts['upper'] = sanitise_array(intervals.get('upper'), policy)
+
+    # Metrics are independent scalars and legitimately undefined at times
+    # (e.g. MAPE over zero actuals), so they are always zeroed, never refused
+    raw_metrics = result.get('metrics') or {}
+    metric_values, counts['metrics'] = sanitise_array(
+        [raw_metrics.get(name) for name in METRIC_NAMES], 'zero'
+    )
+    clean['metrics'] = dict(zip(METRIC_NAMES, metric_values.tolist()))
+
+    replaced = {name: entry for name, entry in counts.items() if any(entry.values())}
+    if replaced:
+        logger.warning(f"Replaced non-finite forecast outputs: {replaced}")
+    return clean, counts
+
@@ -0,0 +1,60 @@
+import pickle
+from typing import Any
+
+from .registry import load_backend
+
+
+class PackedModel:
+    """Portable stand-in for a fitted model object inside a pickled payload"""
+
+    def __init__(self, format: str, payload: Any):
+        self.format = format
+        self.payload = payload
+
+
+def pack_model(method: str, model) -> PackedModel:
+    """
+    Convert a fitted model into a form that survives pickling across processes:
+    Prophet JSON, Keras architecture plus weights, or the statsmodels results
+    object itself (which pickles natively).
+    """
+    if method == 'prophet':
+        from prophet.serialize import model_to_json
+        return PackedModel('prophet_json', model_to_json(model))
+    if method == 'lstm':
+        return PackedModel('keras', {
+            'config': model.to_json(),
+            'weights': model.get_weights()
+        })
+    return PackedModel('pickle', model)
+
+
+def unpack_model(packed: PackedModel):
+    """Rebuild a fitted model from pack_model output"""
+    if packed.format == 'prophet_json':
+        from prophet.serialize import model_from_json
+        return model_from_json(packed.payload)
+    if packed.format == 'keras':
+        tf = load_backend('tensorflow')
+        model = tf.keras.models.model_from_json(packed.payload['config'])
+        model.set_weights(packed.payload['weights'])
+        return model
+    if packed.format == 'pickle':
+        return packed.payload
+    raise ValueError(f"Unknown packed model format: {packed.format}")
+
+
+def dumps(value: Any) -> bytes:
+    """Serialise a cache value, packing the model of a fitted-model dict"""
+    if isinstance(value, dict) and 'method' in value and 'model' in value:
+        value = dict(value)
+        value['model'] = pack_model(value['method'], value['model'])
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads(payload: bytes) -> Any:
+    """Inverse of dumps"""
+    value = pickle.loads(payload)
+    if isinstance(value, dict) and isinstance(value.get('model'), PackedModel):
+        value['model'] = unpack_model(value['model'])
+    return value
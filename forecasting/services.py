@@ -1,80 +1,210 @@
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from sklearn.model_selection import TimeSeriesSplit
-import tensorflow as tf
-from statsmodels.tsa.arima.model import ARIMA
-from prophet import Prophet
 import logging
-from typing import Dict, List, Any, Tuple, Optional
-import json
+from typing import TYPE_CHECKING, Dict, List, Any, Tuple, Optional
+from concurrent.futures import Executor, Future, wait
+import copy
+import time
+import warnings
+from functools import partial
+from pandas.tseries.frequencies import to_offset
+
+from .baselines import BASELINE_METHODS, baseline_forecast
+from .conf import get_setting
+from .datasets import series_key
+from .executors import get_executor, get_search_executor
+from .model_cache import get_model_cache
+from .model_store import get_model_store
+from .profiling import StageTimer, stage, timed
+from .registry import get_method, load_backend, register_method
+
+if TYPE_CHECKING:
+    from prophet import Prophet
 
 logger = logging.getLogger(__name__)
 
+# Pandas aliases for the aggregation frequencies accepted in request parameters
+AGGREGATION_FREQUENCIES = {'D': 'D', 'W': 'W', 'M': 'MS', 'Q': 'QS'}
+
+# Default seasonal period per frequency, keyed by the offset's base alias (with
+# the aliases of pandas < 2.2). Yearly data has no seasonal cycle: period 1
+SEASON_LENGTHS = {'h': 24, 'H': 24, 'D': 7, 'B': 5, 'W': 52, 'SMS': 24, 'SME': 24, 'SM': 24,
+                  'MS': 12, 'ME': 12, 'M': 12, 'BMS': 12, 'BME': 12, 'BM': 12,
+                  'QS': 4, 'QE': 4, 'Q': 4, 'BQS': 4, 'BQE': 4, 'BQ': 4,
+                  'YS': 1, 'YE': 1, 'Y': 1, 'A': 1, 'AS': 1, 'BYS': 1, 'BYE': 1, 'BY': 1, 'BA': 1, 'BAS': 1}
+
 class ForecastingService:
     def __init__(self):
         self.scaler = MinMaxScaler()
         
-    def validate_data(self, data: List[Dict], date_column: str, target_column: str) -> Tuple[bool, str]:
-        """Validate input data for forecasting"""
+    @timed('extract')
+    def extract_columns(self, data: List[Dict], date_column: str,
+                        target_column: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pull the date and target columns out of the records in a single pass.
+
+        Returns the parsed dates (datetime64[ns]), the target coerced to
+        float64 (NaN where non-numeric) and the raw target values, which are
+        only kept for error messages. Other columns are never materialised.
+        """
+        if not data:
+            raise ValueError("No data provided")
+
+        # Check required columns
+        if not any(date_column in row for row in data):
+            raise ValueError(f"Date column '{date_column}' not found in data")
+        if not any(target_column in row for row in data):
+            raise ValueError(f"Target column '{target_column}' not found in data")
+
+        raw_dates = np.array([row.get(date_column) for row in data], dtype=object)
+        raw_values = np.array([row.get(target_column) for row in data], dtype=object)
+
+        dates = self.parse_dates(raw_dates, date_column)
+        values = pd.to_numeric(pd.Series(raw_values), errors='coerce').to_numpy(dtype='float64')
+        return dates, values, raw_values
+
+    def parse_dates(self, raw_dates: np.ndarray, date_column: str) -> np.ndarray:
+        """Parse raw date values, falling back to common explicit formats"""
         try:
-            # Check if data is empty
-            if not data:
-                return False, "No data provided"
+            return pd.to_datetime(raw_dates).to_numpy(dtype='datetime64[ns]')
+        except Exception as e:
+            logger.error(f"Error parsing dates: {str(e)}")
+            for format in ['%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y', '%m/%d/%Y']:
+                try:
+                    return pd.to_datetime(raw_dates, format=format).to_numpy(dtype='datetime64[ns]')
+                except (ValueError, TypeError):
+                    continue
+            raise ValueError(f"Invalid date format in column '{date_column}': {str(e)}")
 
-            # Convert to DataFrame
-            df = pd.DataFrame(data)
+    @timed('validate')
+    def check_arrays(self, dates: np.ndarray, values: np.ndarray, raw_values: np.ndarray,
+                     date_column: str, target_column: str) -> Tuple[bool, str]:
+        """Validate extracted date and target arrays for forecasting"""
+        # Check target column - must be numeric for forecasting
+        present = pd.notna(raw_values)
+        non_numeric = present & np.isnan(values)
+        if non_numeric.any():
+            non_numeric_values = [str(value) for value in raw_values[non_numeric][:3]]
+            return False, f"Target column '{target_column}' contains non-numeric values: {non_numeric_values}. Please select a numeric column for forecasting."
 
-            # Check required columns
-            if date_column not in df.columns:
-                return False, f"Date column '{date_column}' not found in data"
-            if target_column not in df.columns:
-                return False, f"Target column '{target_column}' not found in data"
+        # Check for missing values
+        if np.isnat(dates).any():
+            return False, f"Missing values found in date column '{date_column}'"
+        if not present.all():
+            return False, f"Missing values found in target column '{target_column}'"
 
-            # Check date column
-            try:
-                df[date_column] = pd.to_datetime(df[date_column])
-            except Exception as e:
-                return False, f"Invalid date format in column '{date_column}': {str(e)}"
+        # Check for duplicate dates
+        if len(np.unique(dates)) != len(dates):
+            return False, f"Duplicate dates found in column '{date_column}'"
 
-            # Check target column - must be numeric for forecasting
-            try:
-                # First check if the column contains any non-numeric values
-                sample_values = df[target_column].dropna().head(10).tolist()
-                non_numeric_values = []
-                for value in sample_values:
-                    try:
-                        float(value)
-                    except (ValueError, TypeError):
-                        non_numeric_values.append(str(value))
-                
-                if non_numeric_values:
-                    return False, f"Target column '{target_column}' contains non-numeric values: {non_numeric_values[:3]}. Please select a numeric column for forecasting."
-                
-                # Try to convert the entire column
-                df[target_column] = pd.to_numeric(df[target_column], errors='raise')
-                
-            except Exception as e:
-                return False, f"Target column '{target_column}' must contain only numeric values for forecasting. Found non-numeric data: {str(e)}"
+        # Check minimum data points
+        if len(dates) < 30:  # Arbitrary minimum, adjust as needed
+            return False, "Insufficient data points (minimum 30 required)"
 
-            # Check for missing values
-            if df[date_column].isnull().any():
-                return False, f"Missing values found in date column '{date_column}'"
-            if df[target_column].isnull().any():
-                return False, f"Missing values found in target column '{target_column}'"
+        return True, "Data validation successful"
 
-            # Check for duplicate dates
-            if df[date_column].duplicated().any():
-                return False, f"Duplicate dates found in column '{date_column}'"
+    @timed('prepare')
+    def prepare_arrays(self, dates: np.ndarray, values: np.ndarray, target_column: str,
+                       aggregation_freq: Optional[str] = None, aggregation: str = 'sum') -> pd.DataFrame:
+        """
+        Build the standardized 'Date'/'Value' frame from extracted arrays.
 
-            # Check minimum data points
-            if len(df) < 30:  # Arbitrary minimum, adjust as needed
-                return False, "Insufficient data points (minimum 30 required)"
+        The series keeps its native frequency, inferred from the dates, unless
+        aggregation_freq ('D', 'W', 'M' or 'Q') asks for it to be aggregated
+        to a coarser one. The frequency is recorded in the frame's attrs.
+        """
+        # Remove any rows with missing dates or non-numeric values
+        valid = ~np.isnat(dates) & ~np.isnan(values)
+        if not valid.all():
+            if not valid.any():
+                raise ValueError(f"Could not convert any values in target column '{target_column}' to numeric")
+            logger.warning(f"Removing {int((~valid).sum())} rows with missing dates or non-numeric values")
+            dates = dates[valid]
+            values = values[valid]
 
-            return True, "Data validation successful"
+        # Sort by date
+        order = np.argsort(dates, kind='stable')
+        series = pd.Series(values[order], index=pd.DatetimeIndex(dates[order]))
 
+        # Ensure data is complete and continuous at the series frequency
+        if aggregation_freq:
+            freq = self.resolve_frequency(aggregation_freq)
+            series = self.aggregate(series.resample(freq), aggregation)
+        else:
+            freq = self.infer_frequency(series.index.unique())
+            series = series.resample(freq).mean()
+
+        # Handle missing values
+        filled = series.interpolate(method='linear').to_numpy()
+
+        # Remove outliers (using IQR method)
+        q1, q3 = np.nanquantile(filled, [0.25, 0.75])
+        iqr = q3 - q1
+        filled = np.where(filled < q1 - 1.5 * iqr, q1, filled)
+        filled = np.where(filled > q3 + 1.5 * iqr, q3, filled)
+
+        df = pd.DataFrame({'Date': series.index, 'Value': filled})
+        df.attrs['freq'] = freq
+        return df
+
+    def resolve_frequency(self, aggregation_freq: str) -> str:
+        """Map a requested aggregation frequency to its pandas alias"""
+        freq = AGGREGATION_FREQUENCIES.get(str(aggregation_freq).upper())
+        if freq is None:
+            raise ValueError(
+                f"Unsupported aggregation frequency '{aggregation_freq}'. "
+                f"Use one of: {', '.join(AGGREGATION_FREQUENCIES)}"
+            )
+        return freq
+
+    def aggregate(self, resampled, aggregation: str):
+        """Aggregate a resampled series; empty periods stay NaN so they are interpolated"""
+        if aggregation == 'sum':
+            return resampled.sum(min_count=1)
+        if aggregation == 'mean':
+            return resampled.mean()
+        raise ValueError(f"Unsupported aggregation '{aggregation}'. Use 'sum' or 'mean'")
+
+    def infer_frequency(self, dates: pd.DatetimeIndex) -> str:
+        """
+        Frequency of sorted, unique dates. Regular series get their exact
+        pandas alias; irregular ones the closest of daily, weekly, monthly or
+        quarterly based on the median spacing.
+        """
+        if len(dates) >= 3:
+            freq = pd.infer_freq(dates)
+            if freq:
+                return freq
+        if len(dates) < 2:
+            return 'D'
+
+        spacing_days = np.median(np.diff(dates.asi8)) / pd.Timedelta(days=1).value
+        if spacing_days <= 1.5:
+            return 'D'
+        if spacing_days <= 10:
+            return 'W'
+        if spacing_days <= 45:
+            return 'MS'
+        return 'QS'
+
+    def series_freq(self, df: pd.DataFrame) -> str:
+        """Frequency of a prepared series, inferring it when the frame carries none"""
+        return df.attrs.get('freq') or self.infer_frequency(pd.DatetimeIndex(df['Date']))
+
+    def season_length(self, freq: str) -> int:
+        """Default seasonal period (e.g. 7 for daily, 12 for monthly data)"""
+        return SEASON_LENGTHS.get(to_offset(freq).name.split('-')[0], 7)
+
+    def validate_data(self, data: List[Dict], date_column: str, target_column: str) -> Tuple[bool, str]:
+        """Validate input data for forecasting"""
+        try:
+            dates, values, raw_values = self.extract_columns(data, date_column, target_column)
+            return self.check_arrays(dates, values, raw_values, date_column, target_column)
+        except ValueError as e:
+            return False, str(e)
         except Exception as e:
             logger.error(f"Error in data validation: {str(e)}")
             return False, f"Error validating data: {str(e)}"
@@ -82,95 +212,114 @@ class ForecastingService:
     def prepare_data(self, data: List[Dict], date_column: str, target_column: str) -> pd.DataFrame:
         """Prepare data for forecasting with enhanced preprocessing"""
         try:
-            df = pd.DataFrame(data)
-            
-            # Ensure date column is properly formatted
-            try:
-                # First try parsing as is
-                df[date_column] = pd.to_datetime(df[date_column])
-            except Exception as e:
-                logger.error(f"Error parsing dates: {str(e)}")
-                # If that fails, try common formats
-                for format in ['%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y', '%m/%d/%Y']:
-                    try:
-                        df[date_column] = pd.to_datetime(df[date_column], format=format)
-                        break
-                    except:
-                        continue
-                
-                if not pd.api.types.is_datetime64_any_dtype(df[date_column]):
-                    raise ValueError(f"Unable to parse dates in column {date_column}")
-
-            # Sort by date
-            df = df.sort_values(date_column)
-            
-            # Ensure target column is numeric - be strict about this
-            try:
-                # Log original data types for debugging
-                logger.info(f"Target column '{target_column}' original dtype: {df[target_column].dtype}")
-                logger.info(f"Sample values: {df[target_column].head().tolist()}")
-                
-                # First check for non-numeric values
-                original_values = df[target_column].copy()
-                numeric_converted = pd.to_numeric(df[target_column], errors='coerce')
-                non_numeric_mask = numeric_converted.isna()
-                
-                if non_numeric_mask.any():
-                    non_numeric_values = original_values.loc[non_numeric_mask].unique()[:5]
-                    logger.error(f"Found non-numeric values in target column '{target_column}': {list(non_numeric_values)}")
-                    
-                    # Try to clean the data by removing non-numeric rows
-                    logger.warning(f"Removing {non_numeric_mask.sum()} rows with non-numeric values")
-                    df = df[~non_numeric_mask].copy()
-                    
-                    if len(df) == 0:
-                        raise ValueError(f"All rows in target column '{target_column}' contain non-numeric values")
-                    
-                    # Re-convert after cleaning
-                    df[target_column] = pd.to_numeric(df[target_column], errors='coerce')
-                else:
-                    df[target_column] = numeric_converted
-                    
-                # Final check for successful conversion
-                if df[target_column].isna().all():
-                    raise ValueError(f"Could not convert any values in target column '{target_column}' to numeric")
-                    
-                logger.info(f"Successfully converted target column to numeric. Final dtype: {df[target_column].dtype}")
-                
-            except Exception as e:
-                logger.error(f"Error in target column conversion: {str(e)}")
-                raise ValueError(f"Cannot convert target column '{target_column}' to numeric: {str(e)}")
-            
-            # Remove any rows with NaN values
-            df = df.dropna(subset=[date_column, target_column])
-            
-            # Ensure data is complete and continuous
-            date_range = pd.date_range(start=df[date_column].min(), end=df[date_column].max(), freq='D')
-            df = df.set_index(date_column).reindex(date_range).reset_index()
-            df = df.rename(columns={'index': date_column})
-            
-            # Handle missing values
-            df[target_column] = df[target_column].interpolate(method='linear')
-            
-            # Remove outliers (using IQR method)
-            Q1 = df[target_column].quantile(0.25)
-            Q3 = df[target_column].quantile(0.75)
-            IQR = Q3 - Q1
-            df.loc[df[target_column] < (Q1 - 1.5 * IQR), target_column] = Q1
-            df.loc[df[target_column] > (Q3 + 1.5 * IQR), target_column] = Q3
-            
-            # Standardize column names for internal processing
-            df = df.rename(columns={
-                date_column: 'Date',
-                target_column: 'Value'
-            })
-            
-            return df
-            
+            dates, values, _ = self.extract_columns(data, date_column, target_column)
+            return self.prepare_arrays(dates, values, target_column)
         except Exception as e:
             logger.error(f"Error in prepare_data: {str(e)}")
             raise ValueError(f"Error preparing data: {str(e)}")
 
+    def prepare_batch(self, data: List[Dict], date_column: str, target_column: str,
+                      series_column: str, aggregation_freq: Optional[str] = None,
+                      aggregation: str = 'sum') -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Prepare every series of a long-format dataset in one vectorised pass.
+
+        Applies the same steps as prepare_data (resampling to the native or
+        requested frequency, linear interpolation, IQR outlier capping) with
+        groupby operations instead of a per-series loop. The native frequency
+        is inferred from the longest series and shared by all of them.
+        Duplicate dates within a series are averaged.
+        Returns the prepared 'Date'/'Value' frames by series id, and an error
+        message for every series that cannot be forecast.
+        """
+        if not data:
+            raise ValueError("No data provided")
+
+        df = pd.DataFrame(data, columns=[series_column, date_column, target_column])
+        for column in (series_column, date_column, target_column):
+            if df[column].isna().all():
+                raise ValueError(f"Column '{column}' not found in data")
+
+        # Series ids as the stored dataset will hold them (see series_key), one
+        # conversion per distinct value
+        codes, uniques = pd.factorize(df[series_column], use_na_sentinel=False)
+        df[series_column] = np.array([series_key(value) for value in uniques], dtype=object)[codes]
+        df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
+        df[target_column] = pd.to_numeric(df[target_column], errors='coerce')
+
+        errors = {}
+        invalid_rows = df[date_column].isna() | df[target_column].isna()
+        if invalid_rows.any():
+            logger.warning(f"Dropping {int(invalid_rows.sum())} rows with unparseable dates or non-numeric values")
+        df = df[~invalid_rows]
+
+        # Check minimum data points per series
+        counts = df.groupby(series_column).size()
+        too_short = counts.index[counts < 30]
+        for series_id in too_short:
+            errors[series_id] = "Insufficient data points (minimum 30 required)"
+        df = df[~df[series_column].isin(too_short)]
+
+        if df.empty:
+            return {}, errors
+
+        # Continuous index per series at a common frequency
+        by_series = df.set_index(date_column).groupby(series_column)[target_column]
+        if aggregation_freq:
+            freq = self.resolve_frequency(aggregation_freq)
+            regular = self.aggregate(by_series.resample(freq), aggregation)
+        else:
+            longest = df.loc[df[series_column] == counts.idxmax(), date_column]
+            freq = self.infer_frequency(pd.DatetimeIndex(longest).sort_values().unique())
+            regular = by_series.resample(freq).mean()
+
+        # Gaps are always interior to a series, bounded by that series' own
+        # observations, so a single interpolation over the stacked frame never
+        # crosses a series boundary
+        regular = regular.interpolate(method='linear')
+
+        # Remove outliers (using IQR method) per series
+        grouped = regular.groupby(level=0)
+        q1 = grouped.transform('quantile', 0.25)
+        q3 = grouped.transform('quantile', 0.75)
+        iqr = q3 - q1
+        regular = regular.where(regular >= q1 - 1.5 * iqr, q1)
+        regular = regular.where(regular <= q3 + 1.5 * iqr, q3)
+
+        frame = regular.rename('Value').reset_index().rename(columns={date_column: 'Date'})
+        prepared = {}
+        for series_id, group in frame.groupby(series_column, sort=False):
+            prepared[series_id] = group[['Date', 'Value']].reset_index(drop=True)
+            prepared[series_id].attrs['freq'] = freq
+        return prepared, errors
+
+    def submit_batch(self, series: Dict[str, pd.DataFrame], method: str, forecast_period: int,
+                     parameters: Optional[Dict[str, Any]] = None,
+                     executor: Optional[Executor] = None) -> Dict[str, Future]:
+        """Dispatch one forecast per prepared series to the executor"""
+        forecast_method = get_method(method)
+        if parameters is None:
+            parameters = {}
+
+        if forecast_method.batch is not None:
+            # Vectorised methods forecast all series in-process in one pass
+            futures = {}
+            for series_id, result in forecast_method.batch(self, series, forecast_period, parameters).items():
+                future = Future()
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+                futures[series_id] = future
+            return futures
+
+        executor = executor or get_executor()
+        return {
+            series_id: executor.submit(run_prepared_forecast_task, method, df, forecast_period, parameters)
+            for series_id, df in series.items()
+        }
+
+    @timed('evaluate')
     def evaluate_model(self, y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
         """Calculate comprehensive model evaluation metrics"""
         def safe_metric_calculation(func, *args, default_value=0.0):
@@ -241,325 +390,1036 @@ class ForecastingService:
         
         return metrics
 
-    def cross_validate(self, data: np.ndarray, n_splits: int = 5) -> Dict[str, List[float]]:
-        """Perform time series cross-validation"""
-        tscv = TimeSeriesSplit(n_splits=n_splits)
-        cv_scores = {
-            'mse': [], 'rmse': [], 'mae': [], 'r2': [], 'mape': []
+    def cross_validate(self, data: List[Dict], date_column: str, target_column: str, method: str,
+                       n_splits: int = 5, parameters: Optional[Dict[str, Any]] = None,
+                       window: str = 'expanding', max_train_size: Optional[int] = None,
+                       test_size: Optional[int] = None, max_folds: Optional[int] = None,
+                       refit_every: int = 1, executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """
+        Rolling-origin backtest of a forecasting method.
+
+        Folds come from TimeSeriesSplit over the prepared series, using an
+        expanding window or a sliding window of max_train_size points. Only the
+        most recent max_folds folds are kept. The model is refitted every
+        refit_every folds; in between, the last fit forecasts further ahead.
+        Each refit block runs as one task on the executor, so blocks are
+        evaluated in parallel with a process pool.
+        """
+        get_method(method)
+        if window not in ('expanding', 'sliding'):
+            raise ValueError(f"Unsupported backtest window: {window}")
+        if refit_every < 1:
+            raise ValueError("refit_every must be at least 1")
+        if parameters is None:
+            parameters = {}
+
+        df = self.load_series(data, date_column, target_column, parameters)
+
+        if window == 'sliding' and not max_train_size:
+            # Default to the training size of the first expanding fold
+            max_train_size = len(df) // (n_splits + 1)
+
+        tscv = TimeSeriesSplit(
+            n_splits=n_splits,
+            max_train_size=max_train_size if window == 'sliding' else None,
+            test_size=test_size
+        )
+        folds = [(train_idx, test_idx) for train_idx, test_idx in tscv.split(df)]
+        if max_folds:
+            folds = folds[-max_folds:]
+
+        blocks = [folds[i:i + refit_every] for i in range(0, len(folds), refit_every)]
+
+        executor = executor or get_executor()
+        futures = [
+            executor.submit(run_backtest_block, method, df, block, parameters)
+            for block in blocks
+        ]
+
+        fold_results = []
+        for future in futures:
+            fold_results.extend(future.result())
+        for fold_number, fold in enumerate(fold_results, start=1):
+            fold['fold'] = fold_number
+
+        metric_names = list(fold_results[0]['metrics'].keys()) if fold_results else []
+        aggregate = {
+            name: float(np.mean([fold['metrics'][name] for fold in fold_results]))
+            for name in metric_names
         }
-        
-        for train_idx, test_idx in tscv.split(data):
-            train, test = data[train_idx], data[test_idx]
-            # TODO: Implement model training and prediction for cross-validation
-            # This will depend on the specific model being used
-        
-        return cv_scores
+        aggregate_std = {
+            name: float(np.std([fold['metrics'][name] for fold in fold_results]))
+            for name in metric_names
+        }
+
+        return {
+            'method': method,
+            'window': window,
+            'n_folds': len(fold_results),
+            'refit_every': refit_every,
+            'folds': fold_results,
+            'aggregate': aggregate,
+            'aggregate_std': aggregate_std
+        }
+
+    def backtest_block(self, method: str, df: pd.DataFrame, block: List[Tuple[np.ndarray, np.ndarray]],
+                       parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fit once on the first fold's training window and score every fold in the block"""
+        first_train_idx = block[0][0]
+        origin = first_train_idx[-1]
+        steps = int(max(test_idx[-1] for _, test_idx in block) - origin)
+
+        forecast_method = get_method(method)
+        fitted = forecast_method.fit(self, df.iloc[first_train_idx], parameters, steps)
+        forecast = np.asarray(forecast_method.predict(self, fitted, steps)['forecast'], dtype=float)
 
-    def create_sequences(self, data: np.ndarray, seq_length: int) -> Tuple[np.ndarray, np.ndarray]:
-        """Create sequences for LSTM with validation"""
-        if len(data) <= seq_length:
-            raise ValueError(f"Data length ({len(data)}) must be greater than sequence length ({seq_length})")
+        results = []
+        for position, (train_idx, test_idx) in enumerate(block):
+            # Offsets of the test points within the forecast made from the block origin
+            offsets = test_idx - origin - 1
+            actual = df['Value'].values[test_idx]
+            results.append({
+                'train_start': df['Date'].iloc[train_idx[0]].strftime('%Y-%m-%d'),
+                'train_end': df['Date'].iloc[train_idx[-1]].strftime('%Y-%m-%d'),
+                'test_start': df['Date'].iloc[test_idx[0]].strftime('%Y-%m-%d'),
+                'test_end': df['Date'].iloc[test_idx[-1]].strftime('%Y-%m-%d'),
+                'train_size': int(len(train_idx)),
+                'test_size': int(len(test_idx)),
+                'refit': position == 0,
+                'metrics': self.evaluate_model(actual, forecast[offsets])
+            })
+        return results
+
+    def create_sequences(self, data: np.ndarray, seq_length: int, horizon: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Create sequences for LSTM with validation. Targets span `horizon` steps when horizon > 1"""
+        if len(data) < seq_length + horizon:
+            raise ValueError(f"Data length ({len(data)}) must be at least sequence length plus horizon ({seq_length + horizon})")
         
         xs, ys = [], []
-        for i in range(len(data) - seq_length):
+        for i in range(len(data) - seq_length - horizon + 1):
             xs.append(data[i:(i + seq_length)])
-            ys.append(data[i + seq_length])
+            if horizon == 1:
+                ys.append(data[i + seq_length])
+            else:
+                ys.append(data[(i + seq_length):(i + seq_length + horizon)].reshape(-1))
         return np.array(xs), np.array(ys)
 
-    def lstm_forecast(self, data: List[Dict], date_column: str, target_column: str, 
-                     forecast_period: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate forecast using LSTM"""
+    def lstm_rollout(self, model, input_sequence: np.ndarray, steps: int) -> np.ndarray:
+        """
+        Recursive multi-step LSTM forecast inside a single compiled tf.function,
+        so the horizon costs one graph call instead of one predict() per step.
+        The function is traced once per model (see compiled_rollout).
+        """
+        tf = load_backend('tensorflow')
+        seq_length = input_sequence.shape[0]
+        rollout = compiled_rollout(model, seq_length)
+        window = tf.constant(input_sequence.reshape(1, seq_length, 1), dtype=tf.float32)
+        return rollout(window, tf.constant(steps, dtype=tf.int32)).numpy()
+
+    def load_series(self, data: List[Dict], date_column: str, target_column: str,
+                    parameters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        Validate and prepare input data, returning the standardized 'Date'/'Value' frame.
+        The records are parsed once; validation and preparation share the arrays.
+        """
+        dates, values, raw_values = self.extract_columns(data, date_column, target_column)
+        is_valid, message = self.check_arrays(dates, values, raw_values, date_column, target_column)
+        if not is_valid:
+            raise ValueError(message)
+
+        parameters = parameters or {}
+        return self.prepare_arrays(
+            dates, values, target_column,
+            aggregation_freq=parameters.get('aggregation_freq'),
+            aggregation=parameters.get('aggregation', 'sum')
+        )
+
+    def future_dates(self, last_date, forecast_period: int, freq: str = 'D') -> pd.DatetimeIndex:
+        """Dates of the forecast horizon following last_date at the series frequency"""
+        offset = to_offset(freq)
+        return pd.date_range(
+            start=pd.to_datetime(last_date) + offset,
+            periods=forecast_period,
+            freq=offset
+        )
+
+    def forecast_prepared(self, method: str, df: pd.DataFrame, forecast_period: int,
+                          parameters: Dict[str, Any], model_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Forecast a prepared series, reusing cached fits. Identical requests are
+        answered from the result cache; requests that differ only by horizon
+        reuse the cached fitted model and only run the predict step. With a
+        model_id the fitted model is also written to the model store.
+        """
+        forecast_method = get_method(method)
+        forecast_method.load()
+
+        def fit(df, parameters, forecast_period):
+            with stage('fit'):
+                return forecast_method.fit(self, df, parameters, forecast_period)
+
+        def predict(fitted, forecast_period):
+            with stage('predict'):
+                return forecast_method.predict(self, fitted, forecast_period)
+
+        cache = get_model_cache() if forecast_method.cacheable else None
+        if cache is None:
+            fitted = fit(df, parameters, forecast_period)
+            result = predict(fitted, forecast_period)
+            result['model_path'] = self.store_model(model_id, fitted)
+            return result
+
+        horizon_dependent = forecast_method.is_horizon_dependent(parameters)
+        model_key = cache.model_key(df, method, parameters, forecast_period if horizon_dependent else None)
+        result_key = cache.result_key(model_key, forecast_period)
+
+        result = cache.get(result_key)
+        if result is not None:
+            logger.info(f"Serving cached {method} forecast {result_key[:12]}")
+            result = copy.deepcopy(result)
+            if model_id:
+                fitted = cache.get(model_key)
+                if fitted is None:
+                    fitted = fit(df, parameters, forecast_period)
+                    cache.set(model_key, fitted)
+                result['model_path'] = self.store_model(model_id, fitted)
+            return result
+
+        fitted = cache.get(model_key)
+        if fitted is None:
+            fitted = fit(df, parameters, forecast_period)
+            cache.set(model_key, fitted)
+        else:
+            logger.info(f"Reusing cached {method} model {model_key[:12]} for a {forecast_period}-step horizon")
+
+        result = predict(fitted, forecast_period)
+        # Lets later requests find the fitted model again, e.g. to update it
+        result['model_key'] = model_key
+        cache.set(result_key, result)
+        result = copy.deepcopy(result)
+        result['model_path'] = self.store_model(model_id, fitted)
+        return result
+
+    def store_model(self, model_id: Optional[str], fitted: Dict[str, Any]) -> Optional[str]:
+        """Persist a fitted model under model_id; a failed write never fails the forecast"""
+        if not model_id:
+            return None
         try:
-            # Validate data
-            is_valid, message = self.validate_data(data, date_column, target_column)
-            if not is_valid:
-                raise ValueError(message)
+            with stage('store'):
+                return get_model_store().save(model_id, fitted)
+        except Exception as e:
+            logger.warning(f"Could not store fitted model for {model_id}: {str(e)}")
+            return None
 
-            # Prepare data
-            df = self.prepare_data(data, date_column, target_column)
-            
-            # At this point, df has standardized column names 'Date' and 'Value'
-            values = df['Value'].values.reshape(-1, 1)
-            scaled_values = self.scaler.fit_transform(values)
-
-            # Create sequences
-            seq_length = parameters.get('sequence_length', 10)
-            X, y = self.create_sequences(scaled_values, seq_length)
-
-            # Split data
-            train_size = int(len(X) * 0.8)
-            X_train, X_test = X[:train_size], X[train_size:]
-            y_train, y_test = y[:train_size], y[train_size:]
-
-            # Build model with additional layers and dropout
-            model = tf.keras.Sequential([
-                tf.keras.layers.LSTM(50, activation='relu', input_shape=(seq_length, 1), return_sequences=True),
-                tf.keras.layers.Dropout(0.2),
-                tf.keras.layers.LSTM(30, activation='relu'),
-                tf.keras.layers.Dropout(0.2),
-                tf.keras.layers.Dense(20, activation='relu'),
-                tf.keras.layers.Dense(1)
-            ])
-
-            # Compile with learning rate schedule
-            initial_learning_rate = 0.001
-            lr_schedule = tf.keras.optimizers.schedules.ExponentialDecay(
-                initial_learning_rate, decay_steps=100, decay_rate=0.9
-            )
-            optimizer = tf.keras.optimizers.Adam(learning_rate=lr_schedule)
-            model.compile(optimizer=optimizer, loss='mse')
-
-            # Train model with early stopping
-            early_stopping = tf.keras.callbacks.EarlyStopping(
-                monitor='val_loss',
-                patience=10,
-                restore_best_weights=True
+    def reforecast(self, method: str, model_id: str, forecast_period: int,
+                   parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Forecast a new horizon from a stored fitted model, without training"""
+        forecast_method = get_method(method)
+        fitted = get_model_store().load(model_id)
+        if fitted is None:
+            raise ValueError("No stored model for this forecast; generate it again to enable re-forecasting")
+        if forecast_method.is_horizon_dependent(parameters) and forecast_period != fitted.get('horizon'):
+            raise ValueError(
+                f"This {forecast_method.title} model was trained for a {fitted.get('horizon')}-step horizon "
+                f"and must be refitted for a {forecast_period}-step forecast"
             )
 
-            model.fit(
-                X_train, y_train,
-                epochs=100,
-                batch_size=32,
-                validation_split=0.2,
-                callbacks=[early_stopping],
-                verbose=0
-            )
+        forecast_method.load()
+        return forecast_method.predict(self, fitted, forecast_period)
 
-            # Generate future dates
-            last_date = pd.to_datetime(df['Date'].iloc[-1])
-            future_dates = pd.date_range(
-                start=last_date + pd.Timedelta(days=1),
-                periods=forecast_period,
-                freq='D'
-            )
+    def update_forecast(self, method: str, data: List[Dict], date_column: str, target_column: str,
+                        forecast_period: int, parameters: Dict[str, Any],
+                        model_key: Optional[str], model_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Forecast after new observations were added to a series.
 
-            # Prepare input sequence for forecasting
-            input_sequence = scaled_values[-seq_length:]
-
-            # Generate forecasts
-            forecasts = []
-            for _ in range(forecast_period):
-                # Reshape input sequence for prediction
-                X_pred = input_sequence.reshape(1, seq_length, 1)
-                # Get prediction
-                y_pred = model.predict(X_pred, verbose=0)
-                # Append prediction to forecasts
-                forecasts.append(y_pred[0, 0])
-                # Update input sequence
-                input_sequence = np.roll(input_sequence, -1)
-                input_sequence[-1] = y_pred
-
-            # Inverse transform the forecasts
-            forecasts = self.scaler.inverse_transform(np.array(forecasts).reshape(-1, 1))
-
-            # Calculate metrics using the test set
-            y_pred_test = model.predict(X_test, verbose=0)
-            y_pred_test = self.scaler.inverse_transform(y_pred_test)
-            y_test_actual = self.scaler.inverse_transform(y_test.reshape(-1, 1))
-            metrics = self.evaluate_model(y_test_actual, y_pred_test)
-
-            # Calculate confidence intervals (using prediction std as a simple approach)
-            std = np.std(y_test_actual - y_pred_test)
-            confidence_intervals = {
-                'lower': forecasts - 1.96 * std,
-                'upper': forecasts + 1.96 * std
-            }
+        data is the full series including the new records. When the model
+        fitted on the earlier data is still cached or stored and the method
+        supports updates, only the observations after its last date are
+        applied to it; otherwise the series is fitted from scratch.
+        """
+        forecast_method = get_method(method)
+        try:
+            with StageTimer() as timer, timer.stage('total'):
+                df = self.load_series(data, date_column, target_column, parameters)
+                result = self.update_prepared(method, df, forecast_period, parameters, model_key, model_id)
+            result['timings'] = timer.as_dict()
+            return result
+
+        except Exception as e:
+            logger.error(f"Error updating {forecast_method.title} forecast: {str(e)}")
+            raise ValueError(f"Error updating {forecast_method.title} forecast: {str(e)}")
+
+    def update_prepared(self, method: str, df: pd.DataFrame, forecast_period: int,
+                        parameters: Dict[str, Any], model_key: Optional[str],
+                        model_id: Optional[str] = None) -> Dict[str, Any]:
+        """Update (or refit) the model of an already prepared series and forecast"""
+        forecast_method = get_method(method)
+        cache = get_model_cache() if forecast_method.cacheable else None
+        fitted = None
+        if forecast_method.update is not None:
+            if cache and model_key:
+                fitted = cache.get(model_key)
+            if fitted is None and model_id:
+                fitted = get_model_store().load(model_id)
+        if fitted is None:
+            logger.info(f"No fitted {method} model to update, refitting from scratch")
+            return self.forecast_prepared(method, df, forecast_period, parameters, model_id)
+
+        forecast_method.load()
+        new_rows = df[df['Date'] > pd.Timestamp(fitted['last_date'])]
+        if not new_rows.empty:
+            with stage('update'):
+                fitted = forecast_method.update(self, fitted, new_rows, parameters)
+
+        with stage('predict'):
+            result = forecast_method.predict(self, fitted, forecast_period)
+        if cache:
+            horizon = forecast_period if forecast_method.is_horizon_dependent(parameters) else None
+            new_key = cache.model_key(df, method, parameters, horizon)
+            cache.set(new_key, fitted)
+            result['model_key'] = new_key
+            cache.set(cache.result_key(new_key, forecast_period), result)
+            result = copy.deepcopy(result)
+        result['model_path'] = self.store_model(model_id, fitted)
+        return result
+
+    def fit_lstm(self, df: pd.DataFrame, parameters: Dict[str, Any], forecast_period: int) -> Dict[str, Any]:
+        """Train the LSTM model on a prepared series"""
+        # At this point, df has standardized column names 'Date' and 'Value'
+        values = df['Value'].values.reshape(-1, 1)
+        self.scaler = MinMaxScaler()
+        scaled_values = self.scaler.fit_transform(values)
+
+        # 'recursive' feeds each prediction back in as the next input;
+        # 'direct' emits the whole horizon from a multi-output head
+        output_mode = parameters.get('output_mode', 'recursive')
+        if output_mode not in ('recursive', 'direct'):
+            raise ValueError(f"Unsupported LSTM output mode: {output_mode}")
+        horizon = forecast_period if output_mode == 'direct' else 1
+
+        # Create sequences
+        seq_length = parameters.get('sequence_length', 10)
+        X, y = self.create_sequences(scaled_values, seq_length, horizon)
+
+        # Split data
+        train_size = int(len(X) * 0.8)
+        if train_size == 0 or train_size == len(X):
+            raise ValueError(f"Not enough sequences ({len(X)}) to train and evaluate the LSTM model")
+        X_train, X_test = X[:train_size], X[train_size:]
+        y_train, y_test = y[:train_size], y[train_size:]
+
+        # Build model with additional layers and dropout
+        tf = load_backend('tensorflow')
+        model = tf.keras.Sequential([
+            tf.keras.layers.LSTM(50, activation='relu', input_shape=(seq_length, 1), return_sequences=True),
+            tf.keras.layers.Dropout(0.2),
+            tf.keras.layers.LSTM(30, activation='relu'),
+            tf.keras.layers.Dropout(0.2),
+            tf.keras.layers.Dense(20, activation='relu'),
+            tf.keras.layers.Dense(horizon)
+        ])
+
+        # Compile with learning rate schedule
+        initial_learning_rate = 0.001
+        lr_schedule = tf.keras.optimizers.schedules.ExponentialDecay(
+            initial_learning_rate, decay_steps=100, decay_rate=0.9
+        )
+        optimizer = tf.keras.optimizers.Adam(learning_rate=lr_schedule)
+        model.compile(optimizer=optimizer, loss='mse')
+
+        # Train model with early stopping
+        early_stopping = tf.keras.callbacks.EarlyStopping(
+            monitor='val_loss',
+            patience=10,
+            restore_best_weights=True
+        )
+
+        model.fit(
+            X_train, y_train,
+            epochs=100,
+            batch_size=32,
+            validation_split=0.2,
+            callbacks=[early_stopping],
+            verbose=0
+        )
+
+        # Calculate metrics using the test set (every horizon step in direct mode)
+        y_pred_test = model.predict(X_test, verbose=0)
+        y_pred_test = self.scaler.inverse_transform(y_pred_test.reshape(-1, 1))
+        y_test_actual = self.scaler.inverse_transform(y_test.reshape(-1, 1))
+        metrics = self.evaluate_model(y_test_actual, y_pred_test)
+
+        return {
+            'method': 'lstm',
+            'model': model,
+            'scaler': self.scaler,
+            'output_mode': output_mode,
+            'horizon': horizon,
+            # Input sequence for forecasting
+            'input_sequence': scaled_values[-seq_length:],
+            # Prediction std used for the confidence intervals
+            'std': float(np.std(y_test_actual - y_pred_test)),
+            'metrics': metrics,
+            'last_date': df['Date'].iloc[-1],
+            'freq': self.series_freq(df)
+        }
+
+    def predict_lstm(self, fitted: Dict[str, Any], forecast_period: int) -> Dict[str, Any]:
+        """Forecast forecast_period steps from a fitted LSTM"""
+        model = fitted['model']
+        scaler = fitted['scaler']
+        input_sequence = fitted['input_sequence']
+        seq_length = input_sequence.shape[0]
+
+        # Generate forecasts
+        if fitted['output_mode'] == 'direct':
+            if forecast_period != fitted['horizon']:
+                raise ValueError(f"Direct LSTM model was trained for a {fitted['horizon']}-step horizon, not {forecast_period}")
+            forecasts = model.predict(input_sequence.reshape(1, seq_length, 1), verbose=0)[0]
+        else:
+            forecasts = self.lstm_rollout(model, input_sequence, forecast_period)
+
+        # Inverse transform the forecasts
+        forecasts = scaler.inverse_transform(np.array(forecasts).reshape(-1, 1))
 
-            # Convert forecast to simple list of floats (like Prophet)
-            forecast_list = forecasts.flatten().tolist()
-
-            return {
-                'forecast': forecast_list,  # Simple list of numbers
-                'dates': [d.strftime('%Y-%m-%d') for d in future_dates],
-                'metrics': metrics,
-                'confidence_intervals': {
-                    'lower': confidence_intervals['lower'].flatten().tolist(),
-                    'upper': confidence_intervals['upper'].flatten().tolist()
-                }
+        # Calculate confidence intervals (using prediction std as a simple approach)
+        std = fitted['std']
+        confidence_intervals = {
+            'lower': forecasts - 1.96 * std,
+            'upper': forecasts + 1.96 * std
+        }
+
+        # Generate future dates
+        future_dates = self.future_dates(fitted['last_date'], forecast_period, fitted['freq'])
+
+        return {
+            'forecast': forecasts.flatten().tolist(),  # Simple list of numbers
+            'dates': [d.strftime('%Y-%m-%d') for d in future_dates],
+            'metrics': dict(fitted['metrics']),
+            'confidence_intervals': {
+                'lower': confidence_intervals['lower'].flatten().tolist(),
+                'upper': confidence_intervals['upper'].flatten().tolist()
             }
+        }
+
+    def forecast(self, method: str, data: List[Dict], date_column: str, target_column: str,
+                 forecast_period: int, parameters: Dict[str, Any],
+                 model_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Validate, prepare and forecast data with any registered method.
+        The result's 'timings' hold the wall/CPU time and peak memory of each stage.
+        """
+        forecast_method = get_method(method)
+        try:
+            with StageTimer() as timer, timer.stage('total'):
+                df = self.load_series(data, date_column, target_column, parameters)
+                result = self.forecast_prepared(method, df, forecast_period, parameters, model_id)
+            result['timings'] = timer.as_dict()
+            return result
 
         except Exception as e:
-            logger.error(f"Error in LSTM forecast: {str(e)}")
-            raise ValueError(f"Error in LSTM forecast: {str(e)}")
+            logger.error(f"Error in {forecast_method.title} forecast: {str(e)}")
+            raise ValueError(f"Error in {forecast_method.title} forecast: {str(e)}")
+
+    def lstm_forecast(self, data: List[Dict], date_column: str, target_column: str, 
+                     forecast_period: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate forecast using LSTM"""
+        return self.forecast('lstm', data, date_column, target_column, forecast_period, parameters)
+
+    def select_arima_differencing(self, values: np.ndarray, max_d: int = 2, alpha: float = 0.05) -> int:
+        """
+        Choose the order of differencing d: difference until the KPSS test no
+        longer rejects stationarity and the ADF test rejects a unit root.
+        """
+        stattools = load_backend('stattools')
+        series = np.asarray(values, dtype=float)
+        for d in range(max_d + 1):
+            if len(series) < 10 or np.ptp(series) == 0:
+                return d
+            with warnings.catch_warnings():
+                # KPSS warns when the statistic falls outside its lookup table
+                warnings.simplefilter('ignore')
+                kpss_pvalue = stattools.kpss(series, regression='c', nlags='auto')[1]
+                adf_pvalue = stattools.adfuller(series, autolag='AIC')[1]
+            if kpss_pvalue >= alpha and adf_pvalue < alpha:
+                return d
+            series = np.diff(series)
+        return max_d
+
+    def search_arima_order(self, values: np.ndarray, parameters: Dict[str, Any], freq: str,
+                           executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """
+        Stepwise ARIMA order search (Hyndman-Khandakar).
+
+        d is chosen by stationarity tests. Starting from a few seed models, each
+        round fits the neighbours of the best (p, q[, P, Q]) found so far
+        concurrently and keeps the lowest AIC. The search stops when a round
+        brings no improvement or search_timeout seconds have passed. At the
+        deadline, candidates that have not started are skipped and running
+        fits stop at their next optimizer iteration (see run_arima_candidate),
+        so no work outlives the budget.
+
+        Candidates run on the dedicated search pool (get_search_executor), never
+        on the shared forecast executor this fit may itself be running on.
+        """
+        executor = executor or get_search_executor()
+        max_p = int(parameters.get('max_p', 3))
+        max_q = int(parameters.get('max_q', 3))
+        seasonal = bool(parameters.get('seasonal', False))
+        max_seasonal_p = int(parameters.get('max_seasonal_p', 1)) if seasonal else 0
+        max_seasonal_q = int(parameters.get('max_seasonal_q', 1)) if seasonal else 0
+        m = int(parameters.get('m', self.season_length(freq))) if seasonal else 0
+        if seasonal and m < 2:
+            # No seasonal cycle to model (e.g. yearly data)
+            seasonal, m = False, 0
+            max_seasonal_p = max_seasonal_q = 0
+        seasonal_d = int(parameters.get('seasonal_d', 1)) if seasonal else 0
+        timeout = float(parameters.get('search_timeout', get_setting('FORECAST_ARIMA_SEARCH_TIMEOUT', 60)))
+
+        if 'd' in parameters:
+            d = int(parameters['d'])
+        else:
+            # Test the seasonally differenced series
+            series = np.asarray(values, dtype=float)
+            for _ in range(seasonal_d):
+                series = series[m:] - series[:-m]
+            d = self.select_arima_differencing(series, max_d=int(parameters.get('max_d', 2)))
+
+        def in_bounds(candidate):
+            p, q, P, Q = candidate
+            return 0 <= p <= max_p and 0 <= q <= max_q and 0 <= P <= max_seasonal_p and 0 <= Q <= max_seasonal_q
+
+        def neighbours(candidate):
+            p, q, P, Q = candidate
+            steps = [(dp, dq, 0, 0) for dp in (-1, 0, 1) for dq in (-1, 0, 1) if dp or dq]
+            if seasonal:
+                steps += [(0, 0, dP, dQ) for dP in (-1, 0, 1) for dQ in (-1, 0, 1) if dP or dQ]
+            return [(p + a, q + b, P + c, Q + e) for a, b, c, e in steps]
+
+        seeds = [(2, 2, 1, 1), (0, 0, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1)]
+        candidates = list(dict.fromkeys(
+            (min(p, max_p), min(q, max_q), min(P, max_seasonal_p), min(Q, max_seasonal_q)) for p, q, P, Q in seeds
+        ))
+
+        scores = {}
+        best = None
+        deadline = time.monotonic() + timeout
+        timed_out = False
+        while candidates:
+            futures = {
+                executor.submit(
+                    run_arima_candidate, values, (p, d, q), (P, seasonal_d, Q, m) if seasonal else (0, 0, 0, 0), deadline
+                ): (p, q, P, Q)
+                for p, q, P, Q in candidates
+            }
+            done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            for future in done:
+                try:
+                    scores[futures[future]] = future.result()
+                except Exception as e:
+                    logger.debug(f"ARIMA candidate {futures[future]} failed: {str(e)}")
+                    scores[futures[future]] = np.inf
+            for future in pending:
+                future.cancel()
+
+            if scores:
+                round_best = min(scores, key=scores.get)
+                if best is not None and scores[round_best] >= scores[best]:
+                    break
+                best = round_best
+
+            if pending or time.monotonic() >= deadline:
+                timed_out = True
+                break
+            candidates = [c for c in neighbours(best) if in_bounds(c) and c not in scores] if best is not None else []
+
+        if best is None or not np.isfinite(scores[best]):
+            raise ValueError("ARIMA order search could not fit any candidate model")
+
+        p, q, P, Q = best
+        logger.info(
+            f"Selected ARIMA order {(p, d, q)} seasonal {(P, seasonal_d, Q, m) if seasonal else None} "
+            f"(AIC {scores[best]:.2f}, {len(scores)} candidates{', timed out' if timed_out else ''})"
+        )
+        return {
+            'order': (p, d, q),
+            'seasonal_order': (P, seasonal_d, Q, m) if seasonal else (0, 0, 0, 0),
+            'aic': float(scores[best]),
+            'candidates_evaluated': len(scores),
+            'timed_out': timed_out
+        }
+
+    def fit_arima(self, df: pd.DataFrame, parameters: Dict[str, Any], forecast_period: int) -> Dict[str, Any]:
+        """Fit an ARIMA model on a prepared series"""
+        # At this point, df has standardized column names 'Date' and 'Value'
+        values = df['Value'].values
+
+        if parameters.get('auto_order'):
+            # Pick (p, d, q) and the seasonal order automatically by AIC
+            search = self.search_arima_order(values, parameters, self.series_freq(df))
+            order, seasonal_order = search['order'], search['seasonal_order']
+        else:
+            # Fit ARIMA model with parameters
+            p = parameters.get('p', 1)
+            d = parameters.get('d', 1)
+            q = parameters.get('q', 1)
+            order, seasonal_order = (p, d, q), (0, 0, 0, 0)
+
+        ARIMA = load_backend('statsmodels').ARIMA
+        model = ARIMA(values, order=order, seasonal_order=seasonal_order)
+        model_fit = model.fit()
+
+        # Calculate metrics
+        train_pred = model_fit.get_prediction(0)
+        y_pred = train_pred.predicted_mean
+        metrics = self.evaluate_model(values, y_pred)
+
+        return {
+            'method': 'arima',
+            'model': model_fit,
+            'order': list(order),
+            'seasonal_order': list(seasonal_order),
+            'metrics': metrics,
+            'last_date': df['Date'].iloc[-1],
+            'freq': self.series_freq(df)
+        }
+
+    def update_arima(self, fitted: Dict[str, Any], new_df: pd.DataFrame,
+                     parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply new observations to fitted ARIMA results.
+
+        The new points are run through the Kalman filter with the existing
+        parameters. Parameters are only re-estimated, warm-started from the
+        current ones, when the standardized one-step errors on the new points
+        show drift (RMS above drift_threshold, 2.0 by default).
+        """
+        results = fitted['model']
+        new_values = new_df['Value'].values
+
+        updated = results.append(new_values, refit=False)
+        errors = updated.filter_results.standardized_forecasts_error[0, -len(new_values):]
+        drift = float(np.sqrt(np.nanmean(errors ** 2)))
+        refit = drift > float(parameters.get('drift_threshold', 2.0))
+        if refit:
+            logger.info(f"ARIMA drift {drift:.2f} on {len(new_values)} new points, re-estimating parameters")
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                updated = results.append(new_values, refit=True)
+        else:
+            logger.info(f"Applied {len(new_values)} new points to ARIMA state (drift {drift:.2f})")
+
+        values = np.asarray(updated.model.endog).ravel()
+        metrics = self.evaluate_model(values, updated.get_prediction(0).predicted_mean)
+
+        return {
+            **fitted,
+            'model': updated,
+            'metrics': metrics,
+            'last_date': new_df['Date'].iloc[-1],
+            'refit': refit
+        }
+
+    def predict_arima(self, fitted: Dict[str, Any], forecast_period: int) -> Dict[str, Any]:
+        """Forecast forecast_period steps from fitted ARIMA results"""
+        # Generate forecast and confidence intervals in one pass
+        prediction = fitted['model'].get_forecast(steps=forecast_period)
+        forecast = np.asarray(prediction.predicted_mean)
+        conf_int = np.asarray(prediction.conf_int())
+        lower = conf_int[:, 0]
+        upper = conf_int[:, 1]
+
+        # Generate future dates
+        future_dates = self.future_dates(fitted['last_date'], forecast_period, fitted['freq'])
+
+        return {
+            'forecast': [float(value) for value in forecast],  # Simple list of numbers
+            'dates': [d.strftime('%Y-%m-%d') for d in future_dates],
+            'metrics': dict(fitted['metrics']),
+            'confidence_intervals': {
+                'lower': lower.tolist(),
+                'upper': upper.tolist()
+            },
+            'model_params': {
+                'order': fitted['order'],
+                'seasonal_order': fitted['seasonal_order']
+            }
+        }
 
     def arima_forecast(self, data: List[Dict], date_column: str, target_column: str, 
                       forecast_period: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Generate forecast using ARIMA"""
+        return self.forecast('arima', data, date_column, target_column, forecast_period, parameters)
+
+    def build_prophet_model(self, parameters: Dict[str, Any], freq: str = 'D') -> 'Prophet':
+        """Create an unfitted Prophet model from the request parameters"""
+        Prophet = load_backend('prophet').Prophet
+        model = Prophet(
+            growth=parameters.get('growth', 'linear'),
+            seasonality_mode=parameters.get('seasonality_mode', 'additive'),
+            yearly_seasonality=True,
+            # Weekly seasonality cannot be estimated from weekly or coarser data
+            weekly_seasonality=to_offset(freq).name.split('-')[0] in ('D', 'B', 'h'),
+            daily_seasonality=False,
+            changepoint_prior_scale=parameters.get('changepoint_prior_scale', 0.05),
+            seasonality_prior_scale=parameters.get('seasonality_prior_scale', 10.0)
+        )
+
+        # Add country holidays if specified
+        if parameters.get('add_holidays'):
+            model.add_country_holidays(country='US')  # Adjust country as needed
+
+        return model
+
+    def prophet_warm_start_params(self, model: 'Prophet') -> Dict[str, Any]:
+        """Extract fitted Stan parameters to initialise another fit of the same model"""
+        params = {}
+        for name in ['k', 'm', 'sigma_obs']:
+            if model.mcmc_samples == 0:
+                params[name] = model.params[name][0][0]
+            else:
+                params[name] = np.mean(model.params[name])
+        for name in ['delta', 'beta']:
+            if model.mcmc_samples == 0:
+                params[name] = model.params[name][0]
+            else:
+                params[name] = np.mean(model.params[name], axis=0)
+        return params
+
+    def prophet_metrics(self, model: 'Prophet', prophet_df: pd.DataFrame, forecast: pd.DataFrame,
+                        parameters: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Evaluate a fitted Prophet model on the last 20% of the history.
+
+        'holdout' (default) refits on the first 80%, warm-started from the full
+        fit so the Stan optimiser starts next to its optimum. 'in_sample'
+        reuses the fitted values already present in the forecast frame and
+        needs no second fit at all.
+        """
+        train_size = int(len(prophet_df) * 0.8)
+        freq = prophet_df.attrs.get('freq') or self.infer_frequency(pd.DatetimeIndex(prophet_df['ds']))
+        train = prophet_df.iloc[:train_size]
+        test = prophet_df.iloc[train_size:]
+
+        metrics_mode = parameters.get('metrics_mode', 'holdout')
+        if metrics_mode == 'in_sample':
+            predictions = forecast['yhat'].iloc[train_size:len(prophet_df)].values
+            return self.evaluate_model(test['y'].values, predictions)
+        if metrics_mode != 'holdout':
+            raise ValueError(f"Unsupported Prophet metrics mode: {metrics_mode}")
+
+        model_train = self.build_prophet_model(parameters, freq)
         try:
-            # Validate data
-            is_valid, message = self.validate_data(data, date_column, target_column)
-            if not is_valid:
-                raise ValueError(message)
+            model_train.fit(train, init=self.prophet_warm_start_params(model))
+        except Exception as e:
+            # Parameter shapes differ when the split has fewer changepoints or holidays
+            logger.warning(f"Warm-started Prophet holdout fit failed, refitting from scratch: {str(e)}")
+            model_train = self.build_prophet_model(parameters, freq)
+            model_train.fit(train)
 
-            # Prepare data
-            df = self.prepare_data(data, date_column, target_column)
-            
-            # At this point, df has standardized column names 'Date' and 'Value'
-            values = df['Value'].values
+        # Only the holdout dates need predicting
+        forecast_test = model_train.predict(test[['ds']])
+        predictions = forecast_test['yhat'].values
 
-            # Fit ARIMA model with parameters
-            p = parameters.get('p', 1)
-            d = parameters.get('d', 1) 
-            q = parameters.get('q', 1)
-            model = ARIMA(values, order=(p, d, q))
-            model_fit = model.fit()
+        return self.evaluate_model(test['y'].values, predictions)
+
+    def fit_prophet(self, df: pd.DataFrame, parameters: Dict[str, Any], forecast_period: int) -> Dict[str, Any]:
+        """Fit a Prophet model on a prepared series"""
+        # Note: prepare_data standardizes column names to 'Date' and 'Value'
+        prophet_df = df.rename(columns={'Date': 'ds', 'Value': 'y'})
 
-            # Generate forecast
-            forecast = model_fit.forecast(steps=forecast_period)
+        # Additional validation for Prophet - ensure y column is strictly numeric
+        if not pd.api.types.is_numeric_dtype(prophet_df['y']):
+            logger.error(f"Prophet target column 'y' is not numeric. Dtype: {prophet_df['y'].dtype}")
+            raise ValueError(f"Prophet requires numeric target values, but got {prophet_df['y'].dtype}")
+        
+        # Check for any remaining non-finite values
+        if prophet_df['y'].isna().any() or np.isinf(prophet_df['y']).any():
+            logger.warning("Found NaN or infinite values in Prophet target column, cleaning...")
+            prophet_df = prophet_df.dropna(subset=['y'])
+            prophet_df = prophet_df[np.isfinite(prophet_df['y'])]
             
-            # Calculate confidence intervals
-            conf_int = model_fit.get_forecast(steps=forecast_period).conf_int()
-            lower = conf_int[:, 0]
-            upper = conf_int[:, 1]
-
-            # Generate future dates
-            last_date = pd.to_datetime(df['Date'].iloc[-1])
-            future_dates = pd.date_range(
-                start=last_date + pd.Timedelta(days=1),
-                periods=forecast_period,
-                freq='D'
+        if len(prophet_df) == 0:
+            raise ValueError("No valid numeric data remaining for Prophet forecasting")
+        
+        logger.info(f"Prophet data prepared successfully. Shape: {prophet_df.shape}, y column dtype: {prophet_df['y'].dtype}")
+
+        # Initialize Prophet model (without additional regressors for now to avoid issues)
+        freq = self.series_freq(df)
+        model = self.build_prophet_model(parameters, freq)
+
+        # Note: Skipping additional regressors for now to avoid data type issues
+        # Future enhancement: Add proper validation for numeric regressors
+
+        model.fit(prophet_df)
+
+        fitted = {
+            'method': 'prophet',
+            'model': model,
+            'metrics': None,
+            'metrics_mode': parameters.get('metrics_mode', 'holdout'),
+            'last_date': prophet_df['ds'].iloc[-1],
+            'freq': freq
+        }
+
+        # Holdout metrics only need the fitted model; in-sample metrics are
+        # read from the first forecast frame in predict_prophet
+        if fitted['metrics_mode'] != 'in_sample':
+            fitted['metrics'] = self.prophet_metrics(model, prophet_df, None, parameters)
+
+        return fitted
+
+    def predict_prophet(self, fitted: Dict[str, Any], forecast_period: int) -> Dict[str, Any]:
+        """Forecast forecast_period steps from a fitted Prophet model"""
+        model = fitted['model']
+
+        # Create future dataframe
+        future = model.make_future_dataframe(periods=forecast_period, freq=fitted['freq'])
+        
+        # Note: No additional regressors to add for now
+
+        # Generate forecast; the same frame supplies the components below
+        forecast = model.predict(future)
+        forecast_tail = forecast.tail(forecast_period)
+
+        # Extract forecast values
+        forecast_values = forecast_tail['yhat'].values
+
+        # Calculate metrics
+        if fitted['metrics'] is None:
+            fitted['metrics'] = self.prophet_metrics(
+                model, model.history[['ds', 'y']], forecast, {'metrics_mode': fitted['metrics_mode']}
             )
 
-            # Calculate metrics
-            train_pred = model_fit.get_prediction(0)
-            y_pred = train_pred.predicted_mean
-            metrics = self.evaluate_model(values, y_pred)
-
-            # Convert forecast to simple list of floats (like Prophet)
-            forecast_list = [float(forecast[i]) for i in range(len(forecast))]
-
-            return {
-                'forecast': forecast_list,  # Simple list of numbers
-                'dates': [d.strftime('%Y-%m-%d') for d in future_dates],
-                'metrics': metrics,
-                'confidence_intervals': {
-                    'lower': lower.tolist(),
-                    'upper': upper.tolist()
-                }
-            }
+        # Generate component plots data
+        components_data = {
+            'trend': forecast_tail['trend'].tolist(),
+            'yearly': forecast_tail['yearly'].tolist() if 'yearly' in forecast_tail else None,
+            'weekly': forecast_tail['weekly'].tolist() if 'weekly' in forecast_tail else None
+        }
 
-        except Exception as e:
-            logger.error(f"Error in ARIMA forecast: {str(e)}")
-            raise ValueError(f"Error in ARIMA forecast: {str(e)}")
+        return {
+            'forecast': forecast_values.tolist(),
+            'dates': forecast_tail['ds'].dt.strftime('%Y-%m-%d').tolist(),
+            'metrics': dict(fitted['metrics']),
+            'confidence_intervals': {
+                'lower': forecast_tail['yhat_lower'].tolist(),
+                'upper': forecast_tail['yhat_upper'].tolist()
+            },
+            'components': components_data
+        }
 
     def prophet_forecast(self, data: List[Dict], date_column: str, target_column: str, 
                         forecast_period: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Generate forecast using Prophet with enhanced features"""
-        try:
-            # Validate data
-            is_valid, message = self.validate_data(data, date_column, target_column)
-            if not is_valid:
-                raise ValueError(message)
-
-            # Prepare data
-            df = self.prepare_data(data, date_column, target_column)
-            # Note: prepare_data standardizes column names to 'Date' and 'Value'
-            prophet_df = df.rename(columns={'Date': 'ds', 'Value': 'y'})
-
-            # Additional validation for Prophet - ensure y column is strictly numeric
-            if not pd.api.types.is_numeric_dtype(prophet_df['y']):
-                logger.error(f"Prophet target column 'y' is not numeric. Dtype: {prophet_df['y'].dtype}")
-                raise ValueError(f"Prophet requires numeric target values, but got {prophet_df['y'].dtype}")
-            
-            # Check for any remaining non-finite values
-            if prophet_df['y'].isna().any() or np.isinf(prophet_df['y']).any():
-                logger.warning("Found NaN or infinite values in Prophet target column, cleaning...")
-                prophet_df = prophet_df.dropna(subset=['y'])
-                prophet_df = prophet_df[np.isfinite(prophet_df['y'])]
-                
-            if len(prophet_df) == 0:
-                raise ValueError("No valid numeric data remaining for Prophet forecasting")
-            
-            logger.info(f"Prophet data prepared successfully. Shape: {prophet_df.shape}, y column dtype: {prophet_df['y'].dtype}")
-
-            # Initialize Prophet model (without additional regressors for now to avoid issues)
-            model = Prophet(
-                growth=parameters.get('growth', 'linear'),
-                seasonality_mode=parameters.get('seasonality_mode', 'additive'),
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=False,
-                changepoint_prior_scale=parameters.get('changepoint_prior_scale', 0.05),
-                seasonality_prior_scale=parameters.get('seasonality_prior_scale', 10.0)
-            )
+        return self.forecast('prophet', data, date_column, target_column, forecast_period, parameters)
 
-            # Add country holidays if specified
-            if parameters.get('add_holidays'):
-                model.add_country_holidays(country='US')  # Adjust country as needed
+    def fit_baseline(self, df: pd.DataFrame, parameters: Dict[str, Any], forecast_period: int,
+                     baseline: str) -> Dict[str, Any]:
+        """Baselines have no training step; keep the series for predict_baseline"""
+        freq = self.series_freq(df)
+        return {
+            'method': baseline,
+            'values': df['Value'].values.astype(float),
+            'parameters': {'season_length': self.season_length(freq), **parameters},
+            'last_date': df['Date'].iloc[-1],
+            'freq': freq
+        }
 
-            # Note: Skipping additional regressors for now to avoid data type issues
-            # Future enhancement: Add proper validation for numeric regressors
+    def predict_baseline(self, fitted: Dict[str, Any], forecast_period: int) -> Dict[str, Any]:
+        """Forecast a single series with a vectorised baseline"""
+        output = baseline_forecast(fitted['method'], fitted['values'], forecast_period, fitted['parameters'])
+        return self.baseline_result(output, 0, fitted['last_date'], forecast_period, fitted['freq'])
 
-            model.fit(prophet_df)
+    def forecast_baseline_batch(self, series: Dict[str, pd.DataFrame], forecast_period: int,
+                                parameters: Dict[str, Any], baseline: str) -> Dict[str, Any]:
+        """
+        Forecast many prepared series with one baseline call per distinct
+        series length. Returns a result dict, or the raised exception, per series id.
+        """
+        # Series sharing a length and frequency are forecast as one 2D array
+        groups = {}
+        for series_id, df in series.items():
+            groups.setdefault((len(df), self.series_freq(df)), []).append(series_id)
 
-            # Create future dataframe
-            future = model.make_future_dataframe(periods=forecast_period)
-            
-            # Note: No additional regressors to add for now
-
-            # Generate forecast
-            forecast = model.predict(future)
+        results = {}
+        for (_, freq), series_ids in groups.items():
+            try:
+                values = np.vstack([series[series_id]['Value'].values for series_id in series_ids])
+                group_parameters = {'season_length': self.season_length(freq), **parameters}
+                output = baseline_forecast(baseline, values, forecast_period, group_parameters)
+            except Exception as e:
+                for series_id in series_ids:
+                    results[series_id] = ValueError(f"Error in {get_method(baseline).title} forecast: {str(e)}")
+                continue
 
-            # Extract forecast values
-            forecast_values = forecast.tail(forecast_period)['yhat'].values
+            for row, series_id in enumerate(series_ids):
+                results[series_id] = self.baseline_result(
+                    output, row, series[series_id]['Date'].iloc[-1], forecast_period, freq
+                )
+        return results
 
-            # Calculate metrics
-            train_size = int(len(prophet_df) * 0.8)
-            train = prophet_df.iloc[:train_size]
-            test = prophet_df.iloc[train_size:]
-            
-            model_train = Prophet(
-                growth=parameters.get('growth', 'linear'),
-                seasonality_mode=parameters.get('seasonality_mode', 'additive')
-            )
-            model_train.fit(train)
-            
-            future_test = model_train.make_future_dataframe(periods=len(test))
-            forecast_test = model_train.predict(future_test)
-            predictions = forecast_test.tail(len(test))['yhat'].values
-            
-            metrics = self.evaluate_model(test['y'].values, predictions)
-
-            # Generate component plots data
-            components = model.predict(future)
-            components_data = {
-                'trend': components['trend'].tail(forecast_period).tolist(),
-                'yearly': components['yearly'].tail(forecast_period).tolist() if 'yearly' in components else None,
-                'weekly': components['weekly'].tail(forecast_period).tolist() if 'weekly' in components else None
+    def baseline_result(self, output: Dict[str, Any], row: int, last_date, forecast_period: int,
+                        freq: str) -> Dict[str, Any]:
+        """Extract one series' forecast from a baseline_forecast output"""
+        future_dates = self.future_dates(last_date, forecast_period, freq)
+        return {
+            'forecast': output['forecast'][row].tolist(),
+            'dates': [d.strftime('%Y-%m-%d') for d in future_dates],
+            'metrics': {name: float(values[row]) for name, values in output['metrics'].items()},
+            'confidence_intervals': {
+                'lower': output['lower'][row].tolist(),
+                'upper': output['upper'][row].tolist()
             }
+        }
 
-            return {
-                'forecast': forecast_values.tolist(),
-                'dates': forecast.tail(forecast_period)['ds'].dt.strftime('%Y-%m-%d').tolist(),
-                'metrics': metrics,
-                'confidence_intervals': {
-                    'lower': forecast.tail(forecast_period)['yhat_lower'].tolist(),
-                    'upper': forecast.tail(forecast_period)['yhat_upper'].tolist()
-                },
-                'components': components_data
-            }
+    def submit_forecast(self, data: List[Dict], method: str, date_column: str,
+                        target_column: str, forecast_period: int,
+                        parameters: Optional[Dict[str, Any]] = None,
+                        executor: Optional[Executor] = None,
+                        model_id: Optional[str] = None) -> Future:
+        """Dispatch a forecast to the configured executor and return its future"""
+        get_method(method)
+        if parameters is None:
+            parameters = {}
 
-        except Exception as e:
-            logger.error(f"Error in Prophet forecast: {str(e)}")
-            raise ValueError(f"Error in Prophet forecast: {str(e)}")
+        executor = executor or get_executor()
+        return executor.submit(
+            run_forecast_task, method, data, date_column, target_column, forecast_period, parameters, model_id
+        )
 
     def generate_forecast(self, data: List[Dict], method: str, date_column: str, 
                         target_column: str, forecast_period: int, 
-                        parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Generate forecast using specified method"""
+                        parameters: Optional[Dict[str, Any]] = None,
+                        model_id: Optional[str] = None) -> Dict[str, Any]:
+        """Generate forecast using specified method, storing the fitted model under model_id if given"""
         try:
-            if parameters is None:
-                parameters = {}
-
-            if method == 'lstm':
-                return self.lstm_forecast(data, date_column, target_column, forecast_period, parameters)
-            elif method == 'arima':
-                return self.arima_forecast(data, date_column, target_column, forecast_period, parameters)
-            elif method == 'prophet':
-                return self.prophet_forecast(data, date_column, target_column, forecast_period, parameters)
-            else:
-                raise ValueError(f"Unsupported forecasting method: {method}")
+            future = self.submit_forecast(
+                data, method, date_column, target_column, forecast_period, parameters, model_id=model_id
+            )
+            return future.result()
 
         except Exception as e:
             logger.error(f"Error generating forecast: {str(e)}")
-            raise ValueError(f"Error generating forecast: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Error generating forecast: {str(e)}")
+
+
+def run_forecast_task(method: str, data: List[Dict], date_column: str, target_column: str,
+                      forecast_period: int, parameters: Dict[str, Any],
+                      model_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Executor entry point. Runs one model fit on a fresh service so that tasks
+    never share the fitted scaler, whichever executor they run on.
+    """
+    return ForecastingService().forecast(
+        method, data, date_column, target_column, forecast_period, parameters, model_id
+    )
+
+
+def run_prepared_forecast_task(method: str, df: pd.DataFrame, forecast_period: int,
+                               parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Executor entry point for forecasting an already prepared series"""
+    with StageTimer() as timer, timer.stage('total'):
+        result = ForecastingService().forecast_prepared(method, df, forecast_period, parameters)
+    result['timings'] = timer.as_dict()
+    return result
+
+
+def run_backtest_block(method: str, df: pd.DataFrame, block: List[Tuple[np.ndarray, np.ndarray]],
+                       parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Executor entry point for one refit block of a backtest"""
+    return ForecastingService().backtest_block(method, df, block, parameters)
+
+
+def compiled_rollout(model, seq_length: int):
+    """
+    The rollout tf.function of a fitted LSTM model, built once and cached on
+    the model. Its input_signature fixes the window shape and takes steps as
+    a tensor, so every forecast with a cached model reuses the same graph
+    whatever the horizon, instead of retracing per call.
+    """
+    rollout = getattr(model, '_forecast_rollout', None)
+    if rollout is not None:
+        return rollout
+
+    tf = load_backend('tensorflow')
+
+    @tf.function(input_signature=[
+        tf.TensorSpec(shape=(1, seq_length, 1), dtype=tf.float32),
+        tf.TensorSpec(shape=(), dtype=tf.int32),
+    ])
+    def rollout(window, steps):
+        outputs = tf.TensorArray(tf.float32, size=steps)
+        for i in tf.range(steps):
+            y_pred = model(window, training=False)
+            outputs = outputs.write(i, y_pred[0, 0])
+            window = tf.concat([window[:, 1:, :], tf.reshape(y_pred, (1, 1, 1))], axis=1)
+        return outputs.stack()
+
+    # Set past Keras attribute tracking so the function is not saved with the model
+    object.__setattr__(model, '_forecast_rollout', rollout)
+    return rollout
+
+
+class SearchDeadlineExceeded(Exception):
+    """Raised from an optimizer callback to abandon a candidate fit at the search deadline"""
+
+
+def run_arima_candidate(values: np.ndarray, order: Tuple[int, int, int],
+                        seasonal_order: Tuple[int, int, int, int], deadline: Optional[float] = None) -> float:
+    """
+    Executor entry point: fit one ARIMA candidate of an order search and return
+    its AIC. Once the search deadline (time.monotonic()) has passed, a candidate
+    gets an infinite AIC instead: it is skipped when picked up late, and a fit
+    still running is stopped at the optimizer's next iteration.
+    """
+    if deadline is not None and time.monotonic() >= deadline:
+        return float('inf')
+
+    def check_deadline(params):
+        if time.monotonic() >= deadline:
+            raise SearchDeadlineExceeded()
+
+    ARIMA = load_backend('statsmodels').ARIMA
+    method_kwargs = {'callback': check_deadline} if deadline is not None else {}
+    with warnings.catch_warnings():
+        # Convergence and non-invertibility warnings are expected for poor candidates
+        warnings.simplefilter('ignore')
+        try:
+            results = ARIMA(values, order=order, seasonal_order=seasonal_order).fit(method_kwargs=method_kwargs)
+        except SearchDeadlineExceeded:
+            return float('inf')
+    return float(results.aic)
+
+
+register_method(
+    'lstm', 'LSTM',
+    fit=ForecastingService.fit_lstm,
+    predict=ForecastingService.predict_lstm,
+    backends=['tensorflow'],
+    # Direct multi-horizon heads are trained for one specific horizon
+    horizon_dependent=lambda parameters: parameters.get('output_mode') == 'direct'
+)
+register_method(
+    'arima', 'ARIMA',
+    fit=ForecastingService.fit_arima,
+    predict=ForecastingService.predict_arima,
+    backends=['statsmodels', 'stattools'],
+    update=ForecastingService.update_arima
+)
+register_method(
+    'prophet', 'Prophet',
+    fit=ForecastingService.fit_prophet,
+    predict=ForecastingService.predict_prophet,
+    backends=['prophet']
+)
+for baseline_name, baseline_title in BASELINE_METHODS.items():
+    register_method(
+        baseline_name, baseline_title,
+        fit=partial(ForecastingService.fit_baseline, baseline=baseline_name),
+        predict=ForecastingService.predict_baseline,
+        # Recomputing a baseline is cheaper than hashing the series for the cache
+        cacheable=False,
+        batch=partial(ForecastingService.forecast_baseline_batch, baseline=baseline_name)
+    )
@@ -1,3 +1,976 @@
-from django.test import TestCase
+import importlib.util
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import mongoengine
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from . import jobs, model_cache, model_store, services, views
+from .baselines import baseline_forecast, evaluate_batch, moving_average, naive, seasonal_naive
+from .datasets import load_dataset, series_key, store_dataset
+from .executors import InlineExecutor, create_executor
+from .model_cache import ModelCache
+from .mongodb_models import DatasetDocument, ForecastDocument, ForecastMetrics
+from .packing import pack_array, pack_dates, unpack_array, unpack_dates
+from .profiling import StageTimer, stage, summarize_timings, timed
+from .registry import get_method, load_backend
+from .sanitise import sanitise_array, sanitise_result
+from .services import ForecastingService, compiled_rollout, run_arima_candidate
+
+MODEL_ID = '0f6b2a4e-5c1d-4d8e-9a37-2b1f0c9e7d11'
+
+TEST_USER = SimpleNamespace(id=7, username='analyst', is_authenticated=True)
+
+
+def daily_records(count, start='2024-01-01', value=float, **columns):
+    """count daily records whose target is value(position), plus constant extra columns"""
+    dates = pd.date_range(start, periods=count, freq='D').strftime('%Y-%m-%d')
+    return [{'date': date, 'sales': value(position), **columns} for position, date in enumerate(dates)]
+
+
+def api_request(data=None, **query):
+    """A request from TEST_USER: a POST of data as JSON, or a GET with query when data is None"""
+    factory = RequestFactory()
+    if data is None:
+        request = factory.get('/', query)
+    else:
+        request = factory.post('/', json.dumps(data), content_type='application/json')
+    request.user = TEST_USER
+    request.session = {}
+    return request
+
+
+def response_json(response):
+    return json.loads(response.content)
+
+
+def saved_forecast(created_at, **fields):
+    """Save a completed forecast of TEST_USER created at the given time"""
+    values = {
+        'user_id': TEST_USER.id, 'username': TEST_USER.username, 'name': 'Forecast', 'method': 'naive',
+        'date_column': 'date', 'target_column': 'sales', 'forecast_period': 3, 'created_at': created_at
+    }
+    values.update(fields)
+    document = ForecastDocument(**values)
+    document.save()
+    return document
+
+
+def save_model_in_worker(model_id):
+    """Runs in a pool child: store a fitted model through the shared model store"""
+    return model_store.get_model_store().save(model_id, {'method': 'naive', 'model': {'last': 42.0}})
+
+
+class ModelStoreTests(SimpleTestCase):
+    def setUp(self):
+        model_store._store = None
+        self.addCleanup(setattr, model_store, '_store', None)
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(FORECAST_MODEL_STORE_DIR=directory):
+            store = model_store.get_model_store()
+            store.save(MODEL_ID, {'method': 'naive', 'model': {'last': 1.5}})
+            self.assertEqual(store.load(MODEL_ID), {'method': 'naive', 'model': {'last': 1.5}})
+            store.delete(MODEL_ID)
+            self.assertIsNone(store.load(MODEL_ID))
+
+    def test_rejects_ids_outside_the_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                model_store.ModelStore(directory).relative_path('../../etc/passwd')
+
+    def test_model_saved_in_pool_worker_loads_in_parent(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(FORECAST_MODEL_STORE_DIR=directory):
+            executor = create_executor('process', max_workers=1)
+            try:
+                relative_path = executor.submit(save_model_in_worker, MODEL_ID).result(timeout=120)
+            finally:
+                executor.shutdown()
+
+            self.assertEqual(relative_path, model_store.ModelStore(directory).relative_path(MODEL_ID))
+            self.assertEqual(
+                model_store.get_model_store().load(MODEL_ID),
+                {'method': 'naive', 'model': {'last': 42.0}}
+            )
+
+
+class BaselineTests(SimpleTestCase):
+    def test_naive_repeats_last_value(self):
+        forecast, fitted, spread = naive(np.array([[1.0, 2.0, 3.0, 4.0]]), 3, {})
+        np.testing.assert_array_equal(forecast, [[4.0, 4.0, 4.0]])
+        np.testing.assert_array_equal(fitted, [[np.nan, 1.0, 2.0, 3.0]])
+        np.testing.assert_allclose(spread, np.sqrt([1.0, 2.0, 3.0]))
+
+    def test_seasonal_naive_repeats_last_season(self):
+        values = np.array([[1.0, 2.0, 3.0, 10.0, 20.0, 30.0]])
+        forecast, fitted, _ = seasonal_naive(values, 4, {'season_length': 3})
+        np.testing.assert_array_equal(forecast, [[10.0, 20.0, 30.0, 10.0]])
+        np.testing.assert_array_equal(fitted[0, 3:], [1.0, 2.0, 3.0])
+
+    def test_seasonal_naive_rejects_season_longer_than_series(self):
+        with self.assertRaises(ValueError):
+            seasonal_naive(np.ones((1, 5)), 2, {'season_length': 5})
+
+    def test_moving_average_uses_last_window(self):
+        forecast, fitted, _ = moving_average(np.array([[1.0, 2.0, 3.0, 4.0]]), 2, {'window': 2})
+        np.testing.assert_array_equal(forecast, [[3.5, 3.5]])
+        np.testing.assert_array_equal(fitted, [[np.nan, np.nan, 1.5, 2.5]])
+
+    def test_forecasts_every_row_at_once(self):
+        output = baseline_forecast('drift', [[0.0, 1.0, 2.0], [10.0, 8.0, 6.0]], 2, {})
+        np.testing.assert_allclose(output['forecast'], [[3.0, 4.0], [4.0, 2.0]])
+        self.assertTrue((output['lower'] <= output['forecast']).all())
+        self.assertTrue((output['upper'] >= output['forecast']).all())
+        self.assertEqual(output['metrics']['mae'].shape, (2,))
+
+    def test_needs_two_observations(self):
+        with self.assertRaises(ValueError):
+            baseline_forecast('naive', [[1.0]], 3, {})
+
+    def test_evaluate_batch_skips_undefined_predictions(self):
+        metrics = evaluate_batch(np.array([[1.0, 2.0, 3.0]]), np.array([[np.nan, 2.0, 5.0]]))
+        self.assertEqual(metrics['mae'][0], 1.0)
+        self.assertEqual(metrics['mse'][0], 2.0)
+
+
+class MongoTestCase(SimpleTestCase):
+    """
+    Runs against a throwaway database on the configured MongoDB server and is
+    skipped when none is reachable. Fitted models and cached forecasts go to a
+    temporary directory.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        mongoengine.disconnect(alias='default')
+        cls.addClassCleanup(cls.restore_connection)
+        connection = mongoengine.connect(
+            alias='default',
+            serverSelectionTimeoutMS=2000,
+            **dict(settings.MONGODB_SETTINGS, db=f"test_{settings.MONGODB_DB}")
+        )
+        try:
+            connection.admin.command('ping')
+        except Exception as e:
+            raise unittest.SkipTest(f"MongoDB is not reachable: {e}")
+
+    @classmethod
+    def restore_connection(cls):
+        mongoengine.disconnect(alias='default')
+        mongoengine.connect(alias='default', **settings.MONGODB_SETTINGS)
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        overrides = override_settings(
+            FORECAST_MODEL_STORE_DIR=os.path.join(directory, 'models'),
+            FORECAST_MODEL_CACHE_DIR=''
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for module, name in ((model_store, '_store'), (model_cache, '_cache')):
+            setattr(module, name, None)
+            self.addCleanup(setattr, module, name, None)
+        self.addCleanup(ForecastDocument.drop_collection)
+        self.addCleanup(DatasetDocument.drop_collection)
+
+
+class JobQueueTests(MongoTestCase):
+    def enqueue(self, **overrides):
+        job = dict(
+            user=TEST_USER, name='Sales', method='naive', date_column='date', target_column='sales',
+            forecast_period=5, parameters={}, historical_data=daily_records(30)
+        )
+        job.update(overrides)
+        return jobs.enqueue_forecast(**job)
+
+    def test_enqueue_stores_a_pending_job(self):
+        job = self.enqueue()
+        stored = ForecastDocument.objects.get(forecast_id=job.forecast_id)
+        self.assertEqual(stored.status, 'pending')
+        self.assertEqual(stored.get_historical_data(), daily_records(30))
+
+    def test_claims_the_oldest_pending_job_once(self):
+        first = self.enqueue()
+        second = self.enqueue()
+        ForecastDocument.objects(forecast_id=second.forecast_id).update_one(
+            set__created_at=first.created_at + timedelta(seconds=1)
+        )
+
+        claimed = jobs.claim_next_job()
+        self.assertEqual(claimed.forecast_id, first.forecast_id)
+        self.assertEqual(claimed.status, 'running')
+        self.assertIsNotNone(claimed.started_at)
+        self.assertEqual(jobs.claim_next_job().forecast_id, second.forecast_id)
+        self.assertIsNone(jobs.claim_next_job())
+
+    def test_stale_running_jobs_are_reclaimed(self):
+        job = self.enqueue()
+        jobs.claim_next_job()
+        self.assertIsNone(jobs.claim_next_job(stale_after=60))
+
+        ForecastDocument.objects(forecast_id=job.forecast_id).update_one(
+            set__started_at=datetime.utcnow() - timedelta(minutes=5)
+        )
+        self.assertEqual(jobs.claim_next_job(stale_after=60).forecast_id, job.forecast_id)
+
+    def test_run_completes_the_job(self):
+        job = self.enqueue()
+        jobs.run_forecast_job(jobs.claim_next_job())
+
+        stored = ForecastDocument.objects.get(forecast_id=job.forecast_id)
+        self.assertEqual(stored.status, 'completed')
+        self.assertIsNotNone(stored.completed_at)
+        np.testing.assert_array_equal(stored.get_forecast_array(), np.full(5, 29.0))
+        self.assertTrue({'queue_wait', 'total', 'save'} <= set(stored.timings))
+
+    def test_run_records_failures(self):
+        job = self.enqueue(target_column='missing')
+        jobs.run_forecast_job(jobs.claim_next_job())
+
+        stored = ForecastDocument.objects.get(forecast_id=job.forecast_id)
+        self.assertEqual(stored.status, 'failed')
+        self.assertTrue(stored.error_message)
+
+    def test_async_forecast_is_queued_and_polled(self):
+        response = views.generate_forecast(api_request({
+            'date_column': 'date', 'target_column': 'sales', 'method': 'naive', 'period': 5,
+            'historical_data': daily_records(30), 'async': True
+        }))
+        self.assertEqual(response.status_code, 202)
+        forecast_id = response_json(response)['data']['forecast_id']
+
+        status = response_json(views.get_forecast_status(api_request(), forecast_id))
+        self.assertEqual(status['data']['forecast_status'], 'pending')
+
+        jobs.run_forecast_job(jobs.claim_next_job())
+        status = response_json(views.get_forecast_status(api_request(), forecast_id))
+        self.assertEqual(status['data']['forecast_status'], 'completed')
+        self.assertEqual(len(status['data']['forecast']['forecast_data']), 5)
+
+    def test_async_forecast_is_validated_before_queueing(self):
+        request_data = {
+            'date_column': 'date', 'target_column': 'sales', 'method': 'naive', 'period': 5,
+            'historical_data': daily_records(30), 'async': True
+        }
+        for overrides in ({'method': 'unknown'}, {'period': 0}, {'period': 366}):
+            response = views.generate_forecast(api_request({**request_data, **overrides}))
+            self.assertEqual(response.status_code, 400, overrides)
+        self.assertEqual(ForecastDocument.objects.count(), 0)
+
+
+class WorkerLoopTests(SimpleTestCase):
+    def test_keeps_polling_after_errors(self):
+        job = SimpleNamespace(forecast_id='job-1')
+        with mock.patch.object(jobs, 'claim_next_job', side_effect=[RuntimeError('connection lost'), job, job]), \
+                mock.patch.object(jobs, 'run_forecast_job', side_effect=[RuntimeError('save failed'), job]) as run, \
+                mock.patch.object(jobs.time, 'sleep'), \
+                self.assertLogs('forecasting.jobs', 'ERROR') as logs:
+            self.assertEqual(jobs.work(max_jobs=1), 1)
+
+        self.assertEqual(run.call_count, 2)
+        self.assertEqual(len(logs.records), 2)
+
+
+@unittest.skipUnless(importlib.util.find_spec('tensorflow'), 'TensorFlow is not installed')
+class LstmRolloutTests(SimpleTestCase):
+    def test_rollout_matches_step_by_step_predict(self):
+        tf = load_backend('tensorflow')
+        tf.keras.utils.set_random_seed(0)
+        model = tf.keras.Sequential([
+            tf.keras.layers.Input(shape=(4, 1)),
+            tf.keras.layers.LSTM(8),
+            tf.keras.layers.Dense(1)
+        ])
+        sequence = np.linspace(0.1, 0.9, 4).reshape(-1, 1)
+
+        # The per-step predict loop the rollout replaced
+        expected = []
+        window = sequence.copy()
+        for _ in range(6):
+            prediction = model.predict(window.reshape(1, 4, 1), verbose=0)[0, 0]
+            expected.append(prediction)
+            window = np.vstack([window[1:], [[prediction]]])
+
+        np.testing.assert_allclose(ForecastingService().lstm_rollout(model, sequence, 6), expected, rtol=1e-5, atol=1e-6)
+        # One traced function per model, whatever the horizon
+        self.assertIs(compiled_rollout(model, 4), compiled_rollout(model, 4))
+        self.assertEqual(len(ForecastingService().lstm_rollout(model, sequence, 3)), 3)
+
+    def test_direct_model_only_predicts_its_horizon(self):
+        fitted = {'output_mode': 'direct', 'horizon': 5, 'model': None, 'scaler': None,
+                  'input_sequence': np.zeros((4, 1))}
+        with self.assertRaises(ValueError):
+            ForecastingService().predict_lstm(fitted, 7)
+
+
+@unittest.skipUnless(importlib.util.find_spec('prophet'), 'Prophet is not installed')
+class ProphetPipelineTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ForecastingService()
+        steps = np.arange(200)
+        values = 50 + 0.1 * steps + 5 * np.sin(2 * np.pi * steps / 7)
+        self.df = self.service.prepare_arrays(pd.date_range('2023-01-01', periods=200, freq='D').values, values, 'sales')
+
+    def spy(self, name):
+        """Record the calls of a Prophet method while still running it"""
+        Prophet = load_backend('prophet').Prophet
+        patcher = mock.patch.object(Prophet, name, autospec=True, side_effect=getattr(Prophet, name))
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_holdout_refit_is_warm_started_from_the_full_fit(self):
+        fit = self.spy('fit')
+        fitted = self.service.fit_prophet(self.df, {}, 14)
+
+        self.assertEqual(fit.call_count, 2)
+        (_, train), holdout_kwargs = fit.call_args_list[1]
+        self.assertEqual(len(train), 160)
+        init = holdout_kwargs['init']
+        self.assertEqual(set(init), {'k', 'm', 'sigma_obs', 'delta', 'beta'})
+        self.assertEqual(init['k'], fitted['model'].params['k'][0][0])
+        self.assertTrue({'rmse', 'mae', 'r2', 'mape', 'mse'} <= set(fitted['metrics']))
+
+    def test_in_sample_metrics_need_one_fit_and_one_predict(self):
+        fit = self.spy('fit')
+        predict = self.spy('predict')
+        fitted = self.service.fit_prophet(self.df, {'metrics_mode': 'in_sample'}, 14)
+        result = self.service.predict_prophet(fitted, 14)
+
+        self.assertEqual(fit.call_count, 1)
+        self.assertEqual(predict.call_count, 1)
+        self.assertEqual(len(result['forecast']), 14)
+        self.assertEqual(result['dates'][0], '2023-07-20')
+        self.assertEqual(len(result['components']['trend']), 14)
+        self.assertEqual(len(result['components']['weekly']), 14)
+        self.assertIsNotNone(fitted['metrics'])
+
+
+class ModelCacheTests(SimpleTestCase):
+    def series(self, values):
+        return pd.DataFrame({
+            'Date': pd.date_range('2024-01-01', periods=len(values), freq='D'),
+            'Value': np.asarray(values, dtype=float)
+        })
+
+    def test_model_key_depends_on_content(self):
+        cache = ModelCache()
+        key = cache.model_key(self.series([1, 2, 3]), 'arima', {'p': 1})
+        self.assertEqual(key, cache.model_key(self.series([1, 2, 3]), 'arima', {'p': 1}))
+        self.assertNotEqual(key, cache.model_key(self.series([1, 2, 4]), 'arima', {'p': 1}))
+        self.assertNotEqual(key, cache.model_key(self.series([1, 2, 3]), 'arima', {'p': 2}))
+        self.assertNotEqual(key, cache.model_key(self.series([1, 2, 3]), 'prophet', {'p': 1}))
+        self.assertNotEqual(key, cache.model_key(self.series([1, 2, 3]), 'arima', {'p': 1}, horizon=5))
+        self.assertNotEqual(cache.result_key(key, 5), cache.result_key(key, 6))
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = ModelCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_disk_tier_is_shared_between_caches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ModelCache(directory=directory).set('ab12', {'forecast': [1.0, 2.0]})
+            self.assertEqual(ModelCache(directory=directory).get('ab12'), {'forecast': [1.0, 2.0]})
+
+    def test_disk_tier_is_pruned_to_its_budget(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ModelCache(directory=directory, max_disk_bytes=0).set('ab12', {'forecast': [1.0]})
+            self.assertIsNone(ModelCache(directory=directory).get('ab12'))
+
+    def test_unreadable_disk_entry_is_discarded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ModelCache(directory=directory)
+            path = cache._path('ab12')
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'wb') as f:
+                f.write(b'not a pickle')
+            self.assertIsNone(cache.get('ab12'))
+            self.assertFalse(os.path.exists(path))
+
+
+class BacktestTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ForecastingService()
+
+    def test_cross_validate_builds_rolling_origin_folds(self):
+        data = daily_records(100)
+        result = self.service.cross_validate(
+            data, 'date', 'sales', 'naive', n_splits=4, test_size=5, refit_every=2, executor=InlineExecutor()
+        )
+
+        self.assertEqual(result['n_folds'], 4)
+        self.assertEqual([fold['fold'] for fold in result['folds']], [1, 2, 3, 4])
+        self.assertEqual([fold['train_size'] for fold in result['folds']], [80, 85, 90, 95])
+        self.assertEqual([fold['test_size'] for fold in result['folds']], [5, 5, 5, 5])
+        self.assertEqual([fold['refit'] for fold in result['folds']], [True, False, True, False])
+        # The second fold reuses the first fold's fit, forecasting 6-10 steps ahead
+        self.assertAlmostEqual(result['folds'][0]['metrics']['mae'], 3.0)
+        self.assertAlmostEqual(result['folds'][1]['metrics']['mae'], 8.0)
+
+    def test_cross_validate_sliding_window_keeps_recent_folds(self):
+        data = daily_records(100)
+        result = self.service.cross_validate(
+            data, 'date', 'sales', 'naive', n_splits=4, window='sliding', max_train_size=20,
+            test_size=5, max_folds=2, executor=InlineExecutor()
+        )
+
+        self.assertEqual(result['n_folds'], 2)
+        self.assertEqual([fold['train_size'] for fold in result['folds']], [20, 20])
+        self.assertEqual(result['folds'][0]['test_start'], data[90]['date'])
+        self.assertEqual(result['folds'][1]['test_end'], data[99]['date'])
+
+    def test_backtest_endpoint(self):
+        response = views.backtest_forecast(api_request({
+            'date_column': 'date', 'target_column': 'sales', 'method': 'naive',
+            'historical_data': daily_records(100), 'n_splits': 4, 'test_size': 5
+        }))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_json(response)['data']['n_folds'], 4)
+
+        response = views.backtest_forecast(api_request({'date_column': 'date', 'method': 'naive'}))
+        self.assertEqual(response.status_code, 400)
+
+
+class BatchForecastTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ForecastingService()
+
+    def test_prepare_batch_splits_and_validates_series(self):
+        data = (
+            daily_records(40, store='A')
+            + daily_records(40, value=lambda position: 2.0 * position, store=1.0)
+            + daily_records(10, store='C')
+        )
+        data[5]['sales'] = 'n/a'
+        series, errors = self.service.prepare_batch(data, 'date', 'sales', 'store')
+
+        # Ids match the stored dataset's normalised values: 1.0 is stored as 1
+        self.assertEqual(sorted(series), ['1', 'A'])
+        self.assertIn('C', errors)
+        for frame in series.values():
+            self.assertEqual(len(frame), 40)
+            self.assertEqual(frame.attrs['freq'], 'D')
+        # The dropped value is interpolated back from its neighbours
+        self.assertEqual(series['A']['Value'].iloc[5], 5.0)
+        np.testing.assert_allclose(series['1']['Value'], 2.0 * np.arange(40))
+
+    def test_submit_batch_forecasts_every_series(self):
+        series, _ = self.service.prepare_batch(
+            daily_records(40, store='A') + daily_records(40, value=lambda position: 2.0 * position, store='B'),
+            'date', 'sales', 'store'
+        )
+        futures = self.service.submit_batch(series, 'naive', 3, executor=InlineExecutor())
+        self.assertEqual(futures['A'].result()['forecast'], [39.0] * 3)
+        self.assertEqual(futures['B'].result()['forecast'], [78.0] * 3)
+        with self.assertRaises(ValueError):
+            self.service.submit_batch(series, 'unknown', 3)
+
+
+class BatchEndpointTests(MongoTestCase):
+    def request_data(self, **overrides):
+        data = {
+            'name': 'Stores', 'date_column': 'date', 'target_column': 'sales', 'series_column': 'store',
+            'method': 'naive', 'period': 3,
+            'historical_data': (
+                daily_records(30, store='A')
+                + daily_records(30, value=lambda position: 2.0 * position, store='B')
+                + daily_records(5, store='C')
+            )
+        }
+        data.update(overrides)
+        return data
+
+    def test_batch_is_saved_and_listed(self):
+        response = views.generate_batch_forecast(api_request(self.request_data()))
+        self.assertEqual(response.status_code, 200)
+        result = response_json(response)['data']
+        self.assertEqual((result['completed'], result['failed']), (2, 1))
+        self.assertEqual(result['series']['C']['status'], 'failed')
+
+        listed = response_json(views.get_batch_forecasts(api_request(), result['batch_id']))
+        self.assertEqual(listed['count'], 3)
+        self.assertEqual([forecast['series_id'] for forecast in listed['data']], ['A', 'B', 'C'])
+        self.assertEqual(listed['data'][1]['forecast_data'], [58.0] * 3)
+        self.assertEqual(listed['data'][1]['name'], 'Stores [B]')
+
+        # Each series reads only its own rows from the batch's shared dataset
+        document = ForecastDocument.objects.get(forecast_id=result['series']['B']['forecast_id'])
+        self.assertEqual(len(document.get_historical_data()), 30)
+
+    def test_unknown_batch(self):
+        self.assertEqual(views.get_batch_forecasts(api_request(), 'missing').status_code, 404)
+
+    def test_period_is_validated_before_fitting(self):
+        with mock.patch.object(views.forecasting_service, 'submit_batch') as submit:
+            response = views.generate_batch_forecast(api_request(self.request_data(period=400)))
+        self.assertEqual(response.status_code, 400)
+        submit.assert_not_called()
+
+
+class SeriesPreparationTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ForecastingService()
+
+    def test_extract_columns_reads_only_the_forecast_columns(self):
+        records = [
+            {'date': '2024-01-02', 'sales': '2.5', 'store': 'A'},
+            {'date': '2024-01-01', 'sales': 'n/a', 'store': 'A'},
+            {'date': '2024-01-03', 'store': 'A'}
+        ]
+        dates, values, raw_values = self.service.extract_columns(records, 'date', 'sales')
+        self.assertEqual(dates.dtype, np.dtype('datetime64[ns]'))
+        self.assertEqual(str(dates[0])[:10], '2024-01-02')
+        np.testing.assert_array_equal(values, [2.5, np.nan, np.nan])
+        self.assertEqual(list(raw_values), ['2.5', 'n/a', None])
+
+        with self.assertRaises(ValueError):
+            self.service.extract_columns(records, 'date', 'revenue')
+
+    def test_prepare_arrays_sorts_and_fills_gaps(self):
+        dates = pd.date_range('2024-01-01', periods=10, freq='D').delete(4)
+        values = np.arange(1.0, 11.0)[np.arange(10) != 4]
+        order = np.random.default_rng(0).permutation(len(dates))
+        df = self.service.prepare_arrays(dates.values[order], values[order], 'sales')
+
+        self.assertEqual(df.attrs['freq'], 'D')
+        self.assertEqual(len(df), 10)
+        self.assertTrue(df['Date'].is_monotonic_increasing)
+        np.testing.assert_allclose(df['Value'], np.arange(1.0, 11.0))
+
+    def test_prepare_arrays_rejects_all_invalid_values(self):
+        dates = pd.date_range('2024-01-01', periods=3, freq='D').values
+        with self.assertRaises(ValueError):
+            self.service.prepare_arrays(dates, np.full(3, np.nan), 'sales')
+
+    def test_infer_frequency(self):
+        self.assertEqual(self.service.infer_frequency(pd.date_range('2024-01-01', periods=10, freq='D')), 'D')
+        self.assertEqual(self.service.infer_frequency(pd.date_range('2024-01-01', periods=6, freq='MS')), 'MS')
+        # Irregular spacing falls back to the closest regular frequency
+        irregular = pd.DatetimeIndex(['2024-01-01', '2024-01-08', '2024-01-16', '2024-01-22'])
+        self.assertEqual(self.service.infer_frequency(irregular), 'W')
+        self.assertEqual(self.service.infer_frequency(pd.DatetimeIndex(['2024-01-01'])), 'D')
+
+    def test_season_length(self):
+        self.assertEqual(self.service.season_length('D'), 7)
+        self.assertEqual(self.service.season_length('MS'), 12)
+        self.assertEqual(self.service.season_length('YS'), 1)
+
+    def test_future_dates_follow_the_series_frequency(self):
+        dates = self.service.future_dates('2024-01-01', 3, 'MS')
+        self.assertEqual(list(dates.strftime('%Y-%m-%d')), ['2024-02-01', '2024-03-01', '2024-04-01'])
+
+    def test_prepare_arrays_aggregates_to_requested_frequency(self):
+        dates = pd.date_range('2024-01-01', '2024-02-29', freq='D').values
+        df = self.service.prepare_arrays(dates, np.ones(len(dates)), 'sales', aggregation_freq='M')
+        self.assertEqual(df.attrs['freq'], 'MS')
+        np.testing.assert_array_equal(df['Value'], [31.0, 29.0])
+
+
+@unittest.skipUnless(importlib.util.find_spec('statsmodels'), 'statsmodels is not installed')
+class ArimaOrderSearchTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ForecastingService()
+        # AR(1) with coefficient 0.6
+        noise = np.random.default_rng(0).normal(size=200)
+        self.values = np.zeros(200)
+        for position in range(1, 200):
+            self.values[position] = 0.6 * self.values[position - 1] + noise[position]
+
+    def test_search_selects_the_lowest_aic_order(self):
+        result = self.service.search_arima_order(
+            self.values, {'d': 0, 'max_p': 2, 'max_q': 2}, 'D', executor=InlineExecutor()
+        )
+        self.assertEqual(result['order'][1], 0)
+        self.assertLessEqual(result['order'][0], 2)
+        self.assertEqual(result['seasonal_order'], (0, 0, 0, 0))
+        self.assertGreaterEqual(result['candidates_evaluated'], 4)
+        self.assertFalse(result['timed_out'])
+        self.assertTrue(np.isfinite(result['aic']))
+
+    def test_search_without_budget_fits_nothing(self):
+        with self.assertRaises(ValueError):
+            self.service.search_arima_order(
+                self.values, {'d': 0, 'search_timeout': 0}, 'D', executor=InlineExecutor()
+            )
+
+    def test_running_fit_stops_at_the_deadline(self):
+        # The deadline has not passed when the candidate starts, but has by
+        # the optimizer's first iteration
+        clock = itertools.chain([0.0], itertools.repeat(100.0))
+        with mock.patch.object(services.time, 'monotonic', side_effect=lambda: next(clock)) as monotonic:
+            aic = run_arima_candidate(self.values, (2, 0, 2), (0, 0, 0, 0), deadline=50.0)
+        self.assertEqual(aic, float('inf'))
+        self.assertGreater(monotonic.call_count, 1)
+
+    def test_candidate_without_deadline_is_fitted(self):
+        self.assertTrue(np.isfinite(run_arima_candidate(self.values, (1, 0, 0), (0, 0, 0, 0))))
+
+
+class ForecastUpdateTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ForecastingService()
+        overrides = override_settings(FORECAST_MODEL_CACHE_DIR='')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        model_cache._cache = None
+        self.addCleanup(setattr, model_cache, '_cache', None)
+
+    def test_methods_without_updates_are_refitted(self):
+        result = self.service.update_forecast(
+            'naive', daily_records(40), 'date', 'sales', 3, {}, model_key=None
+        )
+        self.assertEqual(result['forecast'], [39.0] * 3)
+        self.assertIn('total', result['timings'])
+
+    @unittest.skipUnless(importlib.util.find_spec('statsmodels'), 'statsmodels is not installed')
+    def test_arima_update_applies_only_the_new_points(self):
+        noise = np.random.default_rng(0).normal(size=100)
+        records = daily_records(100, value=lambda position: 10.0 + noise[position])
+        parameters = {'p': 1, 'd': 0, 'q': 0}
+        first = self.service.forecast('arima', records[:90], 'date', 'sales', 5, parameters)
+
+        with mock.patch.object(get_method('arima'), 'fit') as fit_arima:
+            result = self.service.update_forecast(
+                'arima', records, 'date', 'sales', 5, parameters, model_key=first['model_key']
+            )
+        fit_arima.assert_not_called()
+        self.assertEqual(result['dates'][0], '2024-04-10')
+        self.assertNotEqual(result['model_key'], first['model_key'])
+        self.assertTrue({'total', 'update', 'predict'} <= set(result['timings']))
+
+    @unittest.skipUnless(importlib.util.find_spec('statsmodels'), 'statsmodels is not installed')
+    def test_arima_drift_re_estimates_parameters(self):
+        noise = np.random.default_rng(0).normal(size=100)
+        df = self.service.prepare_arrays(
+            pd.date_range('2024-01-01', periods=100, freq='D').values, 10.0 + noise, 'sales'
+        )
+        fitted = self.service.fit_arima(df.iloc[:90], {'p': 1, 'd': 0, 'q': 0}, 5)
+
+        steady = self.service.update_arima(fitted, df.iloc[90:], {})
+        self.assertFalse(steady['refit'])
+        self.assertEqual(steady['model'].nobs, 100)
+        self.assertEqual(steady['last_date'], df['Date'].iloc[-1])
+
+        shifted = df.iloc[90:].assign(Value=df['Value'].iloc[90:] + 50.0)
+        self.assertTrue(self.service.update_arima(fitted, shifted, {})['refit'])
+
+
+class ForecastUpdateEndpointTests(MongoTestCase):
+    def create_forecast(self):
+        response = views.generate_forecast(api_request({
+            'date_column': 'date', 'target_column': 'sales', 'method': 'naive', 'period': 3,
+            'historical_data': daily_records(30)
+        }))
+        return response_json(response)['data']['model_id']
+
+    def test_new_observations_are_appended(self):
+        forecast_id = self.create_forecast()
+        response = views.update_forecast(api_request({
+            'new_data': daily_records(5, start='2024-01-31', value=lambda position: 100.0)
+        }), forecast_id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_json(response)['data']['forecast'], [100.0] * 3)
+        document = ForecastDocument.objects.get(forecast_id=forecast_id)
+        self.assertEqual(len(document.get_historical_data()), 35)
+        self.assertTrue({'total', 'dataset', 'save'} <= set(document.timings))
+
+    def test_invalid_updates_are_rejected(self):
+        forecast_id = self.create_forecast()
+        new_data = daily_records(5, start='2024-01-31')
+        self.assertEqual(views.update_forecast(api_request({'new_data': []}), forecast_id).status_code, 400)
+        self.assertEqual(
+            views.update_forecast(api_request({'new_data': new_data, 'period': 400}), forecast_id).status_code, 400
+        )
+        self.assertEqual(views.update_forecast(api_request({'new_data': new_data}), 'missing').status_code, 404)
+
+
+class ReforecastEndpointTests(MongoTestCase):
+    def test_stored_model_forecasts_a_new_horizon(self):
+        response = views.generate_forecast(api_request({
+            'date_column': 'date', 'target_column': 'sales', 'method': 'naive', 'period': 3,
+            'historical_data': daily_records(30)
+        }))
+        forecast_id = response_json(response)['data']['model_id']
+
+        with mock.patch.object(get_method('naive'), 'fit') as fit:
+            response = views.reforecast(api_request({'period': 6}), forecast_id)
+        fit.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_json(response)['data']['forecast'], [29.0] * 6)
+        self.assertEqual(ForecastDocument.objects.get(forecast_id=forecast_id).forecast_period, 6)
+
+        self.assertEqual(views.reforecast(api_request({'period': 400}), forecast_id).status_code, 400)
+        self.assertEqual(views.reforecast(api_request({}), forecast_id).status_code, 400)
+        self.assertEqual(views.reforecast(api_request({'period': 6}), 'missing').status_code, 404)
+
+    def test_forecast_without_stored_model(self):
+        with self.assertRaises(ValueError):
+            ForecastingService().reforecast('naive', MODEL_ID, 3, {})
+
+
+class StageTimerTests(SimpleTestCase):
+    def test_repeated_stages_accumulate(self):
+        with StageTimer() as timer:
+            for _ in range(2):
+                with timer.stage('fit'):
+                    sum(range(10000))
+        entry = timer.as_dict()['fit']
+        self.assertEqual(set(entry), {'wall_ms', 'cpu_ms', 'peak_alloc_mb'})
+        self.assertGreater(entry['wall_ms'], 0)
+
+    def test_module_helpers_record_into_the_active_timer(self):
+        @timed('predict')
+        def predict():
+            with stage('inner'):
+                return 1
+
+        # Without an active timer nothing is recorded
+        self.assertEqual(predict(), 1)
+        with StageTimer() as timer:
+            predict()
+        self.assertEqual(set(timer.as_dict()), {'predict', 'inner'})
+        self.assertGreaterEqual(timer.stages['predict']['wall_ms'], timer.stages['inner']['wall_ms'])
+
+        other = StageTimer()
+        with other.stage('outside'):
+            predict()
+        self.assertEqual(set(other.as_dict()), {'outside'})
+
+    def test_peak_allocation_is_traced_on_request(self):
+        if not tracemalloc.is_tracing():
+            self.addCleanup(tracemalloc.stop)
+        with override_settings(FORECAST_PROFILE_MEMORY=True), StageTimer() as timer:
+            with timer.stage('outer'):
+                with timer.stage('allocate'):
+                    block = bytearray(8 * 1024 ** 2)
+                del block
+        self.assertGreaterEqual(timer.stages['allocate']['peak_alloc_mb'], 7.5)
+        # The enclosing stage keeps the peak reached by its nested stages
+        self.assertGreaterEqual(timer.stages['outer']['peak_alloc_mb'], 7.5)
+
+    def test_summarize_timings(self):
+        rows = [
+            {'method': 'arima', 'timings': {'fit': {'wall_ms': value, 'cpu_ms': value / 2, 'peak_alloc_mb': None}}}
+            for value in (10.0, 20.0, 30.0)
+        ] + [{'method': 'naive', 'timings': {}}]
+        summary = summarize_timings(rows)
+
+        self.assertEqual(set(summary), {'arima'})
+        self.assertEqual(summary['arima']['fit'], {
+            'count': 3, 'wall_ms_p50': 20.0, 'wall_ms_p95': 29.0, 'cpu_ms_p50': 10.0, 'cpu_ms_p95': 14.5
+        })
+
+
+class TimingStatisticsEndpointTests(MongoTestCase):
+    def test_stage_percentiles_per_method(self):
+        for _ in range(2):
+            views.generate_forecast(api_request({
+                'date_column': 'date', 'target_column': 'sales', 'method': 'naive', 'period': 3,
+                'historical_data': daily_records(30)
+            }))
+
+        response = response_json(views.get_timing_statistics(api_request(method='naive')))
+        self.assertEqual(set(response['data']), {'naive'})
+        self.assertEqual(response['data']['naive']['total']['count'], 2)
+        self.assertIn('wall_ms_p95', response['data']['naive']['save'])
+
+
+class UserStatisticsTests(MongoTestCase):
+    def test_statistics_of_completed_forecasts(self):
+        start = datetime(2024, 1, 1)
+        saved_forecast(start, name='Old', method='arima', forecast_period=10, metrics=ForecastMetrics(r2=0.6))
+        saved_forecast(start + timedelta(days=1), name='Best', method='naive', forecast_period=5,
+                       metrics=ForecastMetrics(r2=0.9))
+        saved_forecast(start + timedelta(days=2), name='Unfitted', method='naive', metrics=ForecastMetrics(r2=0.0))
+        latest = saved_forecast(start + timedelta(days=3), name='Latest', forecast_period=6,
+                                parameters={'window': 3}, forecast_data=[1.0, 2.0])
+        saved_forecast(start + timedelta(days=4), status='failed')
+        saved_forecast(start + timedelta(days=5), user_id=TEST_USER.id + 1)
+
+        stats = ForecastDocument.get_user_statistics(TEST_USER.id)
+
+        self.assertEqual(stats['total_forecasts'], 4)
+        self.assertEqual(stats['methods_used'], {'arima': 1, 'naive': 3})
+        self.assertEqual(stats['avg_forecast_period'], 6.0)
+        # The most recent forecast is returned in full, arrays and parameters included
+        self.assertEqual(stats['most_recent'], latest.to_dict())
+        self.assertEqual(stats['most_recent']['parameters'], {'window': 3})
+        self.assertEqual(stats['best_model'], {
+            'name': 'Best', 'method': 'naive', 'r2': 0.9, 'created_at': (start + timedelta(days=1)).isoformat()
+        })
+
+    def test_user_without_forecasts(self):
+        response = response_json(views.get_user_statistics(api_request()))
+        self.assertEqual(response['data'], {
+            'total_forecasts': 0, 'methods_used': {}, 'avg_forecast_period': 0,
+            'most_recent': None, 'best_model': None
+        })
+
+    def test_endpoint(self):
+        saved_forecast(datetime(2024, 1, 1), name='Only', metrics=ForecastMetrics(r2=0.5))
+        response = response_json(views.get_user_statistics(api_request()))
+        self.assertEqual(response['status'], 'success')
+        self.assertEqual(response['data']['most_recent']['name'], 'Only')
+        self.assertEqual(response['data']['best_model']['r2'], 0.5)
+
+
+class UserForecastListTests(MongoTestCase):
+    def setUp(self):
+        super().setUp()
+        # Two forecasts share a timestamp so that ties are broken by forecast_id
+        start = datetime(2024, 1, 1)
+        self.forecasts = [
+            saved_forecast(start + timedelta(days=min(position, 3)), name=f'Forecast {position}',
+                           forecast_data=[float(position)] * 3)
+            for position in range(5)
+        ]
+        self.expected_order = [
+            forecast.forecast_id
+            for forecast in sorted(self.forecasts, key=lambda f: (f.created_at, f.forecast_id), reverse=True)
+        ]
+
+    def list_forecasts(self, **query):
+        return response_json(views.get_user_forecasts(api_request(**query)))
+
+    def test_cursor_round_trip(self):
+        forecast = self.forecasts[0]
+        self.assertEqual(views.decode_cursor(views.encode_cursor(forecast)), (forecast.created_at, forecast.forecast_id))
+        with self.assertRaises(ValueError):
+            views.decode_cursor('not a cursor')
+
+    def test_keyset_pages_cover_every_forecast_once(self):
+        ids, cursor = [], ''
+        while cursor is not None:
+            page = self.list_forecasts(cursor=cursor, limit=2)
+            ids.extend(forecast['id'] for forecast in page['data'])
+            self.assertEqual(page['has_next'], page['next_cursor'] is not None)
+            cursor = page['next_cursor']
+        self.assertEqual(ids, self.expected_order)
+
+    def test_page_numbers(self):
+        page = self.list_forecasts(page=2, limit=2)
+        self.assertEqual([forecast['id'] for forecast in page['data']], self.expected_order[2:4])
+        self.assertEqual((page['total_count'], page['total_pages']), (5, 3))
+        self.assertTrue(page['has_next'] and page['has_previous'])
+        self.assertNotIn('next_cursor', page)
+
+    def test_summary_view_leaves_out_data_arrays(self):
+        forecast = self.list_forecasts(view='summary', limit=1)['data'][0]
+        self.assertNotIn('forecast_data', forecast)
+        self.assertEqual(forecast, ForecastDocument.objects.get(forecast_id=forecast['id']).to_summary_dict())
+
+    def test_invalid_parameters(self):
+        for query in ({'limit': 0}, {'limit': 101}, {'page': 0}, {'cursor': 'not a cursor'}):
+            with self.subTest(**query):
+                response = views.get_user_forecasts(api_request(**query))
+                self.assertEqual(response.status_code, 400)
+
+
+class DatasetStoreTests(MongoTestCase):
+    def test_identical_data_is_stored_once(self):
+        frame = pd.DataFrame({'date': ['2024-01-01', '2024-01-02'], 'sales': [1.0, np.nan], 'store': [3, 4]})
+        # The same rows after a browser JSON round trip: integral floats as ints, NaN as null
+        browser_records = [{'store': 3, 'sales': 1, 'date': '2024-01-01'}, {'date': '2024-01-02', 'sales': None, 'store': 4}]
+
+        dataset_id = store_dataset(frame.to_dict('records'))
+        self.assertEqual(store_dataset(iter(browser_records)), dataset_id)
+        self.assertEqual(DatasetDocument.objects.count(), 1)
+
+        dataset = DatasetDocument.objects.get(dataset_id=dataset_id)
+        self.assertEqual((dataset.row_count, dataset.columns), (2, ['date', 'sales', 'store']))
+        self.assertEqual(load_dataset(dataset_id), [
+            {'date': '2024-01-01', 'sales': 1, 'store': 3}, {'date': '2024-01-02', 'sales': None, 'store': 4}
+        ])
+
+    def test_series_key_matches_stored_values(self):
+        self.assertEqual(series_key(np.float64(1.0)), series_key(1))
+        self.assertEqual(series_key('north'), 'north')
+
+
+class PackingTests(SimpleTestCase):
+    def test_float64_round_trip_is_exact(self):
+        values = [0.1, -2.5, 1e300, 3.0]
+        unpacked = unpack_array(pack_array(values, 'float64'), 'float64')
+        np.testing.assert_array_equal(unpacked, values)
+        self.assertFalse(unpacked.flags.writeable)
+
+    def test_float32_round_trip(self):
+        unpacked = unpack_array(pack_array([0.1, 2.5], 'float32'), 'float32')
+        self.assertEqual(unpacked.dtype, np.dtype('<f4'))
+        np.testing.assert_allclose(unpacked, [0.1, 2.5], rtol=1e-6)
+
+    def test_unsupported_dtype(self):
+        with self.assertRaises(ValueError):
+            pack_array([1.0], 'float16')
+
+    def test_regular_dates_pack_to_start_and_freq(self):
+        for dates in (['2024-01-01', '2024-01-02', '2024-01-03'],
+                      ['2024-01-01', '2024-02-01', '2024-03-01', '2024-04-01']):
+            packed = pack_dates(dates)
+            self.assertIsNotNone(packed)
+            self.assertEqual(packed[0], dates[0])
+            self.assertEqual(unpack_dates(*packed, len(dates)), dates)
+
+    def test_irregular_dates_stay_unpacked(self):
+        self.assertIsNone(pack_dates(['2024-01-01', '2024-01-02', '2024-01-05']))
+        self.assertIsNone(pack_dates(['2024-01-01', '2024-01-02']))
+        self.assertIsNone(pack_dates([]))
+        self.assertEqual(pack_dates(['2024-01-01']), ('2024-01-01', 'D'))
+
+
+class SanitiseTests(SimpleTestCase):
+    def test_zero_policy_counts_replacements(self):
+        array, counts = sanitise_array([1.0, np.nan, np.inf, 3.0], 'zero')
+        np.testing.assert_array_equal(array, [1.0, 0.0, 0.0, 3.0])
+        self.assertEqual(counts, {'nan': 1, 'inf': 1, 'invalid': 0})
+
+    def test_ffill_policy(self):
+        array, _ = sanitise_array([np.nan, 1.0, np.nan, 3.0], 'ffill')
+        np.testing.assert_array_equal(array, [0.0, 1.0, 1.0, 3.0])
+
+    def test_interpolate_policy_holds_edges(self):
+        array, _ = sanitise_array([1.0, np.nan, 3.0, np.nan], 'interpolate')
+        np.testing.assert_array_equal(array, [1.0, 2.0, 3.0, 3.0])
+
+    def test_raise_policy(self):
+        with self.assertRaises(ValueError):
+            sanitise_array([1.0, np.nan], 'raise')
+        array, _ = sanitise_array([1.0, 2.0], 'raise')
+        np.testing.assert_array_equal(array, [1.0, 2.0])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            sanitise_array([1.0], 'drop')
+
+    def test_non_numeric_values_count_as_invalid(self):
+        array, counts = sanitise_array([1.0, 'abc', None], 'zero')
+        np.testing.assert_array_equal(array, [1.0, 0.0, 0.0])
+        self.assertEqual(counts, {'nan': 1, 'inf': 0, 'invalid': 1})
+
+    def test_metrics_are_zeroed_whatever_the_policy(self):
+        clean, counts = sanitise_result(
+            {'forecast': [1.0, 2.0], 'metrics': {'rmse': 1.0, 'mape': float('nan')}}, 'raise'
+        )
+        self.assertEqual(clean['metrics']['mape'], 0.0)
+        self.assertEqual(clean['metrics']['rmse'], 1.0)
+        self.assertIsNone(clean['lower'])
+        self.assertEqual(counts['forecast']['nan'], 0)
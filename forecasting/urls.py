@@ -6,12 +6,19 @@ app_name = 'forecasting'
 urlpatterns = [
     path('', views.index, name='index'),
     path('api/generate-forecast/', views.generate_forecast, name='generate_forecast'),
+    path('api/generate-batch-forecast/', views.generate_batch_forecast, name='generate_batch_forecast'),
+    path('api/backtest/', views.backtest_forecast, name='backtest_forecast'),
     path('api/forecast-history/<int:model_id>/', views.get_forecast_history, name='forecast_history'),
     path('api/delete-model/<int:model_id>/', views.delete_forecast_model, name='delete_model'),
     
     # New MongoDB-based endpoints
     path('api/user-forecasts/', views.get_user_forecasts, name='get_user_forecasts'),
     path('api/user-statistics/', views.get_user_statistics, name='get_user_statistics'),
+    path('api/timing-statistics/', views.get_timing_statistics, name='get_timing_statistics'),
     path('api/forecast-details/<str:forecast_id>/', views.get_forecast_details, name='get_forecast_details'),
     path('api/delete-forecast/<str:forecast_id>/', views.delete_forecast, name='delete_forecast'),
+    path('api/forecast-status/<str:forecast_id>/', views.get_forecast_status, name='get_forecast_status'),
+    path('api/update-forecast/<str:forecast_id>/', views.update_forecast, name='update_forecast'),
+    path('api/reforecast/<str:forecast_id>/', views.reforecast, name='reforecast'),
+    path('api/batch/<str:batch_id>/', views.get_batch_forecasts, name='get_batch_forecasts'),
 ] 
\ No newline at end of file
@@ -0,0 +1,115 @@
+import logging
+from typing import Dict, Any, List
+
+from .conf import get_setting
+from .mongodb_models import ForecastMetrics, ConfidenceInterval
+from .packing import pack_array, pack_dates
+from .sanitise import sanitise_result
+
+logger = logging.getLogger(__name__)
+
+# Document fields holding the forecast arrays, in plain or packed form
+FORECAST_ARRAY_FIELDS = [
+    'forecast_data', 'forecast_dates', 'confidence_intervals', 'packed_dtype',
+    'forecast_packed', 'lower_packed', 'upper_packed', 'dates_start', 'dates_freq'
+]
+
+
+def batch_document_name(name: str, series_id: str, max_length: int = 200) -> str:
+    """
+    Name of one series' forecast in a batch, '<name> [<series_id>]', shortened
+    to max_length (ForecastDocument.name) by truncating the batch name first,
+    then the series id, each marked with an ellipsis.
+    """
+    full = f'{name} [{series_id}]'
+    if len(full) <= max_length:
+        return full
+    suffix = f' [{series_id}]'
+    if len(suffix) > max_length // 2:
+        suffix = f' [{series_id[:max_length // 2 - 4]}…]'
+    if len(name) + len(suffix) <= max_length:
+        return name + suffix
+    return f'{name[:max_length - len(suffix) - 1]}…{suffix}'
+
+
+def record_stage_timings(forecast_doc, timer) -> None:
+    """
+    Add stages timed after a document was saved (e.g. the save itself) to its
+    stored timings with a single field-level update.
+    """
+    stages = timer.as_dict()
+    if not stages:
+        return
+    forecast_doc.timings.update(stages)
+    type(forecast_doc).objects(forecast_id=forecast_doc.forecast_id).update_one(
+        **{f"set__timings__{name}": entry for name, entry in stages.items()}
+    )
+
+
+def build_forecast_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a ForecastingService result into ForecastDocument field values.
+    The numeric outputs are sanitised as whole arrays (see
+    forecasting.sanitise) and handed to MongoDB as ready-made floats.
+    """
+    clean, counts = sanitise_result(result)
+    metrics_doc = ForecastMetrics(**clean['metrics'])
+
+    dates = result.get('dates')
+    if isinstance(dates, (list, tuple)):
+        forecast_dates = [date if isinstance(date, str) else str(date) for date in dates]
+    else:
+        forecast_dates = [str(dates)]
+
+    logger.debug(f"Sanitised {len(clean['forecast'])} forecast values and {len(forecast_dates)} dates, replaced: {counts}")
+
+    fields = {
+        'metrics': metrics_doc,
+        'model_key': result.get('model_key'),
+        'model_path': result.get('model_path'),
+        'timings': result.get('timings') or {}
+    }
+    if get_setting('FORECAST_PACKED_ARRAYS', False):
+        fields.update(pack_forecast_fields(clean, forecast_dates))
+    else:
+        has_intervals = clean['lower'] is not None
+        fields.update({
+            'forecast_data': clean['forecast'].tolist(),
+            'forecast_dates': forecast_dates,
+            'confidence_intervals': ConfidenceInterval(
+                lower=clean['lower'].tolist(),
+                upper=clean['upper'].tolist()
+            ) if has_intervals else None,
+            'packed_dtype': None,
+            'forecast_packed': None,
+            'lower_packed': None,
+            'upper_packed': None,
+            'dates_start': None,
+            'dates_freq': None
+        })
+    return fields
+
+
+def pack_forecast_fields(clean: Dict[str, Any], forecast_dates: List[str]) -> Dict[str, Any]:
+    """
+    Packed replacements for the forecast array fields: the values and the
+    confidence interval as binary arrays of FORECAST_PACKED_DTYPE, the dates as
+    start plus frequency when they are regular (otherwise they stay a list).
+    """
+    dtype = get_setting('FORECAST_PACKED_DTYPE', 'float64')
+    has_intervals = clean['lower'] is not None
+    packed_dates = pack_dates(forecast_dates)
+
+    packed = {
+        'packed_dtype': dtype,
+        'forecast_packed': pack_array(clean['forecast'], dtype),
+        'lower_packed': pack_array(clean['lower'], dtype) if has_intervals else None,
+        'upper_packed': pack_array(clean['upper'], dtype) if has_intervals else None,
+        'dates_start': packed_dates[0] if packed_dates else None,
+        'dates_freq': packed_dates[1] if packed_dates else None,
+        'forecast_data': [],
+        'forecast_dates': [] if packed_dates else forecast_dates,
+        'confidence_intervals': None
+    }
+    logger.debug(f"Packed {len(clean['forecast'])} forecast values as {dtype}, dates packed: {bool(packed_dates)}")
+    return packed
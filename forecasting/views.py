@@ -4,14 +4,24 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from .models import ForecastModel, ForecastResult
-from .mongodb_models import ForecastDocument, ForecastMetrics, ConfidenceInterval
+from BuisInt.views import get_data_service
+from .mongodb_models import ForecastDocument, MAX_FORECAST_PERIOD, MIN_FORECAST_PERIOD, SUMMARY_FIELDS
 from .services import ForecastingService
+from .datasets import store_dataset
+from .jobs import enqueue_forecast
+from .model_store import get_model_store
+from .profiling import StageTimer, summarize_timings
+from .registry import get_method
+from .utils import FORECAST_ARRAY_FIELDS, batch_document_name, build_forecast_fields, record_stage_timings
+import base64
 import json
+import uuid
 from datetime import datetime
 import pandas as pd
 import numpy as np
 import logging
 from mongoengine.errors import DoesNotExist, ValidationError
+from mongoengine.queryset.visitor import Q
 
 # Initialize forecasting service
 forecasting_service = ForecastingService()
@@ -19,6 +29,18 @@ forecasting_service = ForecastingService()
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+
+def invalid_period_response(period):
+    """400 response for a forecast period the documents would reject, or None when it is valid"""
+    if MIN_FORECAST_PERIOD <= period <= MAX_FORECAST_PERIOD:
+        return None
+    logger.warning(f"Invalid forecast period: {period}")
+    return JsonResponse({
+        'status': 'error',
+        'message': f'period must be between {MIN_FORECAST_PERIOD} and {MAX_FORECAST_PERIOD}'
+    }, status=400)
+
+
 @login_required
 def index(request):
     """Dashboard view for forecasting"""
@@ -73,8 +95,22 @@ def generate_forecast(request):
         parameters = data.get('parameters', {})
         name = data.get('name', f'{target_column} forecast')
         
-        # Get historical data from the request
+        # Get historical data from the request, or by reference from the session's dataset
         historical_data = data.get('historical_data', [])
+        # Records kept in the dataset store: the whole session dataset when it is
+        # referenced, so the forecast shares the dataset of a saved copy of the file
+        dataset_records = historical_data
+        if not historical_data and data.get('dataset_id'):
+            data_service = get_data_service(request)
+            if data_service.data is None or data_service.dataset_id != data['dataset_id']:
+                logger.warning(f"Dataset {data['dataset_id']} is not loaded in this session")
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'The dataset is no longer loaded; please load the file again'
+                }, status=400)
+            columns = [column for column in (date_column, target_column) if column in data_service.data.columns]
+            historical_data = data_service.get_rows(columns or None)
+            dataset_records = data_service.iter_records()
         if not historical_data:
             logger.warning("No historical data provided")
             return JsonResponse({
@@ -127,200 +163,68 @@ def generate_forecast(request):
                 'message': f"Target column '{target_column}' contains non-numeric values: {non_numeric_values[:3]}. Please select a numeric column for forecasting."
             }, status=400)
 
+        # Submit/poll mode: queue the job and let the forecast workers fit the model
+        if data.get('async', False):
+            # Checked here so a bad request fails now rather than in the worker
+            try:
+                get_method(method)
+            except ValueError as e:
+                logger.warning(str(e))
+                return JsonResponse({
+                    'status': 'error',
+                    'message': str(e)
+                }, status=400)
+            error_response = invalid_period_response(period)
+            if error_response:
+                return error_response
+
+            forecast_doc = enqueue_forecast(
+                user=request.user,
+                name=name,
+                method=method,
+                date_column=date_column,
+                target_column=target_column,
+                forecast_period=period,
+                parameters=parameters,
+                historical_data=dataset_records
+            )
+            return JsonResponse({
+                'status': 'pending',
+                'data': {
+                    'forecast_id': forecast_doc.forecast_id,
+                    'model_id': forecast_doc.forecast_id
+                }
+            }, status=202)
+
         logger.info(f"Generating {method} forecast for {target_column} with {len(historical_data)} data points")
 
         try:
-            # Generate forecast
+            # Generate forecast; the fitted model is stored under the new forecast's id
+            forecast_id = str(uuid.uuid4())
             result = forecasting_service.generate_forecast(
                 data=historical_data,
                 method=method,
                 date_column=date_column,
                 target_column=target_column,
                 forecast_period=period,
-                parameters=parameters
+                parameters=parameters,
+                model_id=forecast_id
             )
 
             logger.info("Forecast generated successfully")
 
             try:
-                # Create metrics embedded document with proper error handling
-                def safe_float_conversion(value, default=0.0):
-                    """Safely convert a value to float, handling various data types"""
-                    try:
-                        if value is None:
-                            logger.debug(f"Converting None value, using default: {default}")
-                            return default
-                        
-                        # Handle basic numeric types
-                        if isinstance(value, (int, float)):
-                            if np.isnan(value) or np.isinf(value):
-                                logger.warning(f"NaN or Inf value detected: {value}, using default: {default}")
-                                return default
-                            return float(value)
-                        
-                        # Handle string conversion
-                        if isinstance(value, str):
-                            try:
-                                result = float(value)
-                                if np.isnan(result) or np.isinf(result):
-                                    logger.warning(f"String converted to NaN/Inf: {value}, using default: {default}")
-                                    return default
-                                return result
-                            except (ValueError, TypeError):
-                                logger.warning(f"Cannot convert string to float: {value}, using default: {default}")
-                                return default
-                        
-                        # Handle numpy types
-                        if hasattr(value, 'item'):  # numpy scalar
-                            try:
-                                result = float(value.item())
-                                if np.isnan(result) or np.isinf(result):
-                                    logger.warning(f"Numpy value is NaN/Inf: {value}, using default: {default}")
-                                    return default
-                                return result
-                            except (ValueError, TypeError):
-                                logger.warning(f"Cannot convert numpy value: {value}, using default: {default}")
-                                return default
-                        
-                        # Handle dictionaries more thoroughly
-                        if isinstance(value, dict):
-                            logger.warning(f"Dict found in metrics: {value}")
-                            # Try common keys
-                            for key in ['value', 'mean', 'avg', 'result', 'score']:
-                                if key in value:
-                                    return safe_float_conversion(value[key], default)
-                            # If single key-value pair, use the value
-                            if len(value) == 1:
-                                single_value = list(value.values())[0]
-                                return safe_float_conversion(single_value, default)
-                            logger.warning(f"Complex dict in metrics: {value}, using default: {default}")
-                            return default
-                        
-                        # Handle arrays/lists
-                        if isinstance(value, (list, tuple, np.ndarray)):
-                            if len(value) == 0:
-                                logger.warning(f"Empty array in metrics, using default: {default}")
-                                return default
-                            if len(value) == 1:
-                                return safe_float_conversion(value[0], default)
-                            # For arrays with multiple values, use mean
-                            try:
-                                numeric_values = [safe_float_conversion(v, 0.0) for v in value]
-                                result = sum(numeric_values) / len(numeric_values)
-                                logger.warning(f"Array converted to mean: {value} -> {result}")
-                                return result
-                            except:
-                                logger.warning(f"Cannot process array: {value}, using default: {default}")
-                                return default
-                        
-                        # Handle pandas Series or other objects with numeric conversion
-                        if hasattr(value, '__float__'):
-                            try:
-                                result = float(value)
-                                if np.isnan(result) or np.isinf(result):
-                                    logger.warning(f"Object float conversion is NaN/Inf: {value}, using default: {default}")
-                                    return default
-                                return result
-                            except:
-                                pass
-                        
-                        logger.warning(f"Unexpected metric value type: {type(value)}, value: {value}, using default: {default}")
-                        return default
-                        
-                    except Exception as e:
-                        logger.error(f"Error converting metric value {value} (type: {type(value)}) to float: {e}")
-                        return default
-
-                logger.debug(f"Raw metrics from forecasting service: {result['metrics']}")
-                
-                # Log each metric individually for debugging
-                raw_metrics = result['metrics']
-                for metric_name, metric_value in raw_metrics.items():
-                    logger.debug(f"Raw metric {metric_name}: value={metric_value}, type={type(metric_value)}")
-                
-                # Convert metrics with detailed logging
-                converted_metrics = {}
-                converted_metrics['rmse'] = safe_float_conversion(raw_metrics.get('rmse'))
-                converted_metrics['mae'] = safe_float_conversion(raw_metrics.get('mae'))
-                converted_metrics['r2'] = safe_float_conversion(raw_metrics.get('r2'))
-                converted_metrics['mape'] = safe_float_conversion(raw_metrics.get('mape'))
-                converted_metrics['mse'] = safe_float_conversion(raw_metrics.get('mse'))
-                
-                logger.debug(f"Converted metrics: {converted_metrics}")
-                
-                # Double-check all values are actually floats before creating MongoDB document
-                final_metrics = {}
-                for key, value in converted_metrics.items():
-                    if isinstance(value, (int, float)) and not (np.isnan(value) or np.isinf(value)):
-                        final_metrics[key] = float(value)
-                    else:
-                        logger.warning(f"Final metric {key} is not a valid float: {value} (type: {type(value)}), using 0.0")
-                        final_metrics[key] = 0.0
-                
-                logger.debug(f"Final validated metrics: {final_metrics}")
-                
-                metrics_doc = ForecastMetrics(
-                    rmse=final_metrics['rmse'],
-                    mae=final_metrics['mae'],
-                    r2=final_metrics['r2'],
-                    mape=final_metrics['mape'],
-                    mse=final_metrics['mse']
-                )
-                
-                logger.debug(f"Processed metrics for MongoDB: rmse={metrics_doc.rmse}, mae={metrics_doc.mae}, r2={metrics_doc.r2}, mape={metrics_doc.mape}, mse={metrics_doc.mse}")
-                
-                # Create confidence intervals embedded document if available
-                confidence_doc = None
-                if result.get('confidence_intervals'):
-                    try:
-                        # Clean confidence interval data
-                        lower_clean = []
-                        upper_clean = []
-                        
-                        if 'lower' in result['confidence_intervals']:
-                            for val in result['confidence_intervals']['lower']:
-                                lower_clean.append(safe_float_conversion(val, 0.0))
-                        
-                        if 'upper' in result['confidence_intervals']:
-                            for val in result['confidence_intervals']['upper']:
-                                upper_clean.append(safe_float_conversion(val, 0.0))
-                        
-                        logger.debug(f"Cleaned confidence intervals: lower={len(lower_clean)}, upper={len(upper_clean)}")
-                        
-                        confidence_doc = ConfidenceInterval(
-                            lower=lower_clean,
-                            upper=upper_clean
-                        )
-                    except Exception as conf_e:
-                        logger.warning(f"Error creating confidence intervals: {conf_e}")
-                        confidence_doc = None
-                
-                # Ensure forecast_data is a list of floats
-                forecast_data_clean = []
-                if isinstance(result['forecast'], (list, tuple)):
-                    for item in result['forecast']:
-                        clean_value = safe_float_conversion(item, 0.0)
-                        forecast_data_clean.append(clean_value)
-                else:
-                    forecast_data_clean = [safe_float_conversion(result['forecast'], 0.0)]
-                
-                logger.debug(f"Cleaned forecast_data: {len(forecast_data_clean)} values, first few: {forecast_data_clean[:3]}")
-                
-                # Ensure forecast_dates is a list of strings
-                forecast_dates_clean = []
-                if isinstance(result['dates'], (list, tuple)):
-                    for date_item in result['dates']:
-                        if isinstance(date_item, str):
-                            forecast_dates_clean.append(date_item)
-                        else:
-                            forecast_dates_clean.append(str(date_item))
-                else:
-                    forecast_dates_clean = [str(result['dates'])]
-                
-                logger.debug(f"Cleaned forecast_dates: {len(forecast_dates_clean)} dates, first few: {forecast_dates_clean[:3]}")
-                
+                # Convert the service result into clean MongoDB field values
+                fields = build_forecast_fields(result)
+
+                # The forecast references the (deduplicated) dataset instead of embedding it
+                timer = StageTimer()
+                with timer.stage('dataset'):
+                    dataset_id = store_dataset(dataset_records)
+
                 # Save to MongoDB
                 forecast_doc = ForecastDocument(
+                    forecast_id=forecast_id,
                     user_id=request.user.id,
                     username=request.user.username,
                     name=name,
@@ -329,15 +233,14 @@ def generate_forecast(request):
                     target_column=target_column,
                     forecast_period=period,
                     parameters=parameters,
-                    historical_data=historical_data,
-                    forecast_data=forecast_data_clean,
-                    forecast_dates=forecast_dates_clean,
-                    metrics=metrics_doc,
-                    confidence_intervals=confidence_doc,
-                    status='completed'
+                    dataset_id=dataset_id,
+                    status='completed',
+                    **fields
                 )
 
-                forecast_doc.save()
+                with timer.stage('save'):
+                    forecast_doc.save()
+                record_stage_timings(forecast_doc, timer)
                 logger.info(f"Saved forecast to MongoDB with ID: {forecast_doc.forecast_id}")
 
                 return JsonResponse({
@@ -347,6 +250,7 @@ def generate_forecast(request):
                         'dates': result['dates'],
                         'metrics': result['metrics'],
                         'confidence_intervals': result.get('confidence_intervals'),
+                        'model_params': result.get('model_params'),
                         'model_id': forecast_doc.forecast_id
                     }
                 })
@@ -393,6 +297,219 @@ def generate_forecast(request):
             'message': f'An unexpected error occurred: {str(e)}'
         }, status=500)
 
+@csrf_exempt
+@require_http_methods(["POST"])
+@login_required
+def generate_batch_forecast(request):
+    """API endpoint to forecast every series of a long-format dataset in one request"""
+    try:
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in request body: {e}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Invalid JSON in request body: {str(e)}'
+            }, status=400)
+
+        # Validate required fields
+        required_fields = ['date_column', 'target_column', 'series_column', 'method', 'period']
+        missing_fields = [field for field in required_fields if field not in data]
+        if missing_fields:
+            logger.warning(f"Missing required fields: {missing_fields}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Missing required fields: {", ".join(missing_fields)}'
+            }, status=400)
+
+        # Extract parameters
+        date_column = data['date_column']
+        target_column = data['target_column']
+        series_column = data['series_column']
+        method = data['method']
+        period = int(data['period'])
+        parameters = data.get('parameters', {})
+        name = data.get('name', f'{target_column} forecast')
+
+        # Checked before any series is fitted, since the documents reject it on insert
+        error_response = invalid_period_response(period)
+        if error_response:
+            return error_response
+
+        historical_data = data.get('historical_data', [])
+        if not historical_data:
+            logger.warning("No historical data provided")
+            return JsonResponse({
+                'status': 'error',
+                'message': 'No historical data provided'
+            }, status=400)
+
+        if not all(isinstance(record, dict) for record in historical_data):
+            logger.error("Invalid data structure: historical_data must be a list of dictionaries")
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid data structure: historical_data must be a list of dictionaries'
+            }, status=400)
+
+        # Prepare every series in one pass and fan the fits out over the executor
+        series, errors = forecasting_service.prepare_batch(
+            historical_data, date_column, target_column, series_column,
+            aggregation_freq=parameters.get('aggregation_freq'),
+            aggregation=parameters.get('aggregation', 'sum')
+        )
+        logger.info(f"Generating {method} batch forecast for {len(series)} series ({len(errors)} rejected)")
+
+        # Names are fixed before fitting so an over-long one cannot fail the
+        # bulk insert after every series has been fitted
+        name_length = ForecastDocument._fields['name'].max_length
+        document_names = {
+            series_id: batch_document_name(name, series_id, name_length)
+            for series_id in list(series) + list(errors)
+        }
+
+        futures = forecasting_service.submit_batch(series, method, period, parameters)
+
+        # Every series document references the batch's single stored dataset
+        dataset_id = store_dataset(historical_data)
+
+        batch_id = str(uuid.uuid4())
+        documents = []
+        series_results = {}
+
+        def build_document(series_id, **fields):
+            return ForecastDocument(
+                user_id=request.user.id,
+                username=request.user.username,
+                name=document_names[series_id],
+                method=method,
+                date_column=date_column,
+                target_column=target_column,
+                forecast_period=period,
+                parameters=parameters,
+                dataset_id=dataset_id,
+                shared_dataset=True,
+                batch_id=batch_id,
+                series_column=series_column,
+                series_id=series_id,
+                **fields
+            )
+
+        for series_id, future in futures.items():
+            try:
+                result = future.result()
+                document = build_document(series_id, status='completed', **build_forecast_fields(result))
+            except Exception as e:
+                logger.error(f"Batch forecast failed for series {series_id}: {str(e)}")
+                errors[series_id] = str(e)
+                continue
+            documents.append(document)
+            series_results[series_id] = {
+                'status': 'completed',
+                'forecast_id': document.forecast_id
+            }
+
+        for series_id, message in errors.items():
+            document = build_document(series_id, status='failed', error_message=message)
+            documents.append(document)
+            series_results[series_id] = {
+                'status': 'failed',
+                'forecast_id': document.forecast_id,
+                'error_message': message
+            }
+
+        # One bulk insert for the whole batch
+        if documents:
+            for document in documents:
+                document.validate()
+            ForecastDocument.objects.insert(documents, load_bulk=False)
+        logger.info(f"Saved batch {batch_id} with {len(documents)} forecasts to MongoDB")
+
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'batch_id': batch_id,
+                'completed': sum(1 for item in series_results.values() if item['status'] == 'completed'),
+                'failed': len(errors),
+                'series': series_results
+            }
+        })
+
+    except ValueError as e:
+        logger.error(f"Value error in batch forecast generation: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        logger.error(f"Error in batch forecast generation: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error generating batch forecast: {str(e)}'
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@login_required
+def backtest_forecast(request):
+    """API endpoint to run a rolling-origin backtest of a forecasting method"""
+    try:
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in request body: {e}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Invalid JSON in request body: {str(e)}'
+            }, status=400)
+
+        # Validate required fields
+        required_fields = ['date_column', 'target_column', 'method', 'historical_data']
+        missing_fields = [field for field in required_fields if field not in data]
+        if missing_fields:
+            logger.warning(f"Missing required fields: {missing_fields}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Missing required fields: {", ".join(missing_fields)}'
+            }, status=400)
+
+        def optional_int(key):
+            value = data.get(key)
+            return int(value) if value not in (None, '') else None
+
+        logger.info(f"Running {data['method']} backtest for user: {request.user.username}")
+
+        result = forecasting_service.cross_validate(
+            data=data['historical_data'],
+            date_column=data['date_column'],
+            target_column=data['target_column'],
+            method=data['method'],
+            n_splits=int(data.get('n_splits', 5)),
+            parameters=data.get('parameters', {}),
+            window=data.get('window', 'expanding'),
+            max_train_size=optional_int('max_train_size'),
+            test_size=optional_int('test_size'),
+            max_folds=optional_int('max_folds'),
+            refit_every=int(data.get('refit_every', 1))
+        )
+
+        return JsonResponse({
+            'status': 'success',
+            'data': result
+        })
+
+    except ValueError as e:
+        logger.error(f"Value error in backtest: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        logger.error(f"Error in backtest: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error running backtest: {str(e)}'
+        }, status=500)
+
 @login_required
 def get_forecast_history(request, model_id):
     """Get historical forecasts for a specific model"""
@@ -456,36 +573,65 @@ def delete_forecast_model(request, model_id):
 @require_http_methods(["GET"])
 @login_required
 def get_user_forecasts(request):
-    """Get forecasts for the current user with pagination support"""
+    """
+    Get forecasts for the current user with pagination support.
+
+    ?view=summary returns only the list-view fields instead of the full
+    forecast arrays. Passing ?cursor= (empty for the first page) switches
+    from page numbers to keyset pagination on (created_at, forecast_id);
+    each response then carries the next_cursor to request.
+    """
     try:
         # Get pagination parameters
         page = int(request.GET.get('page', 1))
         limit = int(request.GET.get('limit', 5))
-        
-        # Calculate skip for pagination
-        skip = (page - 1) * limit
-        
+        if page < 1 or not 1 <= limit <= 100:
+            raise ValueError("page must be >= 1 and limit between 1 and 100")
+        summary = request.GET.get('view') == 'summary'
+        cursor = request.GET.get('cursor')
+
         # Get total count for pagination info
-        total_count = ForecastDocument.objects(user_id=request.user.id, status='completed').count()
-        
-        # Get paginated forecasts
+        total_count = ForecastDocument.count_user_forecasts(request.user.id)
+
         forecasts = ForecastDocument.objects(
             user_id=request.user.id, 
             status='completed'
-        ).order_by('-created_at').skip(skip).limit(limit)
-        
-        forecasts_data = [forecast.to_dict() for forecast in forecasts]
+        ).order_by('-created_at', '-forecast_id')
+        if summary:
+            forecasts = forecasts.only(*SUMMARY_FIELDS)
+
+        if cursor is not None:
+            if cursor:
+                created_at, forecast_id = decode_cursor(cursor)
+                forecasts = forecasts.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, forecast_id__lt=forecast_id)
+                )
+            # Fetch one extra row to know whether another page follows
+            rows = list(forecasts.limit(limit + 1))
+            has_next = len(rows) > limit
+            rows = rows[:limit]
+        else:
+            # Calculate skip for pagination
+            skip = (page - 1) * limit
+            rows = list(forecasts.skip(skip).limit(limit))
+            has_next = skip + limit < total_count
+
+        forecasts_data = [forecast.to_summary_dict() if summary else forecast.to_dict() for forecast in rows]
         
-        return JsonResponse({
+        response = {
             'status': 'success',
             'data': forecasts_data,
             'count': len(forecasts_data),
             'total_count': total_count,
-            'page': page,
             'total_pages': (total_count + limit - 1) // limit,  # Ceiling division
-            'has_next': skip + limit < total_count,
-            'has_previous': page > 1
-        })
+            'has_next': has_next
+        }
+        if cursor is not None:
+            response['next_cursor'] = encode_cursor(rows[-1]) if has_next else None
+        else:
+            response['page'] = page
+            response['has_previous'] = page > 1
+        return JsonResponse(response)
     
     except ValueError as e:
         logger.error(f"Invalid pagination parameters: {str(e)}")
@@ -500,6 +646,18 @@ def get_user_forecasts(request):
             'message': f'Error fetching forecasts: {str(e)}'
         }, status=500)
 
+def encode_cursor(forecast):
+    """Opaque keyset cursor pointing just after a forecast in (-created_at, -forecast_id) order"""
+    raw = f"{forecast.created_at.isoformat()}|{forecast.forecast_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        created_at, forecast_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), forecast_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+
 @csrf_exempt
 @require_http_methods(["GET"])
 @login_required
@@ -520,6 +678,32 @@ def get_user_statistics(request):
             'message': f'Error fetching statistics: {str(e)}'
         }, status=500)
 
+@csrf_exempt
+@require_http_methods(["GET"])
+@login_required
+def get_timing_statistics(request):
+    """Per-method p50/p95 wall time, CPU time and peak memory of each forecast stage"""
+    try:
+        limit = min(int(request.GET.get('limit', 500)), 5000)
+        query = ForecastDocument.objects(user_id=request.user.id, status='completed', timings__ne={})
+        if request.GET.get('method'):
+            query = query.filter(method=request.GET['method'])
+
+        # Only the method and timings are read from MongoDB
+        rows = query.order_by('-created_at').only('method', 'timings').limit(limit).as_pymongo()
+
+        return JsonResponse({
+            'status': 'success',
+            'data': summarize_timings(rows)
+        })
+
+    except Exception as e:
+        logger.error(f"Error fetching timing statistics: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error fetching timing statistics: {str(e)}'
+        }, status=500)
+
 @csrf_exempt
 @require_http_methods(["DELETE"])
 @login_required
@@ -538,8 +722,12 @@ def delete_forecast(request, forecast_id):
                 'message': 'Forecast not found or you do not have permission to delete it'
             }, status=404)
         
-        # Delete the forecast
+        # Delete the forecast and its stored model
         forecast.delete()
+        try:
+            get_model_store().delete(forecast_id)
+        except Exception as e:
+            logger.warning(f"Could not delete stored model for forecast {forecast_id}: {str(e)}")
         logger.info(f"Deleted forecast {forecast_id} for user {request.user.username}")
         
         return JsonResponse({
@@ -583,3 +771,249 @@ def get_forecast_details(request, forecast_id):
             'status': 'error',
             'message': f'Error fetching forecast details: {str(e)}'
         }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@login_required
+def get_forecast_status(request, forecast_id):
+    """Poll the status of a queued forecast job"""
+    try:
+        forecast = ForecastDocument.objects(
+            forecast_id=forecast_id,
+            user_id=request.user.id
+        ).first()
+
+        if not forecast:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Forecast not found or you do not have permission to access it'
+            }, status=404)
+
+        response_data = {
+            'forecast_id': forecast.forecast_id,
+            'forecast_status': forecast.status,
+            'created_at': forecast.created_at.isoformat(),
+            'started_at': forecast.started_at.isoformat() if forecast.started_at else None,
+            'completed_at': forecast.completed_at.isoformat() if forecast.completed_at else None,
+            'error_message': forecast.error_message
+        }
+        if forecast.status == 'completed':
+            response_data['forecast'] = forecast.to_dict()
+
+        return JsonResponse({
+            'status': 'success',
+            'data': response_data
+        })
+
+    except Exception as e:
+        logger.error(f"Error fetching forecast status for {forecast_id}: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error fetching forecast status: {str(e)}'
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@login_required
+def update_forecast(request, forecast_id):
+    """
+    API endpoint to append new observations to a saved forecast and refresh it.
+    Methods that support it (ARIMA) update the cached fitted model instead of refitting.
+    """
+    try:
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in request body: {e}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Invalid JSON in request body: {str(e)}'
+            }, status=400)
+
+        new_data = data.get('new_data', [])
+        if not new_data or not all(isinstance(record, dict) for record in new_data):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'new_data must be a non-empty list of dictionaries'
+            }, status=400)
+
+        forecast = ForecastDocument.objects(
+            forecast_id=forecast_id,
+            user_id=request.user.id
+        ).first()
+
+        if not forecast:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Forecast not found or you do not have permission to access it'
+            }, status=404)
+
+        if forecast.status != 'completed':
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Only completed forecasts can be updated (status: {forecast.status})'
+            }, status=400)
+
+        period = int(data.get('period', forecast.forecast_period))
+        error_response = invalid_period_response(period)
+        if error_response:
+            return error_response
+        historical_data = forecast.get_historical_data() + new_data
+
+        logger.info(f"Updating {forecast.method} forecast {forecast_id} with {len(new_data)} new records")
+
+        try:
+            result = forecasting_service.update_forecast(
+                method=forecast.method,
+                data=historical_data,
+                date_column=forecast.date_column,
+                target_column=forecast.target_column,
+                forecast_period=period,
+                parameters=forecast.parameters,
+                model_key=forecast.model_key,
+                model_id=forecast.forecast_id
+            )
+        except ValueError as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
+        for field_name, value in build_forecast_fields(result).items():
+            setattr(forecast, field_name, value)
+        timer = StageTimer()
+        with timer.stage('dataset'):
+            forecast.dataset_id = store_dataset(historical_data)
+        forecast.shared_dataset = False
+        forecast.historical_data = []
+        forecast.forecast_period = period
+        with timer.stage('save'):
+            forecast.save()
+        record_stage_timings(forecast, timer)
+
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'forecast': result['forecast'],
+                'dates': result['dates'],
+                'metrics': result['metrics'],
+                'confidence_intervals': result.get('confidence_intervals'),
+                'model_params': result.get('model_params'),
+                'model_id': forecast.forecast_id
+            }
+        })
+
+    except Exception as e:
+        logger.error(f"Error updating forecast {forecast_id}: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error updating forecast: {str(e)}'
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@login_required
+def reforecast(request, forecast_id):
+    """API endpoint to forecast a new horizon from a saved forecast's stored model, without retraining"""
+    try:
+        try:
+            data = json.loads(request.body) if request.body else {}
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in request body: {e}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Invalid JSON in request body: {str(e)}'
+            }, status=400)
+
+        if 'period' not in data:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Missing required fields: period'
+            }, status=400)
+
+        forecast = ForecastDocument.objects(
+            forecast_id=forecast_id,
+            user_id=request.user.id
+        ).first()
+
+        if not forecast:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Forecast not found or you do not have permission to access it'
+            }, status=404)
+
+        period = int(data['period'])
+        error_response = invalid_period_response(period)
+        if error_response:
+            return error_response
+        logger.info(f"Re-forecasting {forecast.method} forecast {forecast_id} for {period} periods")
+
+        try:
+            result = forecasting_service.reforecast(
+                method=forecast.method,
+                model_id=forecast.forecast_id,
+                forecast_period=period,
+                parameters=forecast.parameters
+            )
+        except ValueError as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
+        fields = build_forecast_fields(result)
+        for field_name in FORECAST_ARRAY_FIELDS:
+            setattr(forecast, field_name, fields[field_name])
+        forecast.forecast_period = period
+        forecast.save()
+
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'forecast': result['forecast'],
+                'dates': result['dates'],
+                'metrics': result['metrics'],
+                'confidence_intervals': result.get('confidence_intervals'),
+                'model_params': result.get('model_params'),
+                'model_id': forecast.forecast_id
+            }
+        })
+
+    except Exception as e:
+        logger.error(f"Error re-forecasting {forecast_id}: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error re-forecasting: {str(e)}'
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@login_required
+def get_batch_forecasts(request, batch_id):
+    """Get all forecasts created by a batch request"""
+    try:
+        forecasts = ForecastDocument.objects(
+            batch_id=batch_id,
+            user_id=request.user.id
+        ).order_by('series_id')
+
+        forecasts_data = [forecast.to_dict() for forecast in forecasts]
+        if not forecasts_data:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Batch not found or you do not have permission to access it'
+            }, status=404)
+
+        return JsonResponse({
+            'status': 'success',
+            'data': forecasts_data,
+            'count': len(forecasts_data)
+        })
+
+    except Exception as e:
+        logger.error(f"Error fetching batch {batch_id}: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error fetching batch forecasts: {str(e)}'
+        }, status=500)
\ No newline at end of file